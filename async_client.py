@@ -0,0 +1,38 @@
+import asyncio
+import uuid
+import weakref
+from microservices_case_app.file_watcher import await_response
+from fx_pipe import FX_SERVICE_DIR, write_fx_request, start_fx_run, read_fx_response
+
+# the FX pipe holds a single request, so requests in flight take turns using it (one lock per event loop)
+_fx_pipe_locks = weakref.WeakKeyDictionary()
+
+
+def fx_pipe_lock():
+    """Returns the lock of the FX pipe for the running event loop"""
+    loop = asyncio.get_running_loop()
+    lock = _fx_pipe_locks.get(loop)
+    if lock is None:
+        lock = _fx_pipe_locks[loop] = asyncio.Lock()
+    return lock
+
+
+async def request_fx(pair, amount, timeout=30, retries=0):
+    """
+    Request the FX conversion of an amount from the Microservice without blocking the event loop
+    :param pair: currency pair, e.g. 'USDEUR'
+    :param amount: amount in the base currency
+    :param timeout: seconds to wait for the response of each attempt
+    :param retries: number of times to send the request again after a timeout
+    :return: converted amount (float)
+    :raises TimeoutError: if the Microservice did not respond in time
+    """
+    def send_request():
+        # tag the request with an id so the response can be matched to it (and stale responses ignored)
+        request_id = uuid.uuid4().hex
+        write_fx_request([pair, amount, request_id])
+        return request_id, start_fx_run()
+
+    async with fx_pipe_lock():
+        return await await_response(FX_SERVICE_DIR, send_request, lambda token: read_fx_response(*token),
+                                    timeout, retries)
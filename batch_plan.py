@@ -0,0 +1,71 @@
+import csv
+import json
+
+# operations a plan can apply and the planner sections they apply to
+OPERATIONS = ('set', 'create', 'update', 'delete')
+SECTIONS = ('trip', 'target_budget', 'itinerary', 'packing', 'budget', 'contacts')
+# columns of a csv plan before the values of the operation
+PLAN_COLUMNS = ('trip', 'op', 'section', 'id')
+
+
+def read_csv_plan(plan_file):
+    """Yield the (trip, op, section, id, values) records of a csv plan (the first row holds the headers)"""
+    with open(plan_file, 'r', newline='') as plan:
+        reader = csv.reader(plan)
+        # skip headers
+        next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            row += [''] * (len(PLAN_COLUMNS) - len(row))
+            values = row[len(PLAN_COLUMNS):]
+            # rows are as wide as the widest operation, drop the empty columns at the end
+            while values and values[-1] == '':
+                values.pop()
+            yield row[0], row[1], row[2], row[3], values
+
+
+def read_json_plan(plan_file):
+    """Yield the (trip, op, section, id, values) records of a json plan (a list of operation objects)"""
+    with open(plan_file, 'r') as plan:
+        operations = json.load(plan)
+    for operation in operations:
+        yield (operation.get('trip', ''), operation.get('op'), operation.get('section'), operation.get('id'),
+               operation.get('values', []))
+
+
+def parse_operation(number, op, section, item_id, values):
+    """
+    Check an operation of a plan and convert its item id and values
+    :param number: position of the operation in the plan (for error messages)
+    :return: tuple of (op, section, item id or None, list of values as strings)
+    :raises ValueError: if the operation or section is unknown or the item id is not a number
+    """
+    if op not in OPERATIONS:
+        raise ValueError(f'Plan operation {number}: unknown operation {op!r}, expected one of {", ".join(OPERATIONS)}')
+    if section not in SECTIONS:
+        raise ValueError(f'Plan operation {number}: unknown section {section!r}, expected one of {", ".join(SECTIONS)}')
+    if item_id in (None, ''):
+        item_id = None
+    else:
+        try:
+            item_id = int(item_id)
+        except ValueError:
+            raise ValueError(f'Plan operation {number}: item id {item_id!r} is not a number') from None
+    if isinstance(values, str):
+        values = [values]
+    return op, section, item_id, [str(value) for value in values]
+
+
+def read_plan(plan_file):
+    """
+    Read the operations of a plan file (.json or .csv) and group them by trip
+    :param plan_file: plan file (path to file)
+    :return: dictionary of trip -> list of (op, section, item id, values), trips in the order they first appear
+    :raises ValueError: if an operation of the plan is not valid
+    """
+    records = read_json_plan(plan_file) if plan_file.lower().endswith('.json') else read_csv_plan(plan_file)
+    trips = {}
+    for number, (trip, op, section, item_id, values) in enumerate(records, 1):
+        trips.setdefault(trip, []).append(parse_operation(number, op, section, item_id, values))
+    return trips
@@ -0,0 +1,209 @@
+from array import array
+from collections.abc import Mapping
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from item_list import ItemList
+import math
+
+# marks a converted amount that has to be converted again (its item changed)
+STALE = math.nan
+
+
+def to_cents(amount):
+    """
+    Convert an amount to integer cents, e.g. '12.5', 12.5 -> 1250 and 12 -> 1200 (an empty amount is 0)
+    :raises ValueError: if the amount is not a number
+    """
+    try:
+        value = Decimal(str(amount).strip().replace(',', '') or '0')
+    except InvalidOperation:
+        raise ValueError(f'{amount!r} is not an amount, e.g. 12.50') from None
+    if not value.is_finite():
+        raise ValueError(f'{amount!r} is not an amount, e.g. 12.50')
+    return int((value * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def round_cents(cents):
+    """Round converted (fractional) cents to integer cents the same way as to_cents, half up, e.g. 2.5 -> 3"""
+    return int(Decimal(cents).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def to_amount(cents):
+    """Convert integer cents to an exact amount, e.g. 1250 -> Decimal('12.50')"""
+    return Decimal(cents).scaleb(-2)
+
+
+class BudgetLedger(ItemList):
+    """
+    Budget items (item number -> [category, amount in integer cents]) that keep the running total of the budget and
+    of every category, so adding, updating and deleting an item updates the totals in O(1) instead of adding up
+    every item again. Amounts are set as text or numbers (e.g. '12.50') and kept exact in cents, saved items (amounts
+    in cents) are set with load_items.
+    The amounts are also kept in a contiguous array (one slot per item) so converting the whole budget into another
+    currency is one pass over the array instead of an interpreted loop over the items.
+    """
+
+    def __init__(self, items=()) -> None:
+        """
+        :param items: dictionary or (item number, [category, amount]) pairs to start with (amounts as text or numbers)
+        """
+        self.total = 0
+        # category -> [total in cents, number of items]
+        self._category_totals = {}
+        # amount (cents) and item number of every slot, item number -> slot
+        self._cents = array('q')
+        self._slot_ids = array('q')
+        self._slots = {}
+        # fx rate -> converted amounts (cents, indexed by slot) memoized since the budget was converted with it
+        self._conversions = {}
+        super().__init__()
+        self.update(items)
+
+    def _add_to_totals(self, category, cents, count):
+        """Add an item (count 1) to or remove it (count -1) from the running totals"""
+        self.total += cents * count
+        category_total = self._category_totals.setdefault(category, [0, 0])
+        category_total[0] += cents * count
+        category_total[1] += count
+        if category_total[1] == 0:
+            del self._category_totals[category]
+
+    def __setitem__(self, item_id, details):
+        self.set_cents(item_id, details[0], to_cents(details[1]))
+
+    def load_items(self, items):
+        """Set every item of a dictionary or of (item number, [category, amount in cents]) pairs as they were saved"""
+        for item_id, (category, cents) in dict(items).items():
+            # trips saved before the budget kept cents have their amounts as text
+            self.set_cents(item_id, category, to_cents(cents) if isinstance(cents, str) else cents)
+
+    def set_cents(self, item_id, category, cents):
+        """Set an item with its amount in integer cents"""
+        if not isinstance(cents, int):
+            raise ValueError(f'{cents!r} is not an amount in cents')
+        if item_id in self:
+            self._add_to_totals(*self[item_id], -1)
+            slot = self._slots[item_id]
+            self._cents[slot] = cents
+            for converted in self._conversions.values():
+                converted[slot] = STALE
+        else:
+            self._slots[item_id] = len(self._cents)
+            self._cents.append(cents)
+            self._slot_ids.append(item_id)
+            for converted in self._conversions.values():
+                converted.append(STALE)
+        super().__setitem__(item_id, [category, cents])
+        self._add_to_totals(category, cents, 1)
+
+    def _remove_slot(self, item_id):
+        """Remove the slot of an item by moving the last slot into it (O(1), slots are not in item order)"""
+        slot = self._slots.pop(item_id)
+        last_cents, last_id = self._cents.pop(), self._slot_ids.pop()
+        last_converted = [converted.pop() for converted in self._conversions.values()]
+        if last_id != item_id:
+            self._cents[slot] = last_cents
+            self._slot_ids[slot] = last_id
+            self._slots[last_id] = slot
+            for converted, amount in zip(self._conversions.values(), last_converted):
+                converted[slot] = amount
+
+    def __delitem__(self, item_id):
+        self._add_to_totals(*self[item_id], -1)
+        self._remove_slot(item_id)
+        super().__delitem__(item_id)
+
+    def pop(self, item_id, *default):
+        if item_id in self:
+            self._add_to_totals(*self[item_id], -1)
+            self._remove_slot(item_id)
+        return super().pop(item_id, *default)
+
+    def clear(self):
+        """Delete every item and reset the totals"""
+        super().clear()
+        self.total = 0
+        self._category_totals = {}
+        self._cents = array('q')
+        self._slot_ids = array('q')
+        self._slots = {}
+        self._conversions = {}
+
+    def renumber(self):
+        """Number the items 1, 2, 3... in their order again (the slots keep their amounts)"""
+        new_ids = super().renumber()
+        self._slot_ids = array('q', [new_ids[item_id] for item_id in self._slot_ids])
+        self._slots = {item_id: slot for slot, item_id in enumerate(self._slot_ids)}
+        return new_ids
+
+    def convert(self, fx_rate):
+        """
+        Convert every amount with the fx rate in one pass over the contiguous amounts (the multiplication runs in C,
+        no Python code runs per item)
+        :return: array of converted amounts in cents (not rounded), indexed by slot
+        """
+        return array('d', map(float(fx_rate).__mul__, self._cents))
+
+    def converted_amount(self, item_id, fx_rate):
+        """
+        Returns the amount of an item converted with the fx rate (rounded to cents). The whole budget is converted
+        the first time a rate is used and memoized; an item that changed since is converted again when it is read.
+        """
+        fx_rate = float(fx_rate)
+        converted = self._conversions.get(fx_rate)
+        if converted is None:
+            converted = self._conversions[fx_rate] = self.convert(fx_rate)
+        slot = self._slots[item_id]
+        if math.isnan(converted[slot]):
+            converted[slot] = fx_rate * self._cents[slot]
+        return to_amount(round_cents(converted[slot]))
+
+    def forget_conversions(self):
+        """Drop the memoized converted amounts (e.g. the budget was converted with new fx rates)"""
+        self._conversions = {}
+
+    def amount(self, item_id):
+        """Returns the exact amount of an item"""
+        return to_amount(self[item_id][1])
+
+    def total_amount(self):
+        """Returns the exact total of the budget"""
+        return to_amount(self.total)
+
+    def category_totals(self):
+        """Returns the exact total of every category"""
+        return {category: to_amount(cents) for category, (cents, count) in self._category_totals.items()}
+
+    def currency_totals(self, base, fx_rates):
+        """
+        Returns the total of the budget in the base currency and converted into every currency of fx_rates
+        (rounded to cents), e.g. {'USD': Decimal('100.00'), 'EUR': Decimal('92.00')}
+        """
+        totals = {base: self.total_amount()}
+        for quote, fx_rate in fx_rates.items():
+            totals[quote] = (self.total_amount() * Decimal(str(fx_rate))).quantize(Decimal('0.01'), ROUND_HALF_UP)
+        return totals
+
+
+class ConvertedBudget(Mapping):
+    """
+    Read-only view of the budget converted with an fx rate (item number -> [category, converted amount]).
+    Nothing is copied: the converted amounts are computed from the budget when they are read and memoized by the
+    budget, so the view always matches the budget, including items changed or added after the conversion.
+    """
+
+    def __init__(self, ledger, fx_rate) -> None:
+        """
+        :param ledger: BudgetLedger to convert
+        :param fx_rate: rate to convert the budget amounts with
+        """
+        self._ledger = ledger
+        self._fx_rate = fx_rate
+
+    def __getitem__(self, item_id):
+        return [self._ledger[item_id][0], self._ledger.converted_amount(item_id, self._fx_rate)]
+
+    def __iter__(self):
+        return iter(self._ledger)
+
+    def __len__(self):
+        return len(self._ledger)
@@ -0,0 +1 @@
+# the tests import the planner modules from the repository root
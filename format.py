@@ -23,6 +23,7 @@ class Format:
     JOURNAL = '📒'
     PHONE = '☎️'
     TIPS = '💁'
+    GLOBE = '🌍'
     # titles and lines used throughout the application
     NEWLINE = '\n'
     LINE = f'{green}{underline}{"-"*50}{shellColors.ENDCOLOR}'
@@ -34,4 +35,5 @@ class Format:
     BDGNAME = f'-       {blue}{bold}{MONEY}          Budget                {MONEY}{end_color}     -'
     CONNAME = f'-       {blue}{bold}{PHONE}         Important Contacts        {PHONE}{end_color}    -'
     TIPNAME = f'-       {blue}{bold}{TIPS}           Tips               {TIPS}{end_color}        -'
+    TRPNAME = f'-       {blue}{bold}{GLOBE}          Saved Trips            {GLOBE}{end_color}     -'
     PLRNAME = f'-       {blue}{bold}{JOURNAL}        Planner                {JOURNAL}{end_color}     -'
\ No newline at end of file
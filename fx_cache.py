@@ -0,0 +1,110 @@
+import json
+import os
+import time
+from microservices_case_app.atomic_file import write_atomic
+
+# seconds an FX rate is used for before it is requested from the Microservice again
+FX_RATE_TTL = 15 * 60
+
+
+class FxRateCache:
+    """
+    Remembers the FX rate of every currency pair converted by the Microservice for ttl seconds, in memory and
+    optionally in a json file so the rates are kept between sessions. A pair is also served from its inverse
+    (the EURUSD rate is 1 / the USDEUR rate).
+    """
+
+    def __init__(self, ttl=FX_RATE_TTL, cache_file=None) -> None:
+        """
+        :param ttl: seconds a rate is used for (0 turns the cache off)
+        :param cache_file: json file to save the rates in (path to file), None keeps them in memory only
+        """
+        self._ttl = ttl
+        self._cache_file = cache_file
+        # (base, quote) -> (rate, time the rate was received)
+        self._rates = {}
+        self.hits = 0
+        self.inverse_hits = 0
+        self.misses = 0
+        if cache_file is not None:
+            self._load()
+
+    @staticmethod
+    def _key(base, quote):
+        """Currencies are compared without case or surrounding spaces"""
+        return base.strip().upper(), quote.strip().upper()
+
+    def _load(self):
+        """Read the rates saved in the cache file (a missing or unreadable file starts an empty cache)"""
+        try:
+            with open(self._cache_file, 'r') as cache_file:
+                saved_rates = json.load(cache_file)
+        except (FileNotFoundError, ValueError):
+            return
+        for base, quote, rate, received_at in saved_rates:
+            self._rates[(base, quote)] = (rate, received_at)
+
+    def _save(self):
+        """Save the rates that have not expired to the cache file"""
+        now = time.time()
+        saved_rates = [[base, quote, rate, received_at] for (base, quote), (rate, received_at) in self._rates.items()
+                       if now - received_at < self._ttl]
+        write_atomic(self._cache_file, json.dumps(saved_rates))
+
+    def _fresh_rate(self, key, now):
+        """Get the rate of the pair if it has not expired, otherwise None"""
+        entry = self._rates.get(key)
+        if entry is None or now - entry[1] >= self._ttl:
+            return None
+        return entry[0]
+
+    def get(self, base, quote):
+        """
+        Get the rate to convert from the base to the quote currency
+        :param base: currency to convert from, e.g. 'USD'
+        :param quote: currency to convert to, e.g. 'EUR'
+        :return: rate, or None if there is no rate for the pair (or its inverse) that has not expired
+        """
+        base, quote = self._key(base, quote)
+        now = time.time()
+        rate = self._fresh_rate((base, quote), now)
+        if rate is None:
+            inverse_rate = self._fresh_rate((quote, base), now)
+            if inverse_rate:
+                rate = 1 / inverse_rate
+                self.inverse_hits += 1
+        if rate is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return rate
+
+    def put(self, base, quote, rate):
+        """
+        Remember the rate the Microservice provided for the pair
+        :param base: currency converted from
+        :param quote: currency converted to
+        :param rate: rate to convert from the base to the quote currency
+        :return: none
+        """
+        if self._ttl <= 0:
+            return
+        self._rates[self._key(base, quote)] = (rate, time.time())
+        if self._cache_file is not None:
+            self._save()
+
+    def clear(self):
+        """Forget every rate (and remove the cache file)"""
+        self._rates = {}
+        if self._cache_file is not None:
+            try:
+                os.remove(self._cache_file)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        """Returns the hit/miss statistics of the cache as text"""
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        return (f'FX rate cache hits: {self.hits} (inverse pair: {self.inverse_hits}) | misses: {self.misses} | '
+                f'hit rate: {hit_rate:.0%}')
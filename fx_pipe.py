@@ -0,0 +1,78 @@
+import csv
+import os
+import time
+
+# communication pipe files shared with the currency (FX) Microservice
+FX_SERVICE_DIR = './CurrencyMS'
+FX_REQUEST_FILE = f'{FX_SERVICE_DIR}/fx_request.csv'
+FX_RUN_FILE = f'{FX_SERVICE_DIR}/fx_run.txt'
+FX_CONVERTED_FILE = f'{FX_SERVICE_DIR}/fx_converted.csv'
+
+
+def write_fx_request(pair_amt):
+    """Write to the FX request file the fx pair, amount and request id for Microservice to convert"""
+    with open(FX_REQUEST_FILE, 'w') as fx_req_file:
+        writer = csv.writer(fx_req_file)
+        writer.writerow(pair_amt)
+
+
+def write_fx_batch_request(pair_amts):
+    """Write to the FX request file a row (fx pair, amount and request id) for every pair the Microservice converts"""
+    with open(FX_REQUEST_FILE, 'w') as fx_req_file:
+        writer = csv.writer(fx_req_file)
+        writer.writerows(pair_amts)
+
+
+def start_fx_run():
+    """Write to the FX run text file 'RUN' so the Microservice converts the request, returns when it was written"""
+    sent_at = time.time()
+    with open(FX_RUN_FILE, 'w') as req_file:
+        req_file.write('RUN')
+    return sent_at
+
+
+def read_fx_response(request_id, sent_at):
+    """Get the converted amount for the request from the FX converted file, None if the response is not there yet"""
+    try:
+        with open(FX_CONVERTED_FILE, 'r') as fx_rec_file:
+            row = next(csv.reader(fx_rec_file), None)
+        modified_at = os.stat(FX_CONVERTED_FILE).st_mtime
+    except FileNotFoundError:
+        return None
+    # the file may be empty while the Microservice is still writing it
+    if not row:
+        return None
+    # match on the echoed request id, older services only send the amount so check it was written after the request
+    if len(row) > 1 and row[1] != request_id:
+        return None
+    if len(row) == 1 and modified_at < sent_at:
+        return None
+    try:
+        return float(row[0])
+    except ValueError:
+        return None
+
+
+def parse_fx_batch_rows(rows, request_id, count):
+    """
+    Get the converted amounts from the response rows of a batch request (one row per pair, in the requested order)
+    :return: list of converted amounts (None for a pair that could not be converted), None if the rows do not hold
+             the whole response to the request
+    """
+    if len(rows) < count or any(len(row) < 2 or row[1] != request_id for row in rows[:count]):
+        return None
+    try:
+        return [float(row[0]) if row[0] else None for row in rows[:count]]
+    except ValueError:
+        return None
+
+
+def read_fx_batch_response(request_id, count):
+    """Get the converted amounts of a batch request from the FX converted file, None if the response is not there yet"""
+    try:
+        with open(FX_CONVERTED_FILE, 'r') as fx_rec_file:
+            rows = list(csv.reader(fx_rec_file))
+    except FileNotFoundError:
+        return None
+    # every row echoes the request id, so a response to an earlier request is never matched
+    return parse_fx_batch_rows(rows, request_id, count)
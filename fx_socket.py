@@ -0,0 +1,96 @@
+import argparse
+import csv
+import io
+import uuid
+from fx_pipe import FX_SERVICE_DIR, parse_fx_batch_rows
+from microservices_case_app.socket_transport import RequestServer, send_request
+
+# socket file the currency (FX) Microservice listens on when the socket transport is used
+FX_SOCKET_PATH = f'{FX_SERVICE_DIR}/fx.sock'
+
+
+def format_rows(rows):
+    """Format rows the same way they are written to the FX communication pipe csv files"""
+    text = io.StringIO()
+    csv.writer(text).writerows(rows)
+    return text.getvalue()
+
+
+def parse_rows(text):
+    """Parse the rows of the FX communication pipe csv files"""
+    return list(csv.reader(io.StringIO(text)))
+
+
+def request_fx_over_socket(pair, amount, socket_path=FX_SOCKET_PATH, timeout=30):
+    """
+    Request the FX conversion of an amount from the Microservice over its Unix domain socket.
+    The request and response are the same rows as in fx_request.csv and fx_converted.csv.
+    :param pair: currency pair, e.g. 'USDEUR'
+    :param amount: amount in the base currency
+    :param socket_path: socket file the Microservice listens on (path to file)
+    :param timeout: seconds to wait for the response
+    :return: converted amount (float), or None if the Microservice could not convert the pair
+    :raises OSError: if the Microservice is not listening (TimeoutError if it did not respond in time)
+    """
+    converted_amounts = request_fx_batch_over_socket([(pair, amount)], socket_path, timeout)
+    return converted_amounts[0] if converted_amounts else None
+
+
+def request_fx_batch_over_socket(pair_amounts, socket_path=FX_SOCKET_PATH, timeout=30):
+    """
+    Request the FX conversion of several pairs and amounts from the Microservice in one round trip over its socket
+    :param pair_amounts: list of (currency pair, amount)
+    :param socket_path: socket file the Microservice listens on (path to file)
+    :param timeout: seconds to wait for the response
+    :return: list of converted amounts in the requested order (None for a pair that could not be converted), or None
+             if the response did not match the request
+    :raises OSError: if the Microservice is not listening (TimeoutError if it did not respond in time)
+    """
+    request_id = uuid.uuid4().hex
+    request = format_rows([pair, amount, request_id] for pair, amount in pair_amounts)
+    return parse_fx_batch_rows(parse_rows(send_request(socket_path, request, timeout)), request_id, len(pair_amounts))
+
+
+class LocalFxServer(RequestServer):
+    """Stand-in for the currency (FX) Microservice on the socket transport that converts with fixed rates"""
+
+    def __init__(self, rates, socket_path=FX_SOCKET_PATH) -> None:
+        """
+        :param rates: dictionary of currency pair to rate, e.g. {'USDEUR': 0.92}, inverse pairs are derived
+        :param socket_path: socket file to listen on (path to file)
+        """
+        self.rates = dict(rates)
+        super().__init__(socket_path, self.convert)
+
+    def get_rate(self, pair):
+        """Get the rate of the pair (derived from the inverse pair if needed), None if it is unknown"""
+        if pair in self.rates:
+            return self.rates[pair]
+        inverse_rate = self.rates.get(pair[3:] + pair[:3])
+        if inverse_rate:
+            return 1 / inverse_rate
+        return None
+
+    def convert(self, request):
+        """Convert the amount of every request row and return the response rows (no amount if the pair is unknown)"""
+        response_rows = []
+        for pair, amount, request_id in parse_rows(request):
+            rate = self.get_rate(pair)
+            response_rows.append(['' if rate is None else float(amount) * rate, request_id])
+        return format_rows(response_rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stand-in currency (FX) Microservice on a Unix domain socket')
+    parser.add_argument('--socket', default=FX_SOCKET_PATH, help='socket file to listen on')
+    parser.add_argument('--rate', action='append', default=[], metavar='PAIR=RATE',
+                        help='rate of a currency pair, e.g. USDEUR=0.92 (can be repeated)')
+    args = parser.parse_args()
+
+    fx_rates = {}
+    for pair_rate in args.rate:
+        fx_pair, fx_rate = pair_rate.split('=')
+        fx_rates[fx_pair] = float(fx_rate)
+    with LocalFxServer(fx_rates, args.socket) as server:
+        print(f'FX Microservice stand-in is listening on {args.socket}...')
+        server.serve_forever()
@@ -0,0 +1,66 @@
+class ItemList(dict):
+    """
+    Items of a planner section (item number -> details) in the order they were added. Remembers the highest item
+    number so a new item is numbered in O(1); adding, updating and deleting an item by number are dictionary
+    operations (O(1)). Item numbers are not reused after a delete until the items are renumbered.
+    """
+
+    def __init__(self, items=()) -> None:
+        """
+        :param items: dictionary or (item number, details) pairs to start with
+        """
+        super().__init__(items)
+        self.last_id = max(self, default=0)
+
+    def __setitem__(self, item_id, details):
+        super().__setitem__(item_id, details)
+        if item_id > self.last_id:
+            self.last_id = item_id
+
+    def update(self, *args, **kwargs):
+        """Set every item of a dictionary or of (item number, details) pairs"""
+        for item_id, details in dict(*args, **kwargs).items():
+            self[item_id] = details
+
+    def load_items(self, items):
+        """Set every item of a dictionary or of (item number, details) pairs as they were saved"""
+        self.update(items)
+
+    def clear(self):
+        """Delete every item, the next item is number 1 again"""
+        super().clear()
+        self.last_id = 0
+
+    def next_id(self):
+        """Returns the number of the next item"""
+        return self.last_id + 1
+
+    def append(self, details):
+        """Add an item after the last one, returns its number"""
+        item_id = self.last_id + 1
+        self[item_id] = details
+        return item_id
+
+    def is_numbered(self):
+        """Returns True if the items are numbered 1, 2, 3... in order (no item was deleted since they were numbered)"""
+        return len(self) == self.last_id
+
+    def renumber(self):
+        """
+        Number the items 1, 2, 3... in their order again
+        :return: dictionary of old item number -> new item number
+        """
+        new_ids = {item_id: new_id for new_id, item_id in enumerate(self, 1)}
+        items = list(self.values())
+        # the items stay the same, only their numbers change
+        dict.clear(self)
+        for new_id, details in enumerate(items, 1):
+            dict.__setitem__(self, new_id, details)
+        self.last_id = len(items)
+        return new_ids
+
+    def __copy__(self):
+        items = type(self)()
+        items.load_items(self)
+        items.last_id = self.last_id
+        return items
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import pickle
+import zlib
+from atomic_file import write_atomic
+from outcome_aggregator import OutcomeAggregator
+
+# total size of the saved aggregates before the least recently used are deleted
+AGGREGATE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def hash_file_contents(file_path, block_size=1024 * 1024):
+    """
+    Hash the contents of a file without reading it all into memory
+    :param file_path: file to hash (path to file)
+    :param block_size: number of bytes read at a time
+    :return: hex digest
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AggregateCache:
+    """
+    Saves the counted aggregates of case databases to disk so a database that was already charted is not parsed again.
+    A database is looked up by its path, size and modified time first. When those changed the contents are hashed, so a
+    database that was only touched (or copied) is still found. Aggregates are stored compressed, one file per database
+    contents, and the least recently used are deleted (with the files mapping a path to them) once the cache is bigger
+    than max_bytes.
+    """
+
+    def __init__(self, cache_directory, max_bytes=AGGREGATE_CACHE_MAX_BYTES):
+        """
+        :param cache_directory: folder to save the aggregates in (path to folder)
+        :param max_bytes: total size of the saved aggregates (and of the files mapping paths to them) to keep
+        """
+        self._cache_directory = cache_directory
+        self._max_bytes = max_bytes
+        # files that map a path, size and modified time to a content hash
+        self._stat_directory = os.path.join(cache_directory, 'stat')
+        # files with the aggregates, named by content hash
+        self._data_directory = os.path.join(cache_directory, 'data')
+        os.makedirs(self._stat_directory, exist_ok=True)
+        os.makedirs(self._data_directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _stat_file_path(self, database_csv, stat):
+        """Path of the file that maps the database path, size and modified time to its content hash"""
+        key = f'{os.path.abspath(database_csv)}\0{stat.st_size}\0{stat.st_mtime_ns}'
+        return os.path.join(self._stat_directory, hashlib.blake2b(key.encode('utf-8'), digest_size=20).hexdigest())
+
+    def _data_file_path(self, content_hash):
+        """Path of the file with the aggregates for the content hash"""
+        return os.path.join(self._data_directory, f'{content_hash}.agg')
+
+    def _content_hash(self, database_csv, stat):
+        """
+        Get the content hash of the database, reading the file only if its path, size or modified time changed
+        :return: content hash
+        """
+        stat_file_path = self._stat_file_path(database_csv, stat)
+        try:
+            with open(stat_file_path, 'r') as stat_file:
+                return stat_file.readline().strip()
+        except FileNotFoundError:
+            pass
+        content_hash = hash_file_contents(database_csv)
+        write_atomic(stat_file_path, f'{content_hash}\n{os.path.abspath(database_csv)}\n'.encode('utf-8'))
+        return content_hash
+
+    def get(self, database_csv):
+        """
+        Get the saved aggregates for the case database
+        :param database_csv: case database csv file (path to file)
+        :return: OutcomeAggregator, or None if the database has not been saved (or has changed)
+        """
+        content_hash = self._content_hash(database_csv, os.stat(database_csv))
+        data_file_path = self._data_file_path(content_hash)
+        try:
+            with open(data_file_path, 'rb') as data_file:
+                state = pickle.loads(zlib.decompress(data_file.read()))
+        except (FileNotFoundError, zlib.error, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+        # mark as recently used
+        os.utime(data_file_path)
+        self.hits += 1
+        return OutcomeAggregator.from_state(state)
+
+    def put(self, database_csv, aggregator, stat):
+        """
+        Save the aggregates of the case database
+        :param database_csv: case database csv file (path to file)
+        :param aggregator: OutcomeAggregator counted from the database
+        :param stat: os.stat of the database taken before it was read, nothing is saved if the database changed since
+        :return: none
+        """
+        if os.stat(database_csv).st_mtime_ns != stat.st_mtime_ns:
+            return
+        content_hash = self._content_hash(database_csv, stat)
+        state = pickle.dumps(aggregator.to_state(), protocol=pickle.HIGHEST_PROTOCOL)
+        write_atomic(self._data_file_path(content_hash), zlib.compress(state, 1))
+        self.evict()
+
+    def load(self, database_csv, load_case_database):
+        """
+        Get the saved aggregates for the case database, or count them with the loader and save them
+        :param database_csv: case database csv file (path to file)
+        :param load_case_database: function that counts a case database and returns an OutcomeAggregator
+        :return: OutcomeAggregator
+        """
+        aggregator = self.get(database_csv)
+        if aggregator is None:
+            stat = os.stat(database_csv)
+            aggregator = load_case_database(database_csv)
+            self.put(database_csv, aggregator, stat)
+        return aggregator
+
+    def evict(self):
+        """
+        Delete the least recently used aggregates until the cache is within max_bytes, with the stat files that map a
+        path to them. Stat files of aggregates that are not saved anymore are deleted too.
+        """
+        with os.scandir(self._data_directory) as entries:
+            saved = [(entry.stat().st_mtime, entry.stat().st_size, entry.name[:-len('.agg')], entry.path)
+                     for entry in entries if entry.name.endswith('.agg')]
+        # content hash -> [(size, path)] of its stat files
+        stat_files = {}
+        with os.scandir(self._stat_directory) as entries:
+            for entry in entries:
+                try:
+                    with open(entry.path, 'r') as stat_file:
+                        content_hash = stat_file.readline().strip()
+                    stat_files.setdefault(content_hash, []).append((entry.stat().st_size, entry.path))
+                except FileNotFoundError:
+                    continue
+        saved_hashes = {content_hash for _, _, content_hash, _ in saved}
+        for content_hash in set(stat_files) - saved_hashes:
+            self._remove_files(stat_files.pop(content_hash))
+        total_bytes = sum(size for _, size, _, _ in saved)
+        total_bytes += sum(size for files in stat_files.values() for size, _ in files)
+        for _, size, content_hash, data_file_path in sorted(saved):
+            if total_bytes <= self._max_bytes:
+                break
+            files = [(size, data_file_path)] + stat_files.get(content_hash, [])
+            self._remove_files(files)
+            total_bytes -= sum(file_size for file_size, _ in files)
+
+    @staticmethod
+    def _remove_files(files):
+        """Delete (size, path) files, another process may have deleted them already"""
+        for _, file_path in files:
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+    def invalidate(self, database_csv=None):
+        """
+        Delete the saved aggregates of a case database, or everything when no database is provided
+        :param database_csv: case database csv file (path to file) or None
+        :return: none
+        """
+        database_path = os.path.abspath(database_csv) if database_csv is not None else None
+        with os.scandir(self._stat_directory) as entries:
+            for entry in entries:
+                with open(entry.path, 'r') as stat_file:
+                    content_hash = stat_file.readline().strip()
+                    path = stat_file.readline().strip()
+                if database_path is not None and path != database_path:
+                    continue
+                os.remove(entry.path)
+                if os.path.exists(self._data_file_path(content_hash)):
+                    os.remove(self._data_file_path(content_hash))
@@ -0,0 +1,27 @@
+from functools import partial
+from file_watcher import await_response
+from spool_queue import RESPONSES_FOLDER, enqueue_request, read_response, spool_folder, withdraw_request
+
+
+async def request_chart(database_csv='case_database.csv', spool_directory='spool', timeout=120, retries=0):
+    """
+    Request charts through the spool queue without blocking the event loop, so many requests can be in flight at once
+    :param database_csv: case database csv file to create the charts from (path to file)
+    :param spool_directory: spool folder shared with the microservice (path to folder)
+    :param timeout: seconds to wait for the response of each attempt
+    :param retries: number of times to send the request again after a timeout
+    :return: pdf file path
+    :raises TimeoutError: if the microservice did not respond in time
+    :raises RuntimeError: if the microservice could not create the charts
+    """
+    response = await await_response(
+        spool_folder(spool_directory, RESPONSES_FOLDER),
+        partial(enqueue_request, spool_directory, database_csv),
+        partial(read_response, spool_directory),
+        timeout,
+        retries,
+        partial(withdraw_request, spool_directory)
+    )
+    if response.startswith('error:'):
+        raise RuntimeError(f'Chart Microservice {response}')
+    return response
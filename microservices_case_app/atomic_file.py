@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+
+def write_atomic(file_path, data):
+    """
+    Write the data (text or bytes) to a temporary file next to the file and rename it over the file,
+    so readers see the old or the new file but never half of one. The data is flushed to disk before the rename
+    and the rename after it, so a crash cannot leave the new name pointing at data that was never written.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    file_descriptor, temp_file_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(file_descriptor, 'wb' if isinstance(data, bytes) else 'w') as temp_file:
+            temp_file.write(data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_file_path, file_path)
+    except BaseException:
+        os.remove(temp_file_path)
+        raise
+    fsync_directory(directory)
+
+
+def fsync_directory(directory):
+    """Flush the entries of a directory (e.g. a rename) to disk, where the platform allows it"""
+    try:
+        directory_descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # directories cannot be opened on every platform (e.g. Windows)
+        return
+    try:
+        os.fsync(directory_descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(directory_descriptor)
@@ -1,28 +1,136 @@
+import argparse
+import os
 import time
+from file_watcher import FileWatcher
+from spool_queue import RESPONSES_FOLDER, enqueue_request, read_response, spool_folder
+from socket_transport import send_request
 
+# seconds to pause before making the request when demo pacing is turned on
+DEMO_PACING_SECONDS = 5
 
-def request_chart():
+
+def read_chart_response(communication_file):
+    """
+    Read the communication pipe and return the PDF file path once the microservice has written it back
+    :param communication_file: communication pipe file (path to file)
+    :return: pdf file path, or None if the request is still pending
+    """
+    try:
+        with open(communication_file, "r") as file:
+            response = file.readline().strip()
+    except FileNotFoundError:
+        # the microservice has not created the pipe yet (or is replacing it)
+        return None
+    # the pipe still holds the request (or was emptied while the charts are being created)
+    if not response or response == 'createChart':
+        return None
+    return response
+
+
+def request_chart(database_csv='case_database.csv', communication_file='chart_service.txt', timeout=120,
+                  demo_pacing=False):
     """
     Method to request a chart with data based on data from case app in the case_database
     This is to show how requests can be made the data that is received back
+    :param database_csv: case database csv file to create the charts from (path to file)
+    :param communication_file: communication pipe file (path to file)
+    :param timeout: seconds to wait for the microservice to respond
+    :param demo_pacing: True to pause before making the request (demo mode)
+    :return: pdf file path, or None if the microservice did not respond in time
     """
+    if demo_pacing:
+        time.sleep(DEMO_PACING_SECONDS)
 
-    # Make the request
-    time.sleep(5)
-    with open('chart_service.txt', "w") as f:
-        print(f'Sending REQUEST to Chart Microservice')
-        lines = ["createChart\n", "case_database.csv\n"]
-        f.writelines(lines)
+    # watch the pipe before making the request so the response cannot be missed
+    with FileWatcher(os.path.dirname(os.path.abspath(communication_file))) as watcher:
+        # Make the request
+        with open(communication_file, "w") as f:
+            print(f'Sending REQUEST to Chart Microservice')
+            lines = ["createChart\n", f"{database_csv}\n"]
+            f.writelines(lines)
 
-    # check response back from microservice
-    time.sleep(40)
-    with open('chart_service.txt', "r") as file:
+        # check response back from microservice each time the pipe changes
         print(f'Opening communication pipe to check for info RECEIVED')
-        pdf_file_path = file.readline()
+        deadline = time.monotonic() + timeout
+        pdf_file_path = read_chart_response(communication_file)
+        while pdf_file_path is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print('Chart Microservice did not respond in time')
+                return None
+            watcher.wait(remaining)
+            pdf_file_path = read_chart_response(communication_file)
 
     # display the file path for the created charts
     print(pdf_file_path)
+    return pdf_file_path
+
+
+def request_chart_spooled(database_csv='case_database.csv', spool_directory='spool', timeout=120):
+    """
+    Request charts through the spool queue: the request gets its own file, so several clients can make requests at the
+    same time without overwriting each other, and the response is read from its own file
+    :param database_csv: case database csv file to create the charts from (path to file)
+    :param spool_directory: spool folder shared with the microservice (path to folder)
+    :param timeout: seconds to wait for the microservice to respond
+    :return: pdf file path, or None if the microservice did not respond in time (or responded with an error)
+    """
+    # watch the responses before making the request so the response cannot be missed
+    with FileWatcher(spool_folder(spool_directory, RESPONSES_FOLDER)) as watcher:
+        request_id = enqueue_request(spool_directory, database_csv)
+        print(f'Sending REQUEST {request_id} to Chart Microservice')
+        deadline = time.monotonic() + timeout
+        response = read_response(spool_directory, request_id)
+        while response is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print('Chart Microservice did not respond in time')
+                return None
+            watcher.wait(remaining)
+            response = read_response(spool_directory, request_id)
+
+    print(response)
+    if response.startswith('error:'):
+        return None
+    return response
+
+
+def request_chart_over_socket(database_csv='case_database.csv', socket_path='chart_service.sock', timeout=120):
+    """
+    Request charts over the Unix domain socket of the microservice (started with --socket), the request and response
+    are the same lines as in the communication pipe file
+    :param database_csv: case database csv file to create the charts from (path to file)
+    :param socket_path: socket file the microservice listens on (path to file)
+    :param timeout: seconds to wait for the microservice to respond
+    :return: pdf file path, or None if the microservice could not be reached or responded with an error
+    """
+    print('Sending REQUEST to Chart Microservice')
+    try:
+        response = send_request(socket_path, f'createChart\n{database_csv}\n', timeout).strip()
+    except OSError as error:
+        print(f'Chart Microservice could not be reached: {error}')
+        return None
+
+    print(response)
+    if response.startswith('error:'):
+        return None
+    return response
+
 
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Case App: request charts from the Chart Microservice')
+    parser.add_argument('database_csv', nargs='?', default='case_database.csv', help='case database csv file')
+    parser.add_argument('--timeout', type=float, default=120, help='seconds to wait for the charts')
+    parser.add_argument('--demo-pacing', action='store_true', help='pause before making the request')
+    parser.add_argument('--spool', metavar='FOLDER', help='request through the spool folder of the microservice')
+    parser.add_argument('--socket', metavar='SOCKET', nargs='?', const='chart_service.sock',
+                        help='request over the Unix domain socket of the microservice (default chart_service.sock)')
+    args = parser.parse_args()
 
-# request data from microservice
-request_chart()
\ No newline at end of file
+    # request data from microservice
+    if args.spool:
+        request_chart_spooled(args.database_csv, args.spool, args.timeout)
+    elif args.socket:
+        request_chart_over_socket(args.database_csv, args.socket, args.timeout)
+    else:
+        request_chart(args.database_csv, timeout=args.timeout, demo_pacing=args.demo_pacing)
@@ -1,114 +1,124 @@
+import argparse
 import csv
+import hashlib
+import json
+import os
+import tempfile
+import threading
 import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from itertools import repeat
 import numpy as np
 from matplotlib import pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
-
-
-def create_charts(inputCSVFile):
+from matplotlib.figure import Figure
+from file_watcher import FileWatcher
+from outcome_aggregator import OutcomeAggregator, HOSPITAL, DOCTOR, TOTAL
+from columnar_loader import load_case_database_columnar, load_case_database_chunked, CHUNK_ROWS
+from aggregate_cache import AggregateCache, AGGREGATE_CACHE_MAX_BYTES
+from incremental_loader import IncrementalIngest
+from spool_queue import (
+    REQUESTS_FOLDER, spool_folder, pending_requests, claim_request, requeue_unfinished_requests, write_response
+)
+from socket_transport import RequestServer
+
+# pypdf is only needed to merge the PDF slices when rendering the charts in parallel
+try:
+    from pypdf import PdfWriter
+except ImportError:
+    PdfWriter = None
+
+# seconds to pause between steps when demo pacing is turned on
+DEMO_PACING_SECONDS = 5
+# where the PDF of the charts is saved
+PDF_FILE_PATH = './reports/outcomes_by_month.pdf'
+# number of rendered pages kept in the page cache (least recently used pages are deleted first)
+PAGE_CACHE_MAX_PAGES = 20000
+# socket file the microservice listens on when the socket transport is used
+CHART_SOCKET_PATH = 'chart_service.sock'
+
+
+def demo_pause(demo_pacing):
     """
-    Opens provided CSV file containing data and parses to collect information for outcomes by month.
-    It will look at the columns for: Doctors, Hospitals, Implant Month, and Outcomes (Good or Bad)
-    :param inputCSVFile: case database csv file with data (path to file)
+    Pause between steps so a demo can be followed along, only when demo pacing was requested
+    :param demo_pacing: True to pause, False to continue straight away
     :return: none
     """
+    if demo_pacing:
+        time.sleep(DEMO_PACING_SECONDS)
 
-    # arrays and dictionaries to store desired information from csv data file
-    data_dict_hospital = {}
-    data_dict_doctor = {}
-    data_dict_month = {}
-    hospitals = []
-    doctors = []
-    implant_months = []
-    outcomes = []
-
-    print(f'Opening {inputCSVFile} file...')
-    time.sleep(5)
 
+def aggregate_case_database(inputCSVFile):
+    """
+    Reads the case database csv row by row and counts the outcomes by month for doctors, hospitals and months
+    :param inputCSVFile: case database csv file with data (path to file)
+    :return: OutcomeAggregator with the counts
+    """
+    aggregator = OutcomeAggregator()
     # open the csv and go through every row and parse the data
     with open(inputCSVFile, 'r') as csv_data:
         # skip headers
         next(csv_data)
-        # get rows
-        rows = csv.reader(csv_data, delimiter=',')
-
-        # iterate through each row in the csv
-        for row in rows:
-            # grab current element values
-            doctor = row[1]
-            hospital = row[2]
-            implant_month = row[9]
-            outcome = row[18]
-            # capitalize  strings to help with duplicates
-            doctor = doctor.title()
-            hospital = hospital.title()
-            implant_month = implant_month.title()
-            outcome = outcome.title()
-
-            # element is not in the hospital data dictionary, then create it with appropriate keys, set val to 0
-            if not data_dict_hospital.get(hospital):
-                data_dict_hospital[hospital] = {}
-            if not data_dict_hospital.get(hospital).get(implant_month):
-                data_dict_hospital[hospital][implant_month] = {}
-            if not data_dict_hospital.get(hospital).get(implant_month).get(outcome):
-                data_dict_hospital[hospital][implant_month][outcome] = 0
-
-            # increment the value based on outcome by month for the hospital
-            val = data_dict_hospital[hospital][implant_month][outcome]
-            val += 1
-            data_dict_hospital[hospital][implant_month][outcome] = val
-
-            # element is not in the doctor data dictionary, then create it with appropriate keys, set val to 0
-            if not data_dict_doctor.get(doctor):
-                data_dict_doctor[doctor] = {}
-            if not data_dict_doctor.get(doctor).get(implant_month):
-                data_dict_doctor[doctor][implant_month] = {}
-            if not data_dict_doctor.get(doctor).get(implant_month).get(outcome):
-                data_dict_doctor[doctor][implant_month][outcome] = 0
-
-            # increment the value based on outcome by month for the doctor
-            val = data_dict_doctor[doctor][implant_month][outcome]
-            val += 1
-            data_dict_doctor[doctor][implant_month][outcome] = val
-
-            # element is not in the month dictionary, then create it with appropriate keys, set val to 0
-            if not data_dict_month.get(implant_month):
-                data_dict_month[implant_month] = {}
-            if not data_dict_month.get(implant_month).get(outcome):
-                data_dict_month[implant_month][outcome] = 0
-
-            # increment the value based on outcome by month for the month
-            val = data_dict_month[implant_month][outcome]
-            val += 1
-            data_dict_month[implant_month][outcome] = val
-
-            # add the values to the lists to be used for charts
-            if doctor not in doctors:
-                doctors.append(doctor)
-            if hospital not in hospitals:
-                hospitals.append(hospital)
-            if implant_month not in implant_months:
-                implant_months.append(implant_month)
-            if outcome not in outcomes:
-                outcomes.append(outcome)
+        # get rows and count them
+        aggregator.add_rows(csv.reader(csv_data, delimiter=','))
+    return aggregator
+
+
+# ways the case database csv can be read and counted, all give the same counts
+INGEST_MODES = {
+    'rows': aggregate_case_database,
+    'columnar': load_case_database_columnar,
+    'chunked': load_case_database_chunked,
+}
+
+
+def create_charts(inputCSVFile, headless=False, demo_pacing=False, ingest='columnar', chunk_rows=CHUNK_ROWS,
+                  render_workers=1, page_cache_directory=None, aggregate_cache=None, incremental_ingest=None,
+                  pdf_file_path=PDF_FILE_PATH):
+    """
+    Opens provided CSV file containing data and parses to collect information for outcomes by month.
+    It will look at the columns for: Doctors, Hospitals, Implant Month, and Outcomes (Good or Bad)
+    :param inputCSVFile: case database csv file with data (path to file)
+    :param headless: True to only save the PDF charts without displaying the total outcomes chart (batch mode)
+    :param demo_pacing: True to pause between steps (demo mode)
+    :param ingest: how to read the csv, one of INGEST_MODES ('rows', 'columnar' or 'chunked')
+    :param chunk_rows: number of rows read at a time when the ingest is 'chunked'
+    :param render_workers: number of processes to render the PDF pages with
+    :param page_cache_directory: folder to cache rendered pages in so only changed pages are rendered again
+    :param aggregate_cache: AggregateCache to reuse the counts of a database that was already charted (or None), not
+    used with incremental_ingest
+    :param incremental_ingest: IncrementalIngest to only read rows appended since the last request (or None)
+    :param pdf_file_path: PDF file to save the charts to (path to file)
+    :return: pdf file path
+    """
+    print(f'Opening {inputCSVFile} file...')
+    demo_pause(demo_pacing)
+    if incremental_ingest is not None:
+        load_case_database = incremental_ingest.load
+    elif ingest == 'chunked':
+        load_case_database = partial(load_case_database_chunked, chunk_rows=chunk_rows)
+    else:
+        load_case_database = INGEST_MODES[ingest]
+    # the incremental ingest already saves the counts, looking them up in the aggregate cache would hash the whole
+    # database after every append instead of only reading the appended rows
+    if aggregate_cache is not None and incremental_ingest is None:
+        aggregator = aggregate_cache.load(inputCSVFile, load_case_database)
+    else:
+        aggregator = load_case_database(inputCSVFile)
 
     print('Creating PDF Charts: Outcomes by Month for Doctors and Hospitals...')
-    time.sleep(5)
+    demo_pause(demo_pacing)
     # create charts for outcomes by month for doctors and hospitals, get the PDF path
-    pdf_file_path = create_bar_chart_outcomes_by_month(
-        hospitals,
-        doctors,
-        implant_months,
-        data_dict_hospital,
-        data_dict_doctor,
-        data_dict_month,
-        outcomes
-    )
+    pdf_file_path = create_bar_chart_outcomes_by_month(aggregator, render_workers, page_cache_directory, pdf_file_path)
 
-    print('Displaying Chart: Total Outcomes by Month...')
-    time.sleep(5)
-    # display the bar chart for total outcomes by month
-    display_total_outcomes_by_month(implant_months, data_dict_month, outcomes)
+    # display the bar chart for total outcomes by month (waits for the user so it is skipped in headless mode)
+    if not headless:
+        print('Displaying Chart: Total Outcomes by Month...')
+        demo_pause(demo_pacing)
+        display_total_outcomes_by_month(aggregator)
 
     # close all charts
     plt.close('all')
@@ -117,200 +127,224 @@ def create_charts(inputCSVFile):
     return pdf_file_path
 
 
-def create_bar_chart_outcomes_by_month(hospitals, doctors, implant_months, data_dict_hospital, data_dict_doctor, data_dict_month, outcomes):
+def outcome_pages(aggregator):
     """
-    Creates charts to show outcomes by month based on provided csv data file. Expects outcomes: 'Good' or 'Bad'
-    :param hospitals: list of hospitals from data
-    :param doctors:   list of doctors from data
-    :param implant_months:  list of months from data
-    :param data_dict_hospital: dictionary of hospital data
-    :param data_dict_doctor: dictionary of doctor data
-    :param data_dict_month:  dictionary of month data
-    :param outcomes: list of outcomes
-    :return: saves charts to PDF and returns file path of pdf
+    Get the data for every page of the PDF: total outcomes by month first, then every hospital and every doctor
+    :param aggregator: OutcomeAggregator with the counts for hospitals, doctors and months
+    :return: list of (title, good outcomes by month, bad outcomes by month) tuples in page order
+    """
+    pages = [(TOTAL, TOTAL, 'Total Outcomes by Month')]
+    pages += [(HOSPITAL, hospital, f'Hospital | {hospital}: Outcomes by Month') for hospital in aggregator.hospitals]
+    pages += [(DOCTOR, doctor, f'Doctor | {doctor}: Outcomes by Month') for doctor in aggregator.doctors]
+    series = aggregator.outcome_series
+    return [
+        (title, series(dimension, entity, 'Good'), series(dimension, entity, 'Bad'))
+        for dimension, entity, title in pages
+    ]
+
+
+def plot_outcomes_by_month(ax, x_axis_dates, y_axis_good_outcomes, y_axis_bad_outcomes, title):
+    """
+    Draws a bar chart of good and bad outcomes by month. Expects outcomes: 'Good' or 'Bad'
+    :param ax: matplotlib axes to draw on
+    :param x_axis_dates: list of months
+    :param y_axis_good_outcomes: number of good outcomes for each month
+    :param y_axis_bad_outcomes: number of bad outcomes for each month
+    :param title: title of the chart
+    :return: none
     """
-    # store data for x and y axis
-    x_axis_dates = []
-    y_axis_good_outcomes = []
-    y_axis_bad_outcomes = []
-    pdf_file_path = './reports/outcomes_by_month.pdf'
-    pdf_file = PdfPages(pdf_file_path)
-
-    # create total outcomes by month chart
-    for month in implant_months:
-        x_axis_dates.append(month)
-        if not data_dict_month.get(month):
-            y_axis_good_outcomes = 0
-            y_axis_bad_outcomes = 0
-        else:
-            for outcome in outcomes:
-                if outcome == 'Good':
-                    if not data_dict_month.get(month).get(outcome):
-                        y_axis_good_outcomes.append(0)
-                    else:
-                        val = data_dict_month[month][outcome]
-                        y_axis_good_outcomes.append(val)
-                if outcome == 'Bad':
-                    if not data_dict_month.get(month).get(outcome):
-                        y_axis_bad_outcomes.append(0)
-                    else:
-                        val = data_dict_month[month][outcome]
-                        y_axis_bad_outcomes.append(val)
-
-    # create and save chart to pdf
     x = np.arange(len(x_axis_dates))
-    fig, ax = plt.subplots()
     ax.bar(x - 0.25 / 2, y_axis_good_outcomes, 0.25, label='Good Outcomes', color='g')
     ax.bar(x + 0.25 / 2, y_axis_bad_outcomes, 0.25, label='Bad Outcomes', color='r')
     ax.set_ylabel('# Outcomes')
     ax.set_xlabel('Months')
     ax.set_xticks(x, x_axis_dates)
     ax.legend()
-    plt.title(f'Total Outcomes by Month')
-    fig.savefig(pdf_file, format='pdf')
-    plt.close(fig)
+    ax.set_title(title)
+
+
+def render_pages_to_pdf(x_axis_dates, pages, pdf_file_path):
+    """
+    Renders chart pages into a PDF file. Figures are created without pyplot so this can run in worker processes.
+    :param x_axis_dates: list of months
+    :param pages: list of (title, good outcomes by month, bad outcomes by month) tuples
+    :param pdf_file_path: PDF file to save the pages to (path to file)
+    :return: pdf file path
+    """
+    with PdfPages(pdf_file_path) as pdf_file:
+        for title, y_axis_good_outcomes, y_axis_bad_outcomes in pages:
+            fig = Figure()
+            plot_outcomes_by_month(fig.subplots(), x_axis_dates, y_axis_good_outcomes, y_axis_bad_outcomes, title)
+            fig.savefig(pdf_file, format='pdf')
+    return pdf_file_path
+
+
+def merge_pdf_files(pdf_file_paths, output_pdf_file_path):
+    """
+    Merges PDF files into one PDF, pages are kept in the order of the provided files
+    :param pdf_file_paths: list of PDF files to merge (paths to files)
+    :param output_pdf_file_path: merged PDF file (path to file)
+    :return: merged pdf file path
+    """
+    writer = PdfWriter()
+    for pdf_file_path in pdf_file_paths:
+        writer.append(pdf_file_path)
+    with open(output_pdf_file_path, 'wb') as pdf_file:
+        writer.write(pdf_file)
+    writer.close()
+    return output_pdf_file_path
+
+
+def render_pages_in_parallel(x_axis_dates, pages, pdf_file_path, render_workers):
+    """
+    Splits the pages into slices, renders each slice to its own PDF in a worker process and merges the slices
+    in page order
+    :param x_axis_dates: list of months
+    :param pages: list of (title, good outcomes by month, bad outcomes by month) tuples
+    :param pdf_file_path: PDF file to save the pages to (path to file)
+    :param render_workers: number of worker processes
+    :return: pdf file path
+    """
+    # a few slices per worker keeps the workers busy when some pages render slower than others
+    slice_count = min(len(pages), render_workers * 4)
+    slice_size = -(-len(pages) // slice_count)
+    page_slices = [pages[start:start + slice_size] for start in range(0, len(pages), slice_size)]
+
+    with tempfile.TemporaryDirectory() as slice_directory:
+        slice_file_paths = [os.path.join(slice_directory, f'slice_{index}.pdf') for index in range(len(page_slices))]
+        with ProcessPoolExecutor(max_workers=render_workers) as executor:
+            # map returns the results in slice order so the merged page order is always the same
+            list(executor.map(render_pages_to_pdf, repeat(x_axis_dates), page_slices, slice_file_paths))
+        merge_pdf_files(slice_file_paths, pdf_file_path)
+    return pdf_file_path
+
+
+def page_hash(x_axis_dates, page):
+    """
+    Hash of everything drawn on a page (title, months and outcomes by month), pages with the same hash look the same
+    :param x_axis_dates: list of months
+    :param page: (title, good outcomes by month, bad outcomes by month) tuple
+    :return: hex digest
+    """
+    title, y_axis_good_outcomes, y_axis_bad_outcomes = page
+    content = json.dumps([title, x_axis_dates, y_axis_good_outcomes, y_axis_bad_outcomes])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def render_cached_page(x_axis_dates, page, page_file_path):
+    """
+    Renders a single page into the page cache. Written to a temporary file first so a partly written page
+    is never used from the cache.
+    :param x_axis_dates: list of months
+    :param page: (title, good outcomes by month, bad outcomes by month) tuple
+    :param page_file_path: cached page PDF file (path to file)
+    :return: page file path
+    """
+    temp_file_path = f'{page_file_path}.{os.getpid()}.tmp'
+    render_pages_to_pdf(x_axis_dates, [page], temp_file_path)
+    os.replace(temp_file_path, page_file_path)
+    return page_file_path
+
+
+def prune_page_cache(page_cache_directory, max_pages=PAGE_CACHE_MAX_PAGES):
+    """
+    Deletes the least recently used pages once the page cache holds more than max_pages pages
+    :param page_cache_directory: page cache folder (path to folder)
+    :param max_pages: number of pages to keep
+    :return: none
+    """
+    with os.scandir(page_cache_directory) as entries:
+        cached_pages = [(entry.stat().st_mtime, entry.path) for entry in entries if entry.name.endswith('.pdf')]
+    if len(cached_pages) <= max_pages:
+        return
+    cached_pages.sort()
+    for _, page_file_path in cached_pages[:len(cached_pages) - max_pages]:
+        os.remove(page_file_path)
+
+
+def render_pages_with_cache(x_axis_dates, pages, pdf_file_path, render_workers, page_cache_directory):
+    """
+    Renders only the pages that are not in the page cache yet and builds the PDF from the cached pages
+    :param x_axis_dates: list of months
+    :param pages: list of (title, good outcomes by month, bad outcomes by month) tuples
+    :param pdf_file_path: PDF file to save the pages to (path to file)
+    :param render_workers: number of worker processes for the pages that need rendering
+    :param page_cache_directory: page cache folder (path to folder)
+    :return: pdf file path
+    """
+    os.makedirs(page_cache_directory, exist_ok=True)
+    page_file_paths = [os.path.join(page_cache_directory, f'{page_hash(x_axis_dates, page)}.pdf') for page in pages]
+
+    # only pages whose data changed (or are new) need rendering
+    missing_pages = {}
+    for page, page_file_path in zip(pages, page_file_paths):
+        if not os.path.exists(page_file_path):
+            missing_pages[page_file_path] = page
+    print(f'Rendering {len(missing_pages)} of {len(pages)} pages, the rest are cached...')
+
+    if render_workers > 1 and len(missing_pages) > 1:
+        with ProcessPoolExecutor(max_workers=render_workers) as executor:
+            chunk_size = max(1, len(missing_pages) // (render_workers * 4))
+            list(executor.map(render_cached_page, repeat(x_axis_dates), missing_pages.values(), missing_pages,
+                              chunksize=chunk_size))
+    else:
+        for page_file_path, page in missing_pages.items():
+            render_cached_page(x_axis_dates, page, page_file_path)
+
+    merge_pdf_files(page_file_paths, pdf_file_path)
+    # mark the pages as used so pruning removes the least recently used pages first
+    for page_file_path in set(page_file_paths):
+        os.utime(page_file_path)
+    prune_page_cache(page_cache_directory)
+    return pdf_file_path
+
+
+def create_bar_chart_outcomes_by_month(aggregator, render_workers=1, page_cache_directory=None,
+                                       pdf_file_path=PDF_FILE_PATH):
+    """
+    Creates charts to show outcomes by month based on provided csv data file. Expects outcomes: 'Good' or 'Bad'
+    :param aggregator: OutcomeAggregator with the counts for hospitals, doctors and months
+    :param render_workers: number of processes to render the pages with (1 renders in this process)
+    :param page_cache_directory: folder to cache rendered pages in, only changed pages are rendered (None to not cache)
+    :param pdf_file_path: PDF file to save the charts to (path to file)
+    :return: saves charts to PDF and returns file path of pdf
+    """
+    x_axis_dates = list(aggregator.implant_months)
+    pages = outcome_pages(aggregator)
+
+    # rendering in parallel or from the page cache needs pypdf to merge the pages back together
+    if (render_workers > 1 or page_cache_directory) and PdfWriter is None:
+        print('pypdf is not installed, rendering all the charts in a single process...')
+        render_workers, page_cache_directory = 1, None
+
+    # create and save each chart to pdf
+    if page_cache_directory:
+        render_pages_with_cache(x_axis_dates, pages, pdf_file_path, render_workers, page_cache_directory)
+    elif render_workers > 1 and len(pages) > 1:
+        render_pages_in_parallel(x_axis_dates, pages, pdf_file_path, render_workers)
+    else:
+        render_pages_to_pdf(x_axis_dates, pages, pdf_file_path)
 
-    # reset axis data
-    x_axis_dates = []
-    y_axis_good_outcomes = []
-    y_axis_bad_outcomes = []
-
-    # create charts to show outcomes by month for hospitals
-    for hospital in hospitals:
-        for month in implant_months:
-            x_axis_dates.append(month)
-            if not data_dict_hospital.get(hospital).get(month):
-                y_axis_good_outcomes.append(0)
-                y_axis_bad_outcomes.append(0)
-            else:
-                for outcome in outcomes:
-                    if outcome == 'Good':
-                        if not data_dict_hospital.get(hospital).get(month).get(outcome):
-                            y_axis_good_outcomes.append(0)
-                        else:
-                            val = data_dict_hospital[hospital][month][outcome]
-                            y_axis_good_outcomes.append(val)
-                    if outcome == 'Bad':
-                        if not data_dict_hospital.get(hospital).get(month).get(outcome):
-                            y_axis_bad_outcomes.append(0)
-                        else:
-                            val = data_dict_hospital[hospital][month][outcome]
-                            y_axis_bad_outcomes.append(val)
-
-        # create and save plot to PDF
-        x = np.arange(len(x_axis_dates))
-        fig, ax = plt.subplots()
-        ax.bar(x - 0.25 / 2, y_axis_good_outcomes, 0.25, label='Good Outcomes', color='g')
-        ax.bar(x + 0.25 / 2, y_axis_bad_outcomes, 0.25, label='Bad Outcomes', color='r')
-        ax.set_ylabel('# Outcomes')
-        ax.set_xlabel('Months')
-        ax.set_xticks(x, x_axis_dates)
-        ax.legend()
-        plt.title(f'Hospital | {str(hospital)}: Outcomes by Month')
-        fig.savefig(pdf_file, format='pdf')
-        plt.close(fig)
-
-        # reset the axis data for next hospital
-        x_axis_dates = []
-        y_axis_good_outcomes = []
-        y_axis_bad_outcomes = []
-
-    # reset variables to store access data
-    x_axis_dates = []
-    y_axis_good_outcomes = []
-    y_axis_bad_outcomes = []
-
-    # craete chart to show doctors outcomes by month
-    for doctor in doctors:
-        for month in implant_months:
-            x_axis_dates.append(month)
-            if not data_dict_doctor.get(doctor).get(month):
-                y_axis_good_outcomes.append(0)
-                y_axis_bad_outcomes.append(0)
-            else:
-                for outcome in outcomes:
-                    if outcome == 'Good':
-                        if not data_dict_doctor.get(doctor).get(month).get(outcome):
-                            y_axis_good_outcomes.append(0)
-                        else:
-                            val = data_dict_doctor[doctor][month][outcome]
-                            y_axis_good_outcomes.append(val)
-                    if outcome == 'Bad':
-                        if not data_dict_doctor.get(doctor).get(month).get(outcome):
-                            y_axis_bad_outcomes.append(0)
-                        else:
-                            val = data_dict_doctor[doctor][month][outcome]
-                            y_axis_bad_outcomes.append(val)
-
-        # create and save chart by doctor to pdf
-        x = np.arange(len(x_axis_dates))
-        fig, ax = plt.subplots()
-        ax.bar(x - 0.25/2, y_axis_good_outcomes, 0.25, label='Good Outcomes', color='g')
-        ax.bar(x + 0.25/2, y_axis_bad_outcomes, 0.25, label='Bad Outcomes', color='r')
-        ax.set_ylabel('# Outcomes')
-        ax.set_xlabel('Months')
-        ax.set_xticks(x, x_axis_dates)
-        ax.legend()
-        plt.title(f'Doctor | {str(doctor)}: Outcomes by Month')
-        fig.savefig(pdf_file, format='pdf')
-        plt.close(fig)
-
-        # reset axis for next doctor
-        x_axis_dates = []
-        y_axis_good_outcomes = []
-        y_axis_bad_outcomes = []
-
-    # close the file
-    pdf_file.close()
     print('Charts saved as PDF...')
     return pdf_file_path
 
 
-def display_total_outcomes_by_month(implant_months, data_dict_month, outcomes):
+def display_total_outcomes_by_month(aggregator):
     """
     Displays the total outcomes by month. Expects 'Good' or 'Bad' outcomes.
     Suggest user to close the chart window within ~10-15 seconds as process continues
-    :param implant_months: list of months
-    :param data_dict_month: dictionary of months data
-    :param outcomes:  list of outcomes
+    :param aggregator: OutcomeAggregator with the counts for months
     :return: nonde, displays chart
     """
-    # store data for x and y axis
-    x_axis_dates = []
-    y_axis_good_outcomes = []
-    y_axis_bad_outcomes = []
-
-    # get outcomes by month
-    for month in implant_months:
-        x_axis_dates.append(month)
-        if not data_dict_month.get(month):
-            y_axis_good_outcomes = 0
-            y_axis_bad_outcomes = 0
-        else:
-            for outcome in outcomes:
-                if outcome == 'Good':
-                    if not data_dict_month.get(month).get(outcome):
-                        y_axis_good_outcomes.append(0)
-                    else:
-                        val = data_dict_month[month][outcome]
-                        y_axis_good_outcomes.append(val)
-                if outcome == 'Bad':
-                    if not data_dict_month.get(month).get(outcome):
-                        y_axis_bad_outcomes.append(0)
-                    else:
-                        val = data_dict_month[month][outcome]
-                        y_axis_bad_outcomes.append(val)
-
     # create and display the chart
-    x = np.arange(len(x_axis_dates))
     fig, ax = plt.subplots()
-    ax.bar(x - 0.25 / 2, y_axis_good_outcomes, 0.25, label='Good Outcomes', color='g')
-    ax.bar(x + 0.25 / 2, y_axis_bad_outcomes, 0.25, label='Bad Outcomes', color='r')
-    ax.set_ylabel('# Outcomes')
-    ax.set_xlabel('Months')
-    ax.set_xticks(x, x_axis_dates)
-    ax.legend()
-    plt.title(f'Total Outcomes by Month')
+    plot_outcomes_by_month(
+        ax,
+        list(aggregator.implant_months),
+        aggregator.outcome_series(TOTAL, TOTAL, 'Good'),
+        aggregator.outcome_series(TOTAL, TOTAL, 'Bad'),
+        'Total Outcomes by Month'
+    )
     # display the chart
     plt.show(block=False)
     # can adjust the below for how long to be able to display chart before it should be closed out
@@ -327,34 +361,376 @@ def empty_communication_file(file):
         f.write('')
 
 
+class RequestDispatcher:
+    """
+    Waits for instructions in the communication pipe file and dispatches them to create the charts.
+    The dispatcher sleeps until the pipe file changes (inotify), or polls with a backoff if inotify is unavailable.
+    """
+
+    def __init__(self, communication_file, **chart_options):
+        """
+        :param communication_file: communication pipe file (path to file)
+        :param chart_options: keyword arguments for create_charts (headless, demo_pacing, ingest, ...)
+        """
+        self._communication_file = communication_file
+        self._chart_options = chart_options
+        self._directory = os.path.dirname(os.path.abspath(communication_file))
+        # counters to report how the service is performing
+        self.idle_wakeups = 0
+        self.requests_handled = 0
+        # requests picked up (some may still be worked on), the pickup latency is averaged over them
+        self.requests_picked_up = 0
+        self.total_pickup_latency = 0.0
+        self.max_pickup_latency = 0.0
+
+    def check_for_request(self):
+        """
+        Open the communication pipe file and look for instructions
+        :return: the database csv file if a valid request was received, otherwise None
+        """
+        try:
+            with open(self._communication_file, "r") as file:
+                # get the instruction and the csv file
+                instruction = file.readline().strip()
+                database_csv = file.readline().strip()
+            requested_at = os.stat(self._communication_file).st_mtime
+        except FileNotFoundError:
+            return None
 
-print('Chart Mircroservice is running...')
+        # if valid instruction is received
+        if instruction != 'createChart':
+            return None
+        self.record_pickup(requested_at)
+        return database_csv
+
+    def record_pickup(self, requested_at):
+        """Count a picked up request and the time from the request being written to it being picked up"""
+        latency = max(time.time() - requested_at, 0.0)
+        self.requests_picked_up += 1
+        self.total_pickup_latency += latency
+        self.max_pickup_latency = max(self.max_pickup_latency, latency)
+
+    def handle_request(self, database_csv):
+        """
+        Create the charts for the requested database and write the PDF path back to the communication pipe
+        :param database_csv: case database csv file with data (path to file)
+        :return: none
+        """
+        print(f'Valid REQUEST received, preparing to create charts from {database_csv}')
+        # empty the text file
+        empty_communication_file(self._communication_file)
+        # create the charts outcomes by month
+        pdf_file_path = create_charts(database_csv, **self._chart_options)
+
+        # update the communication pipe with the path to the saved PDF charts
+        with open(self._communication_file, "w") as file:
+            print(f'Writing back to {self._communication_file} with file path of PDFs: {pdf_file_path}')
+            file.write(pdf_file_path)
+        self.requests_handled += 1
+        self.report_stats()
+
+    def report_stats(self):
+        """Display the dispatcher counters: idle wakeups and request pickup latency"""
+        average_latency = self.total_pickup_latency / self.requests_picked_up if self.requests_picked_up else 0.0
+        print(f'Requests handled: {self.requests_handled} | Idle wakeups: {self.idle_wakeups} | '
+              f'Pickup latency avg: {average_latency:.3f}s max: {self.max_pickup_latency:.3f}s')
+
+    def run(self):
+        """
+        Microservice that looks for 'createChart' string in the communication pipe file
+        Once the string has been communicated, then the microservice will look for the provided case_database.csv
+        file to create the data charts: outcomes by month
+        """
+        with FileWatcher(self._directory, max_poll_interval=2.0) as watcher:
+            if not watcher.uses_inotify():
+                print('File events unavailable, polling for requests...')
+            # check before waiting so a request written while the service was starting is picked up
+            database_csv = self.check_for_request()
+            pipe_name = os.path.basename(self._communication_file)
+            while True:
+                if database_csv is not None:
+                    self.handle_request(database_csv)
+                    # drop the file events of the dispatcher's own writes to the pipe so they are not counted as
+                    # idle wakeups, a request written in the meantime is still found as the pipe is read again
+                    watcher.wait(0)
+                    database_csv = self.check_for_request()
+                    continue
+                # sleep until the pipe changes, a wakeup without a valid request counts as idle (changes to other
+                # files in the directory are ignored, no file names means events were dropped so the pipe is read)
+                changed_files = watcher.wait()
+                if changed_files and pipe_name not in changed_files:
+                    continue
+                database_csv = self.check_for_request()
+                if database_csv is None:
+                    self.idle_wakeups += 1
+
+
+def create_chart_response(request_id, database_csv, chart_options):
+    """
+    Creates the charts for a request that is worked on at the same time as others (runs in a worker process)
+    :param request_id: id of the request
+    :param database_csv: case database csv file with data (path to file)
+    :param chart_options: keyword arguments for create_charts
+    :return: the response, the pdf file path or an 'error: ...' message
+    """
+    # every request gets its own PDF so requests worked on at the same time do not overwrite each other
+    pdf_file_path = f'./reports/outcomes_by_month_{request_id}.pdf'
+    try:
+        return create_charts(database_csv, pdf_file_path=pdf_file_path, **chart_options)
+    except Exception as error:
+        # respond so the client does not wait for a response that will never come
+        return f'error: {error}'
 
-while True:
 
+def handle_spool_request(spool_directory, request_id, database_csv, chart_options):
     """
-    Microservice that looks for 'createChart' string in the chart_service.txt
-    Once the string has been communicated, then the microservice will look for the provided case_database.csv 
-    file to create the data charts: outcomes by month
+    Creates the charts for a request from the spool queue (runs in a worker process) and writes its response file
+    :param spool_directory: spool folder (path to folder)
+    :param request_id: id of the request
+    :param database_csv: case database csv file with data (path to file)
+    :param chart_options: keyword arguments for create_charts
+    :return: the response, the pdf file path or an 'error: ...' message
     """
+    response = create_chart_response(request_id, database_csv, chart_options)
+    write_response(spool_directory, request_id, response)
+    return response
 
-    time.sleep(5)
 
-    # open the communication pipe file and look for instructions
-    with open('chart_service.txt', "r") as file:
-        # get the instruction and the csv file
-        instruction = file.readline().strip()
-        database_csv = file.readline().strip()
+class WorkerPool:
+    """
+    Pool of worker processes creating charts. A worker that dies (e.g. killed when out of memory) breaks the whole
+    process pool, so a new pool is started for the work submitted after that.
+    """
 
-        # if valid instruction is received
-        if instruction == 'createChart':
-            print(f'Valid REQUEST received, preparing to create charts from {database_csv}')
-            # empty the text file
-            empty_communication_file('chart_service.txt')
-            # create the charts outcomes by month
-            pdf_file_path = create_charts(database_csv)
-
-            # update the communication pipe with the path to the saved PDF charts
-            with open('chart_service.txt', "w") as file:
-                print(f'Writing back to chart_service.txt with file path of PDFs: {pdf_file_path}')
-                file.write(pdf_file_path)
+    def __init__(self, workers=1):
+        """
+        :param workers: number of worker processes
+        """
+        self._workers = workers
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        # several threads can find the pool broken at once, only one of them starts a new pool
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, function, *args):
+        """
+        Submit work to the pool, starting a new pool first if a worker died
+        :return: Future of the work
+        """
+        executor = self._executor
+        try:
+            return executor.submit(function, *args)
+        except BrokenProcessPool:
+            return self.restart(executor).submit(function, *args)
+
+    def restart(self, broken_executor):
+        """
+        Start a new pool in place of a broken one (unless another thread already did)
+        :param broken_executor: ProcessPoolExecutor that was found broken
+        :return: ProcessPoolExecutor to submit to
+        """
+        with self._lock:
+            if self._executor is broken_executor:
+                print('A worker process died, starting a new pool of workers...')
+                broken_executor.shutdown(wait=False)
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            return self._executor
+
+    def shutdown(self):
+        """Wait for the submitted work and stop the workers"""
+        self._executor.shutdown()
+
+
+class SpoolDispatcher(RequestDispatcher):
+    """
+    Waits for request files in the spool folder (one file per request) and hands them to a pool of worker processes,
+    so several clients can make requests at the same time and the charts are created concurrently.
+    Each request gets its own response file in the responses folder.
+    """
+
+    def __init__(self, spool_directory, workers=1, **chart_options):
+        """
+        :param spool_directory: spool folder (path to folder)
+        :param workers: number of worker processes creating charts
+        :param chart_options: keyword arguments for create_charts (headless, ingest, ...)
+        """
+        # charts cannot be displayed from the worker processes
+        chart_options['headless'] = True
+        super().__init__(spool_folder(spool_directory, REQUESTS_FOLDER), **chart_options)
+        self._spool_directory = spool_directory
+        self._directory = self._communication_file
+        self._workers = workers
+
+    def dispatch_pending_requests(self, worker_pool):
+        """
+        Claim every waiting request and submit it to the worker pool
+        :param worker_pool: WorkerPool of the workers
+        :return: number of requests submitted
+        """
+        submitted = 0
+        for request_id in pending_requests(self._spool_directory):
+            request = claim_request(self._spool_directory, request_id)
+            # another dispatcher may have claimed it first
+            if request is None:
+                continue
+            instruction, database_csv, requested_at = request
+            if instruction != 'createChart':
+                write_response(self._spool_directory, request_id, f'error: unknown instruction {instruction}')
+                continue
+            print(f'Valid REQUEST {request_id} received, preparing to create charts from {database_csv}')
+            self.record_pickup(requested_at)
+            try:
+                future = worker_pool.submit(
+                    handle_spool_request, self._spool_directory, request_id, database_csv, self._chart_options
+                )
+            except Exception as error:
+                # respond so the request is not left in the processing folder
+                write_response(self._spool_directory, request_id, f'error: {error}')
+                continue
+            future.add_done_callback(partial(self.request_done, request_id))
+            submitted += 1
+        return submitted
+
+    def request_done(self, request_id, future):
+        """Count a finished request and display the dispatcher counters"""
+        try:
+            response = future.result()
+        except Exception as error:
+            # the worker failed before writing the response (e.g. the worker pool broke), respond so the client does
+            # not wait for a response that will never come and the request is not left in the processing folder
+            response = f'error: {error}'
+            write_response(self._spool_directory, request_id, response)
+        print(f'Response written: {response}')
+        self.requests_handled += 1
+        self.report_stats()
+
+    def run(self):
+        """
+        Microservice that looks for request files in the spool folder and creates the charts with a pool of workers
+        """
+        moved = requeue_unfinished_requests(self._spool_directory)
+        if moved:
+            print(f'{moved} unfinished requests added back to the queue...')
+        with FileWatcher(self._directory, max_poll_interval=2.0) as watcher, \
+                WorkerPool(self._workers) as worker_pool:
+            if not watcher.uses_inotify():
+                print('File events unavailable, polling for requests...')
+            # check before waiting so requests made while the service was stopped are picked up
+            self.dispatch_pending_requests(worker_pool)
+            while True:
+                # sleep until a request is added, a wakeup without a new request counts as idle
+                watcher.wait()
+                if not self.dispatch_pending_requests(worker_pool):
+                    self.idle_wakeups += 1
+
+
+class SocketDispatcher(RequestDispatcher):
+    """
+    Takes requests over a Unix domain socket instead of the communication pipe file. A request is the same lines as
+    in chart_service.txt ('createChart' and the database csv) and the response is the pdf file path (or 'error: ...').
+    Every connection is answered from its own thread and the charts are created by a pool of worker processes.
+    """
+
+    def __init__(self, socket_path=CHART_SOCKET_PATH, workers=1, **chart_options):
+        """
+        :param socket_path: socket file to listen on (path to file)
+        :param workers: number of worker processes creating charts
+        :param chart_options: keyword arguments for create_charts (headless, ingest, ...)
+        """
+        # charts cannot be displayed from the worker processes
+        chart_options['headless'] = True
+        super().__init__(socket_path, **chart_options)
+        self._workers = workers
+        self._worker_pool = None
+
+    def respond(self, request):
+        """
+        Create the charts for a request received on the socket (runs in the thread of the connection)
+        :param request: request text
+        :return: response text
+        """
+        lines = request.splitlines()
+        instruction = lines[0].strip() if lines else ''
+        if instruction != 'createChart' or len(lines) < 2:
+            return f'error: unknown instruction {instruction}\n'
+        database_csv = lines[1].strip()
+        request_id = uuid.uuid4().hex
+        print(f'Valid REQUEST {request_id} received, preparing to create charts from {database_csv}')
+        try:
+            response = self._worker_pool.submit(
+                create_chart_response, request_id, database_csv, self._chart_options
+            ).result()
+        except Exception as error:
+            # the worker died while creating the charts (the next request starts a new pool), the client still gets
+            # a response
+            response = f'error: {error}'
+        print(f'Response sent: {response}')
+        self.requests_handled += 1
+        self.report_stats()
+        return f'{response}\n'
+
+    def run(self):
+        """
+        Microservice that answers chart requests on the socket until it is stopped
+        """
+        with WorkerPool(self._workers) as worker_pool, \
+                RequestServer(self._communication_file, self.respond) as server:
+            self._worker_pool = worker_pool
+            print(f'Listening for requests on {self._communication_file}...')
+            server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Chart Microservice: outcomes by month charts from case databases')
+    parser.add_argument('--headless', action='store_true', help='save the PDF charts without displaying them')
+    parser.add_argument('--demo-pacing', action='store_true', help='pause between steps to follow along a demo')
+    parser.add_argument('--ingest', choices=INGEST_MODES, default='columnar', help='how to read the case database')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='rows per block for the chunked ingest')
+    parser.add_argument('--render-workers', type=int, default=1,
+                        help='processes to render the PDF pages with (0 uses every core)')
+    parser.add_argument('--page-cache', metavar='FOLDER', help='cache rendered pages and only render changed pages')
+    parser.add_argument('--aggregate-cache', metavar='FOLDER', help='save the counts of each database to reuse them')
+    parser.add_argument('--aggregate-cache-mb', type=int, default=AGGREGATE_CACHE_MAX_BYTES // (1024 * 1024),
+                        help='size of the aggregate cache in MB')
+    parser.add_argument('--clear-aggregate-cache', action='store_true', help='delete the saved counts on startup')
+    parser.add_argument('--incremental', metavar='FOLDER',
+                        help='remember how far each database was read and only read appended rows next time')
+    parser.add_argument('--spool', metavar='FOLDER',
+                        help='take requests from a spool folder (one file per request) instead of chart_service.txt')
+    parser.add_argument('--socket', metavar='SOCKET', nargs='?', const=CHART_SOCKET_PATH,
+                        help=f'take requests over a Unix domain socket (default {CHART_SOCKET_PATH}) instead')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='processes creating charts for --spool and --socket (0 uses every core)')
+    args = parser.parse_args()
+
+    aggregate_cache = None
+    if args.aggregate_cache and args.incremental:
+        print('--aggregate-cache is not used with --incremental, the incremental counts are saved already')
+    elif args.aggregate_cache:
+        aggregate_cache = AggregateCache(args.aggregate_cache, args.aggregate_cache_mb * 1024 * 1024)
+        if args.clear_aggregate_cache:
+            aggregate_cache.invalidate()
+
+    chart_options = dict(
+        headless=args.headless,
+        demo_pacing=args.demo_pacing,
+        ingest=args.ingest,
+        chunk_rows=args.chunk_rows,
+        render_workers=args.render_workers or os.cpu_count(),
+        page_cache_directory=args.page_cache,
+        aggregate_cache=aggregate_cache,
+        incremental_ingest=IncrementalIngest(args.incremental, args.chunk_rows) if args.incremental else None
+    )
+
+    print('Chart Mircroservice is running...')
+    if args.spool:
+        SpoolDispatcher(args.spool, args.workers or os.cpu_count(), **chart_options).run()
+    elif args.socket:
+        SocketDispatcher(args.socket, args.workers or os.cpu_count(), **chart_options).run()
+    else:
+        RequestDispatcher('chart_service.txt', **chart_options).run()
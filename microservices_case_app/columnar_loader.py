@@ -0,0 +1,156 @@
+import csv
+from itertools import islice
+from operator import itemgetter
+import numpy as np
+from outcome_aggregator import (
+    OutcomeAggregator, HOSPITAL, DOCTOR, TOTAL,
+    DOCTOR_COLUMN, HOSPITAL_COLUMN, IMPLANT_MONTH_COLUMN, OUTCOME_COLUMN
+)
+
+# number of rows read at a time when streaming the case database in chunks
+CHUNK_ROWS = 100000
+
+
+def read_chart_columns(csv_rows):
+    """
+    Keep only the doctor, hospital, implant month and outcome columns of the case database rows
+    :param csv_rows: iterable of case database rows (without headers)
+    :return: tuple of four columns (doctors, hospitals, implant months, outcomes) as lists of strings
+    """
+    get_columns = itemgetter(DOCTOR_COLUMN, HOSPITAL_COLUMN, IMPLANT_MONTH_COLUMN, OUTCOME_COLUMN)
+    rows = list(map(get_columns, csv_rows))
+    # split the rows into columns (one C level pass per column)
+    return tuple(list(map(itemgetter(column), rows)) for column in range(4))
+
+
+def factorize(values):
+    """
+    Convert a column of strings to integer codes. Each distinct value is capitalized (.title()) once and
+    values that capitalize the same share a code. Codes are numbered in the order the values were first seen.
+    :param values: sequence of strings
+    :return: list of capitalized labels (index is the code), numpy array of codes (one per value)
+    """
+    labels = []
+    label_codes = {}
+    raw_codes = {}
+    # dict.fromkeys keeps the distinct values in first seen order, so the label codes keep that order
+    for raw_value in dict.fromkeys(values):
+        label = raw_value.title()
+        code = label_codes.get(label)
+        if code is None:
+            code = label_codes[label] = len(labels)
+            labels.append(label)
+        raw_codes[raw_value] = code
+    codes = np.fromiter(map(raw_codes.__getitem__, values), dtype=np.intp, count=len(values))
+    return labels, codes
+
+
+def count_matrix(entity_codes, month_codes, outcome_codes, shape):
+    """
+    Count outcomes by entity and month with a single bincount
+    :param entity_codes: entity code per case (None for the month totals)
+    :param month_codes: month code per case
+    :param outcome_codes: outcome code per case
+    :param shape: (entities, months, outcomes) or (months, outcomes) for the month totals
+    :return: numpy array of counts with the provided shape
+    """
+    flat_index = month_codes * shape[-1] + outcome_codes
+    if entity_codes is not None:
+        flat_index += entity_codes * (shape[-2] * shape[-1])
+    return np.bincount(flat_index, minlength=int(np.prod(shape))).reshape(shape)
+
+
+def add_count_matrix(aggregator, dimension, entities, counts):
+    """
+    Add the non zero counts of a (entities, months, outcomes) matrix to the aggregator
+    :param aggregator: OutcomeAggregator to add the counts to
+    :param dimension: HOSPITAL, DOCTOR or TOTAL
+    :param entities: entity labels (index is the entity code)
+    :param counts: numpy array of counts
+    :return: none
+    """
+    months = list(aggregator.implant_months)
+    outcomes = list(aggregator.outcomes)
+    entity_index, month_index, outcome_index = np.nonzero(counts)
+    values = counts[entity_index, month_index, outcome_index].tolist()
+    for entity, month, outcome, value in zip(entity_index.tolist(), month_index.tolist(), outcome_index.tolist(),
+                                             values):
+        aggregator.counts[(dimension, entities[entity], months[month], outcomes[outcome])] += value
+
+
+def aggregate_columns(doctor_column, hospital_column, month_column, outcome_column):
+    """
+    Count the outcomes by month for doctors, hospitals and months from the chart columns
+    :return: OutcomeAggregator with the counts (same result as counting row by row)
+    """
+    aggregator = OutcomeAggregator()
+    if not doctor_column:
+        return aggregator
+
+    # factorize the columns to integer codes once
+    doctors, doctor_codes = factorize(doctor_column)
+    hospitals, hospital_codes = factorize(hospital_column)
+    implant_months, month_codes = factorize(month_column)
+    outcomes, outcome_codes = factorize(outcome_column)
+    aggregator.doctors.update(doctors)
+    aggregator.hospitals.update(hospitals)
+    aggregator.implant_months.update(implant_months)
+    aggregator.outcomes.update(outcomes)
+
+    # build the entity x month x outcome count matrices
+    month_shape = (len(implant_months), len(outcomes))
+    hospital_counts = count_matrix(hospital_codes, month_codes, outcome_codes, (len(hospitals),) + month_shape)
+    doctor_counts = count_matrix(doctor_codes, month_codes, outcome_codes, (len(doctors),) + month_shape)
+    month_counts = count_matrix(None, month_codes, outcome_codes, month_shape)
+
+    add_count_matrix(aggregator, HOSPITAL, hospitals, hospital_counts)
+    add_count_matrix(aggregator, DOCTOR, doctors, doctor_counts)
+    add_count_matrix(aggregator, TOTAL, [TOTAL], month_counts[np.newaxis])
+    return aggregator
+
+
+def load_case_database_columnar(inputCSVFile):
+    """
+    Reads the doctor, hospital, implant month and outcome columns of the case database csv and counts the
+    outcomes by month with numpy instead of row by row
+    :param inputCSVFile: case database csv file with data (path to file)
+    :return: OutcomeAggregator with the counts
+    """
+    with open(inputCSVFile, 'r') as csv_data:
+        # skip headers
+        next(csv_data)
+        columns = read_chart_columns(csv.reader(csv_data, delimiter=','))
+    return aggregate_columns(*columns)
+
+
+def aggregate_rows_chunked(csv_rows, chunk_rows=CHUNK_ROWS, aggregator=None):
+    """
+    Counts case database rows in blocks with numpy and merges each block into the aggregator
+    :param csv_rows: iterable of case database rows (without headers)
+    :param chunk_rows: number of rows per block
+    :param aggregator: OutcomeAggregator to add the counts to (a new one if None)
+    :return: OutcomeAggregator with the counts
+    """
+    if aggregator is None:
+        aggregator = OutcomeAggregator()
+    while True:
+        chunk = read_chart_columns(islice(csv_rows, chunk_rows))
+        if not chunk[0]:
+            break
+        # merging in file order keeps the first seen order of doctors, hospitals and months
+        aggregator.merge(aggregate_columns(*chunk))
+    return aggregator
+
+
+def load_case_database_chunked(inputCSVFile, chunk_rows=CHUNK_ROWS):
+    """
+    Streams the case database csv in blocks of rows, counts each block with numpy and merges the counts.
+    Memory stays bounded by the block size and the number of distinct doctors, hospitals and months.
+    :param inputCSVFile: case database csv file with data (path to file)
+    :param chunk_rows: number of rows per block
+    :return: OutcomeAggregator with the counts
+    """
+    with open(inputCSVFile, 'r') as csv_data:
+        # skip headers
+        next(csv_data)
+        return aggregate_rows_chunked(csv.reader(csv_data, delimiter=','), chunk_rows)
@@ -0,0 +1 @@
+# the tests import the chart service modules from the microservices_case_app directory
@@ -0,0 +1,273 @@
+import asyncio
+import contextlib
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+import weakref
+
+# watchers shared by the coroutines waiting for changes in a directory (directory -> SharedWatcher, per event loop)
+_shared_watchers = weakref.WeakKeyDictionary()
+
+
+class FileWatcher:
+    """Watches a directory for file changes (inotify on Linux, otherwise falls back to polling)"""
+
+    # inotify event flags (see: https://man7.org/linux/man-pages/man7/inotify.7.html)
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    # inotify event header: watch descriptor, mask, cookie, length of the name that follows
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directory, poll_interval=0.05, max_poll_interval=1.0) -> None:
+        """Start watching the provided directory, polling intervals are only used without inotify"""
+        self._directory = directory
+        self._poll_interval = poll_interval
+        self._min_poll_interval = poll_interval
+        self._max_poll_interval = max_poll_interval
+        self._fd = self._init_inotify(directory)
+        self._snapshot = {} if self._fd is not None else self._take_snapshot()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _init_inotify(self, directory):
+        """Create an inotify watch on the directory, returns the file descriptor or None if unavailable"""
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            return None
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        # if the directory cannot be watched (e.g. network filesystem) then close and poll instead
+        if libc.inotify_add_watch(fd, os.fsencode(directory), self.WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def uses_inotify(self):
+        """Returns True if the watcher is event driven, False if it is polling"""
+        return self._fd is not None
+
+    def fileno(self):
+        """Returns the inotify file descriptor (None when polling) so it can be used with select/asyncio"""
+        return self._fd
+
+    def _take_snapshot(self):
+        """Get the modified time and size of every file in the directory"""
+        snapshot = {}
+        try:
+            with os.scandir(self._directory) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    def read_events(self):
+        """Read pending inotify events without blocking and return the names of the changed files"""
+        names = []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        header_size = self.EVENT_HEADER.size
+        # each event is a fixed header followed by a null padded file name
+        while offset < len(data):
+            wd, mask, cookie, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += header_size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def poll_changes(self):
+        """Compare the directory against the last snapshot and return the names of the changed files"""
+        snapshot = self._take_snapshot()
+        names = [name for name, stat in snapshot.items() if self._snapshot.get(name) != stat]
+        self._snapshot = snapshot
+        return names
+
+    def wait(self, timeout=None):
+        """
+        Block until a file in the directory changes or the timeout (seconds) passes
+        :return: list of changed file names (empty if the timeout passed)
+        """
+        if self._fd is not None:
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+            return self.read_events() if readable else []
+
+        # no inotify so poll, backing off while nothing changes and resetting once something does
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            names, sleep_for = self._poll_step(deadline)
+            if names or sleep_for is None:
+                return names
+            time.sleep(sleep_for)
+
+    async def wait_async(self, timeout=None):
+        """
+        Same as wait but suspends the coroutine instead of blocking, so other requests keep running on the event loop
+        :return: list of changed file names (empty if the timeout passed)
+        """
+        if self._fd is not None:
+            loop = asyncio.get_running_loop()
+            readable = loop.create_future()
+            # the reader callback can run again before it is removed, only the first call sets the result
+            loop.add_reader(self._fd, lambda: readable.done() or readable.set_result(None))
+            try:
+                await asyncio.wait_for(readable, timeout)
+            except asyncio.TimeoutError:
+                return []
+            finally:
+                loop.remove_reader(self._fd)
+            return self.read_events()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            names, sleep_for = self._poll_step(deadline)
+            if names or sleep_for is None:
+                return names
+            await asyncio.sleep(sleep_for)
+
+    def _poll_step(self, deadline):
+        """Poll once, returns the changed file names and how long to sleep before polling again (None if timed out)"""
+        names = self.poll_changes()
+        if names:
+            self._poll_interval = self._min_poll_interval
+            return names, None
+        sleep_for = self._poll_interval
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return [], None
+            sleep_for = min(sleep_for, remaining)
+        self._poll_interval = min(self._poll_interval * 2, self._max_poll_interval)
+        return [], sleep_for
+
+    def close(self):
+        """Stop watching the directory"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class SharedWatcher:
+    """
+    One FileWatcher of a directory shared by every coroutine of an event loop waiting for changes in it: a single task
+    waits for the changes and wakes every waiting coroutine, instead of one inotify instance per request attempt
+    """
+
+    def __init__(self, directory) -> None:
+        """Start watching the provided directory (on the running event loop)"""
+        loop = asyncio.get_running_loop()
+        self._watcher = FileWatcher(directory)
+        # number of coroutines using the watcher
+        self.users = 0
+        # set to the changed file names at the next change, then replaced for the change after it
+        self._change = loop.create_future()
+        self._task = loop.create_task(self._watch())
+        # closed once the task is done, so the reader of the watcher is removed before its file descriptor is closed
+        self._task.add_done_callback(lambda task: self._watcher.close())
+
+    async def _watch(self):
+        """Wait for changes and wake the coroutines waiting for them, until the watcher is closed"""
+        while True:
+            names = await self._watcher.wait_async()
+            change, self._change = self._change, asyncio.get_running_loop().create_future()
+            change.set_result(names)
+
+    async def wait_async(self, timeout=None):
+        """
+        Suspend the coroutine until a file in the directory changes or the timeout (seconds) passes
+        :return: list of changed file names (empty if the timeout passed)
+        """
+        try:
+            # shielded, a coroutine that stops waiting must not cancel the change the others wait for
+            return await asyncio.wait_for(asyncio.shield(self._change), timeout)
+        except asyncio.TimeoutError:
+            return []
+
+    def close(self):
+        """Stop watching the directory"""
+        self._task.cancel()
+
+
+@contextlib.contextmanager
+def shared_watcher(directory):
+    """
+    Use the watcher of a directory shared by the coroutines of the running event loop (created for the first one and
+    closed once the last one is done with it)
+    :param directory: directory to watch (path to folder)
+    :return: SharedWatcher
+    """
+    watchers = _shared_watchers.setdefault(asyncio.get_running_loop(), {})
+    directory = os.path.abspath(directory)
+    watcher = watchers.get(directory)
+    if watcher is None:
+        watcher = watchers[directory] = SharedWatcher(directory)
+    watcher.users += 1
+    try:
+        yield watcher
+    finally:
+        watcher.users -= 1
+        if not watcher.users:
+            del watchers[directory]
+            watcher.close()
+
+
+async def await_response(directory, send_request, read_response, timeout, retries=0, withdraw_request=None):
+    """
+    Send a request to a file pipe Microservice and wait for the response without blocking the event loop.
+    Every attempt waits up to timeout seconds, a request that timed out is withdrawn and sent again (retries times).
+    If the waiting coroutine is cancelled the request is withdrawn and the cancellation is passed on.
+    :param directory: directory the response is written to (watched for changes)
+    :param send_request: function that sends the request and returns a token for it (called for every attempt)
+    :param read_response: function that takes the token and returns the response, or None if it is not there yet
+    :param timeout: seconds to wait for the response of each attempt
+    :param retries: number of times to send the request again after a timeout
+    :param withdraw_request: function that takes the token of a request that is no longer waited for (optional)
+    :return: the response
+    :raises TimeoutError: if no attempt got a response in time
+    """
+    # watch before sending so a fast response cannot be missed, with the watcher of every request waiting in the
+    # directory (one inotify instance for all of them and all their attempts)
+    with shared_watcher(directory) as watcher:
+        for attempt in range(retries + 1):
+            token = send_request()
+            deadline = time.monotonic() + timeout
+            try:
+                response = read_response(token)
+                while response is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    await watcher.wait_async(remaining)
+                    response = read_response(token)
+            except asyncio.CancelledError:
+                if withdraw_request is not None:
+                    withdraw_request(token)
+                raise
+            if response is not None:
+                return response
+            if withdraw_request is not None:
+                withdraw_request(token)
+    raise TimeoutError(f'No response after {retries + 1} attempt(s) of {timeout} seconds')
@@ -0,0 +1,149 @@
+import csv
+import hashlib
+import os
+import pickle
+import zlib
+from atomic_file import write_atomic
+from columnar_loader import aggregate_rows_chunked, CHUNK_ROWS
+from outcome_aggregator import OutcomeAggregator
+
+# number of bytes hashed at the start of the database and just before the last read offset to detect rewrites
+CHECK_BYTES = 64 * 1024
+
+
+def read_complete_lines(binary_file, position):
+    """
+    Yield the decoded lines of a file that end with a line break, stopping at the last line if it has no line break
+    :param binary_file: file opened in binary mode at the offset to read from
+    :param position: one item list with the byte offset, moved past every yielded line
+    :return: generator of lines
+    """
+    for line in binary_file:
+        if not line.endswith(b'\n'):
+            break
+        position[0] += len(line)
+        yield line.decode('utf-8')
+
+
+def hash_range(binary_file, start, end):
+    """
+    Hash the bytes of a file between start and end
+    :return: hex digest
+    """
+    binary_file.seek(start)
+    return hashlib.blake2b(binary_file.read(end - start), digest_size=20).hexdigest()
+
+
+class IncrementalIngest:
+    """
+    Remembers how far each case database was read and the counts so far. Case exports are append only, so when a
+    database has only grown just the new rows at the end are read and merged into the saved counts. If the database
+    was truncated, replaced by a new file or rewritten at the start or just before the last read offset it is read
+    again from the start.
+
+    Only the first and last CHECK_BYTES of the bytes already read are compared, so a database edited in place in
+    the middle (same file, not shorter, start and end unchanged) keeps its old counts for the edited rows. Call
+    invalidate after editing a database in place.
+    """
+
+    def __init__(self, state_directory, chunk_rows=CHUNK_ROWS):
+        """
+        :param state_directory: folder to save the read offsets and counts in (path to folder)
+        :param chunk_rows: number of rows counted at a time
+        """
+        self._state_directory = state_directory
+        self._chunk_rows = chunk_rows
+        os.makedirs(state_directory, exist_ok=True)
+        # how the last database was loaded: 'unchanged', 'appended' or 'rebuilt'
+        self.last_mode = None
+
+    def _state_file_path(self, database_csv):
+        """Path of the file with the saved offset and counts for the database"""
+        key = os.path.abspath(database_csv).encode('utf-8')
+        return os.path.join(self._state_directory, f'{hashlib.blake2b(key, digest_size=20).hexdigest()}.inc')
+
+    def _read_state(self, database_csv):
+        """Get the saved state of the database, or None if there is none (or it cannot be read)"""
+        try:
+            with open(self._state_file_path(database_csv), 'rb') as state_file:
+                return pickle.loads(zlib.decompress(state_file.read()))
+        except (FileNotFoundError, zlib.error, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _check_hashes(self, binary_file, offset):
+        """Hash the start of the database and the bytes just before the offset"""
+        head_hash = hash_range(binary_file, 0, min(offset, CHECK_BYTES))
+        boundary_hash = hash_range(binary_file, max(offset - CHECK_BYTES, 0), offset)
+        return head_hash, boundary_hash
+
+    def _is_appended(self, binary_file, stat, state):
+        """Checks the database only grew since it was last read (same file and the checked bytes that were read)"""
+        if stat.st_ino != state.get('inode') or stat.st_size < state['offset']:
+            return False
+        return self._check_hashes(binary_file, state['offset']) == (state['head_hash'], state['boundary_hash'])
+
+    def load(self, database_csv):
+        """
+        Count the case database, only reading the rows appended since the last time when possible
+        :param database_csv: case database csv file (path to file)
+        :return: OutcomeAggregator with the counts
+        """
+        stat = os.stat(database_csv)
+        state = self._read_state(database_csv)
+
+        with open(database_csv, 'rb') as binary_file:
+            if state is not None and (stat.st_ino, stat.st_size, stat.st_mtime_ns) == (
+                    state.get('inode'), state['size'], state['mtime_ns']):
+                # nothing changed since the last read
+                self.last_mode = 'unchanged'
+                aggregator = OutcomeAggregator.from_state(state['aggregator'])
+                position = [state['offset']]
+            else:
+                if state is not None and self._is_appended(binary_file, stat, state):
+                    self.last_mode = 'appended'
+                    aggregator = OutcomeAggregator.from_state(state['aggregator'])
+                    position = [state['offset']]
+                    binary_file.seek(position[0])
+                else:
+                    self.last_mode = 'rebuilt'
+                    aggregator = OutcomeAggregator()
+                    binary_file.seek(0)
+                    # skip headers
+                    position = [len(binary_file.readline())]
+
+                rows = csv.reader(read_complete_lines(binary_file, position), delimiter=',')
+                aggregate_rows_chunked(rows, self._chunk_rows, aggregator)
+                self._save_state(database_csv, binary_file, stat, position[0], aggregator)
+
+            # the last line may not end with a line break (yet), count it without saving it in the state
+            binary_file.seek(position[0])
+            last_line = binary_file.read().decode('utf-8')
+            if last_line:
+                aggregator.add_rows(csv.reader([last_line], delimiter=','))
+        return aggregator
+
+    def _save_state(self, database_csv, binary_file, stat, offset, aggregator):
+        """Save how far the database was read with the counts up to that offset"""
+        head_hash, boundary_hash = self._check_hashes(binary_file, offset)
+        state = {
+            'offset': offset,
+            'inode': stat.st_ino,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'head_hash': head_hash,
+            'boundary_hash': boundary_hash,
+            'aggregator': aggregator.to_state(),
+        }
+        write_atomic(self._state_file_path(database_csv),
+                     zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 1))
+
+    def invalidate(self, database_csv):
+        """
+        Forget the saved offset and counts of a database so it is read from the start next time
+        :param database_csv: case database csv file (path to file)
+        :return: none
+        """
+        try:
+            os.remove(self._state_file_path(database_csv))
+        except FileNotFoundError:
+            pass
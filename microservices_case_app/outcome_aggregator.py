@@ -0,0 +1,180 @@
+from array import array
+from collections import Counter
+
+# columns of the case database csv used for the charts
+DOCTOR_COLUMN = 1
+HOSPITAL_COLUMN = 2
+IMPLANT_MONTH_COLUMN = 9
+OUTCOME_COLUMN = 18
+
+# dimensions the outcomes are counted by, the total dimension has a single entity for the whole database
+HOSPITAL = 'Hospital'
+DOCTOR = 'Doctor'
+TOTAL = 'Total'
+DIMENSIONS = (HOSPITAL, DOCTOR, TOTAL)
+
+
+class OrderedSet:
+    """Set of values that remembers the order the values were first seen in (hash backed, O(1) add/lookup)"""
+
+    def __init__(self, values=()):
+        # dicts keep insertion order, the values are not used
+        self._values = dict.fromkeys(values)
+
+    def add(self, value):
+        """Add the value if it has not been seen yet (keeps the original position otherwise)"""
+        self._values[value] = None
+
+    def update(self, values):
+        """Add every value in order"""
+        self._values.update(dict.fromkeys(values))
+
+    def __contains__(self, value):
+        return value in self._values
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        return isinstance(other, OrderedSet) and list(self) == list(other)
+
+    def __repr__(self):
+        return f'OrderedSet({list(self._values)})'
+
+
+class OutcomeAggregator:
+    """
+    Counts outcomes by month for hospitals, doctors and the total of the case database in a single pass.
+    Counts are kept in one flat counter keyed by (dimension, entity, month, outcome).
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.hospitals = OrderedSet()
+        self.doctors = OrderedSet()
+        self.implant_months = OrderedSet()
+        self.outcomes = OrderedSet()
+
+    def add_case(self, doctor, hospital, implant_month, outcome, count=1):
+        """
+        Count a case (or count cases with the same values) for the hospital, doctor and month totals
+        :param doctor: doctor name (already normalised)
+        :param hospital: hospital name (already normalised)
+        :param implant_month: month of the implant (already normalised)
+        :param outcome: outcome of the case (already normalised)
+        :param count: number of cases to add
+        :return: none
+        """
+        counts = self.counts
+        counts[(HOSPITAL, hospital, implant_month, outcome)] += count
+        counts[(DOCTOR, doctor, implant_month, outcome)] += count
+        counts[(TOTAL, TOTAL, implant_month, outcome)] += count
+        # remember first seen order for the charts
+        self.doctors.add(doctor)
+        self.hospitals.add(hospital)
+        self.implant_months.add(implant_month)
+        self.outcomes.add(outcome)
+
+    def add_rows(self, rows):
+        """
+        Count every row of the case database (rows as lists of strings from csv.reader)
+        :param rows: iterable of case database rows (without headers)
+        :return: none
+        """
+        add_case = self.add_case
+        for row in rows:
+            # capitalize strings to help with duplicates
+            add_case(
+                row[DOCTOR_COLUMN].title(),
+                row[HOSPITAL_COLUMN].title(),
+                row[IMPLANT_MONTH_COLUMN].title(),
+                row[OUTCOME_COLUMN].title()
+            )
+
+    def merge(self, other):
+        """
+        Merge the counts of another aggregator into this one (entities keep this aggregator's order first)
+        :param other: OutcomeAggregator to merge in
+        :return: none
+        """
+        self.counts.update(other.counts)
+        self.hospitals.update(other.hospitals)
+        self.doctors.update(other.doctors)
+        self.implant_months.update(other.implant_months)
+        self.outcomes.update(other.outcomes)
+
+    def entities(self, dimension):
+        """Returns the entities of the dimension in first seen order"""
+        if dimension == HOSPITAL:
+            return self.hospitals
+        if dimension == DOCTOR:
+            return self.doctors
+        return [TOTAL]
+
+    def outcome_series(self, dimension, entity, outcome):
+        """
+        Get the number of outcomes for every month (in first seen order) for an entity
+        :param dimension: HOSPITAL, DOCTOR or TOTAL
+        :param entity: hospital or doctor name (TOTAL for the total dimension)
+        :param outcome: outcome to count, e.g. 'Good' or 'Bad'
+        :return: list of counts, one per month
+        """
+        counts = self.counts
+        return [counts.get((dimension, entity, month, outcome), 0) for month in self.implant_months]
+
+    def to_state(self):
+        """
+        Compact state of the aggregator that can be pickled: the entities in order and the counts as a flat
+        array of (dimension, entity, month, outcome, count) integer codes
+        :return: dictionary of the state
+        """
+        entity_codes = {dimension: {entity: code for code, entity in enumerate(self.entities(dimension))}
+                        for dimension in DIMENSIONS}
+        dimension_codes = {dimension: code for code, dimension in enumerate(DIMENSIONS)}
+        month_codes = {month: code for code, month in enumerate(self.implant_months)}
+        outcome_codes = {outcome: code for code, outcome in enumerate(self.outcomes)}
+        counts = array('q')
+        for (dimension, entity, month, outcome), count in self.counts.items():
+            if count:
+                counts.extend((dimension_codes[dimension], entity_codes[dimension][entity], month_codes[month],
+                               outcome_codes[outcome], count))
+        return {
+            'hospitals': list(self.hospitals),
+            'doctors': list(self.doctors),
+            'implant_months': list(self.implant_months),
+            'outcomes': list(self.outcomes),
+            'counts': counts,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Create an aggregator from the state returned by to_state
+        :param state: dictionary of the state
+        :return: OutcomeAggregator
+        """
+        aggregator = cls()
+        aggregator.hospitals.update(state['hospitals'])
+        aggregator.doctors.update(state['doctors'])
+        aggregator.implant_months.update(state['implant_months'])
+        aggregator.outcomes.update(state['outcomes'])
+        entities = [state['hospitals'], state['doctors'], [TOTAL]]
+        months, outcomes, codes = state['implant_months'], state['outcomes'], state['counts']
+        counts = aggregator.counts
+        # walk the flat array five codes at a time
+        for dimension, entity, month, outcome, count in zip(*[iter(codes)] * 5):
+            counts[(DIMENSIONS[dimension], entities[dimension][entity], months[month], outcomes[outcome])] = count
+        return aggregator
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, OutcomeAggregator)
+            and +self.counts == +other.counts
+            and self.hospitals == other.hospitals
+            and self.doctors == other.doctors
+            and self.implant_months == other.implant_months
+            and self.outcomes == other.outcomes
+        )
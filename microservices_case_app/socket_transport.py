@@ -0,0 +1,77 @@
+import os
+import socket
+import socketserver
+
+# bytes read from a connection at a time
+RECEIVE_BYTES = 64 * 1024
+
+
+def read_until_closed(connection):
+    """Read from the connection until the other side closes its sending side, returns the bytes read"""
+    chunks = []
+    while True:
+        chunk = connection.recv(RECEIVE_BYTES)
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+
+
+def send_request(socket_path, request, timeout=None):
+    """
+    Send a request to a Microservice over a Unix domain socket and wait for the response (one request per connection)
+    :param socket_path: socket file the Microservice listens on (path to file)
+    :param request: request text, the same lines that are written to the communication pipe file
+    :param timeout: seconds to wait for the response (None waits until the Microservice responds)
+    :return: response text
+    :raises OSError: if the Microservice is not listening (TimeoutError if it did not respond in time)
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(socket_path)
+        connection.sendall(request.encode('utf-8'))
+        # closing the sending side marks the end of the request
+        connection.shutdown(socket.SHUT_WR)
+        return read_until_closed(connection).decode('utf-8')
+
+
+def remove_stale_socket(socket_path):
+    """Remove a socket file left behind by a server that is no longer running"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.remove(socket_path)
+        except FileNotFoundError:
+            pass
+
+
+class RequestHandler(socketserver.BaseRequestHandler):
+    """Reads the request of a connection and sends back the response of the server"""
+
+    def handle(self):
+        request = read_until_closed(self.request).decode('utf-8')
+        # connections without a request (e.g. checking if the server is running) get no response
+        if request:
+            self.request.sendall(self.server.respond(request).encode('utf-8'))
+
+
+class RequestServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix domain socket server that answers one request per connection, each connection in its own thread"""
+    daemon_threads = True
+
+    def __init__(self, socket_path, respond) -> None:
+        """
+        :param socket_path: socket file to listen on (path to file)
+        :param respond: function that takes the request text and returns the response text
+        """
+        remove_stale_socket(socket_path)
+        self.respond = respond
+        super().__init__(socket_path, RequestHandler)
+
+    def server_close(self):
+        """Stop listening and remove the socket file"""
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,141 @@
+import os
+import uuid
+from atomic_file import write_atomic
+
+# folders inside the spool folder: new requests, requests being worked on and the responses
+REQUESTS_FOLDER = 'requests'
+PROCESSING_FOLDER = 'processing'
+RESPONSES_FOLDER = 'responses'
+REQUEST_EXTENSION = '.req'
+RESPONSE_EXTENSION = '.resp'
+
+
+def spool_folder(spool_directory, folder):
+    """
+    Get the path of a folder in the spool folder, creating it if it does not exist
+    :param spool_directory: spool folder (path to folder)
+    :param folder: REQUESTS_FOLDER, PROCESSING_FOLDER or RESPONSES_FOLDER
+    :return: path to the folder
+    """
+    path = os.path.join(spool_directory, folder)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def enqueue_request(spool_directory, database_csv):
+    """
+    Add a createChart request for the case database to the spool queue
+    :param spool_directory: spool folder (path to folder)
+    :param database_csv: case database csv file to create the charts from (path to file)
+    :return: request id, the response is written to <request id>.resp in the responses folder
+    """
+    request_id = uuid.uuid4().hex
+    request_file_path = os.path.join(spool_folder(spool_directory, REQUESTS_FOLDER), request_id + REQUEST_EXTENSION)
+    write_atomic(request_file_path, f'createChart\n{database_csv}\n'.encode('utf-8'))
+    return request_id
+
+
+def pending_requests(spool_directory):
+    """
+    Get the ids of the requests waiting in the spool queue, oldest first
+    :param spool_directory: spool folder (path to folder)
+    :return: list of request ids
+    """
+    requests = []
+    with os.scandir(spool_folder(spool_directory, REQUESTS_FOLDER)) as entries:
+        for entry in entries:
+            if entry.name.endswith(REQUEST_EXTENSION):
+                try:
+                    requests.append((entry.stat().st_mtime_ns, entry.name[:-len(REQUEST_EXTENSION)]))
+                except FileNotFoundError:
+                    continue
+    return [request_id for _, request_id in sorted(requests)]
+
+
+def claim_request(spool_directory, request_id):
+    """
+    Move a request to the processing folder so only one worker handles it
+    :param spool_directory: spool folder (path to folder)
+    :param request_id: id of the request
+    :return: (instruction, database csv, time the request was made) of the request, or None if it was already claimed
+    """
+    request_file_path = os.path.join(spool_directory, REQUESTS_FOLDER, request_id + REQUEST_EXTENSION)
+    processing_directory = spool_folder(spool_directory, PROCESSING_FOLDER)
+    processing_file_path = os.path.join(processing_directory, request_id + REQUEST_EXTENSION)
+    try:
+        os.rename(request_file_path, processing_file_path)
+    except FileNotFoundError:
+        return None
+    with open(processing_file_path, 'r') as file:
+        instruction = file.readline().strip()
+        database_csv = file.readline().strip()
+    # renaming keeps the modified time, so this is when the client wrote the request
+    return instruction, database_csv, os.stat(processing_file_path).st_mtime
+
+
+def requeue_unfinished_requests(spool_directory):
+    """
+    Move requests left in the processing folder (e.g. the service stopped while working on them) back to the queue
+    :param spool_directory: spool folder (path to folder)
+    :return: number of requests moved back
+    """
+    requests_directory = spool_folder(spool_directory, REQUESTS_FOLDER)
+    processing_directory = spool_folder(spool_directory, PROCESSING_FOLDER)
+    moved = 0
+    for name in os.listdir(processing_directory):
+        if name.endswith(REQUEST_EXTENSION):
+            os.rename(os.path.join(processing_directory, name), os.path.join(requests_directory, name))
+            moved += 1
+    return moved
+
+
+def write_response(spool_directory, request_id, response):
+    """
+    Write the response for a request and remove it from the processing folder
+    :param spool_directory: spool folder (path to folder)
+    :param request_id: id of the request
+    :param response: pdf file path, or an 'error: ...' message
+    :return: none
+    """
+    response_file_path = os.path.join(spool_folder(spool_directory, RESPONSES_FOLDER), request_id + RESPONSE_EXTENSION)
+    write_atomic(response_file_path, f'{response}\n'.encode('utf-8'))
+    try:
+        os.remove(os.path.join(spool_directory, PROCESSING_FOLDER, request_id + REQUEST_EXTENSION))
+    except FileNotFoundError:
+        pass
+
+
+def withdraw_request(spool_directory, request_id):
+    """
+    Remove a request that has not been claimed yet and its response if there is one (the client stopped waiting)
+    :param spool_directory: spool folder (path to folder)
+    :param request_id: id of the request
+    :return: True if the request was removed before a worker claimed it
+    """
+    removed = True
+    try:
+        os.remove(os.path.join(spool_directory, REQUESTS_FOLDER, request_id + REQUEST_EXTENSION))
+    except FileNotFoundError:
+        removed = False
+    try:
+        os.remove(os.path.join(spool_directory, RESPONSES_FOLDER, request_id + RESPONSE_EXTENSION))
+    except FileNotFoundError:
+        pass
+    return removed
+
+
+def read_response(spool_directory, request_id):
+    """
+    Read and remove the response for a request
+    :param spool_directory: spool folder (path to folder)
+    :param request_id: id of the request
+    :return: the response, or None if it has not been written yet
+    """
+    response_file_path = os.path.join(spool_directory, RESPONSES_FOLDER, request_id + RESPONSE_EXTENSION)
+    try:
+        with open(response_file_path, 'r') as file:
+            response = file.readline().strip()
+    except FileNotFoundError:
+        return None
+    os.remove(response_file_path)
+    return response
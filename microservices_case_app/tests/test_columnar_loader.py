@@ -0,0 +1,33 @@
+from chart_service import aggregate_case_database
+from columnar_loader import load_case_database_columnar, load_case_database_chunked
+from outcome_aggregator import DOCTOR
+
+HEADER = ','.join(['Case_Id', 'Doctor', 'Hospital'] + [''] * 6 + ['Implant Month'] + [''] * 8 + ['Outcome'])
+
+
+def case_row(case_id, doctor, hospital, month, outcome):
+    return ','.join([str(case_id), doctor, hospital] + [''] * 6 + [month] + [''] * 8 + [outcome])
+
+
+def write_case_database(path, rows):
+    path.write_text('\n'.join([HEADER] + [case_row(case_id, *row) for case_id, row in enumerate(rows, 1)]) + '\n')
+    return path
+
+
+def test_columnar_and_chunked_ingest_match_the_row_path(tmp_path):
+    # Adams has rows on both sides of the first chunk boundary (after row 3)
+    database_csv = write_case_database(tmp_path / 'case_database.csv', [
+        ('Roberts', 'Regional MC', 'Jan', 'Bad'),
+        ('Adams', 'City General', 'Jan', 'Good'),
+        ('Adams', 'City General', 'Feb', 'Good'),
+        ('Adams', 'Regional MC', 'Feb', 'Bad'),
+        ('Adams', 'City General', 'Mar', 'Good'),
+        ('Roberts', 'Regional MC', 'Mar', 'Neutral'),
+        ('Chen', 'City General', 'Jan', 'Good'),
+    ])
+    rows = aggregate_case_database(database_csv)
+    assert load_case_database_columnar(database_csv) == rows
+    assert load_case_database_chunked(database_csv, chunk_rows=3) == rows
+    assert load_case_database_chunked(database_csv, chunk_rows=1) == rows
+    assert list(rows.entities(DOCTOR)) == ['Roberts', 'Adams', 'Chen']
+    assert list(rows.outcome_series(DOCTOR, 'Adams', 'Good')) == [1, 1, 1]
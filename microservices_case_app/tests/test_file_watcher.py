@@ -0,0 +1,44 @@
+import asyncio
+import itertools
+import file_watcher
+from file_watcher import FileWatcher, await_response
+
+
+def test_requests_waiting_in_a_directory_share_one_watcher(tmp_path, monkeypatch):
+    watchers = []
+
+    class CountedWatcher(FileWatcher):
+        def __init__(self, directory, *args, **kwargs) -> None:
+            super().__init__(directory, *args, **kwargs)
+            watchers.append(self)
+
+    monkeypatch.setattr(file_watcher, 'FileWatcher', CountedWatcher)
+    request_ids = itertools.count()
+
+    def send_request():
+        return next(request_ids)
+
+    def read_response(request_id):
+        try:
+            return (tmp_path / f'{request_id}.txt').read_text() or None
+        except FileNotFoundError:
+            return None
+
+    async def respond():
+        await asyncio.sleep(0.05)
+        for request_id in range(4):
+            (tmp_path / f'{request_id}.txt').write_text(f'response {request_id}')
+        # after the first attempt of the retried request timed out
+        await asyncio.sleep(0.1)
+        (tmp_path / 'retried.txt').write_text('response retried')
+
+    async def requests():
+        responses = asyncio.gather(
+            *[await_response(tmp_path, send_request, read_response, 5) for _ in range(4)],
+            await_response(tmp_path, lambda: 'retried', read_response, 0.1, retries=1))
+        return (await asyncio.gather(responses, respond()))[0]
+
+    assert asyncio.run(requests()) == [f'response {request_id}' for request_id in range(4)] + ['response retried']
+    assert len(watchers) == 1
+    # closed once the last request got its response
+    assert watchers[0].fileno() is None
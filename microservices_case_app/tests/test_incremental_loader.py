@@ -0,0 +1,91 @@
+import os
+import incremental_loader
+from columnar_loader import load_case_database_columnar
+from incremental_loader import IncrementalIngest
+from test_columnar_loader import HEADER, case_row
+
+ROWS = [
+    ('Roberts', 'Regional MC', 'Jan', 'Bad'),
+    ('Adams', 'City General', 'Jan', 'Good'),
+    ('Adams', 'City General', 'Feb', 'Good'),
+]
+
+
+def csv_text(rows, first_case_id=1):
+    return ''.join(case_row(case_id, *row) + '\n' for case_id, row in enumerate(rows, first_case_id))
+
+
+def write_database(path, rows):
+    path.write_text(HEADER + '\n' + csv_text(rows))
+
+
+def test_appended_rows_are_merged_into_the_saved_counts(tmp_path):
+    database_csv = tmp_path / 'case_database.csv'
+    write_database(database_csv, ROWS)
+    ingest = IncrementalIngest(tmp_path / 'state', chunk_rows=2)
+    assert ingest.load(database_csv) == load_case_database_columnar(database_csv)
+    assert ingest.last_mode == 'rebuilt'
+
+    assert ingest.load(database_csv) == load_case_database_columnar(database_csv)
+    assert ingest.last_mode == 'unchanged'
+
+    with open(database_csv, 'a') as csv_file:
+        csv_file.write(csv_text([('Chen', 'Regional MC', 'Mar', 'Good')], len(ROWS) + 1))
+    assert ingest.load(database_csv) == load_case_database_columnar(database_csv)
+    assert ingest.last_mode == 'appended'
+
+
+def test_last_line_without_line_break_is_counted_and_read_again(tmp_path):
+    database_csv = tmp_path / 'case_database.csv'
+    write_database(database_csv, ROWS)
+    with open(database_csv, 'a') as csv_file:
+        csv_file.write(case_row(4, 'Chen', 'Regional MC', 'Mar', 'Go'))
+    ingest = IncrementalIngest(tmp_path / 'state')
+    assert ingest.load(database_csv) == load_case_database_columnar(database_csv)
+
+    # the rest of the half written row arrives
+    with open(database_csv, 'a') as csv_file:
+        csv_file.write('od\n')
+    assert ingest.load(database_csv) == load_case_database_columnar(database_csv)
+    assert ingest.last_mode == 'appended'
+
+
+def test_truncated_database_is_read_again(tmp_path):
+    database_csv = tmp_path / 'case_database.csv'
+    write_database(database_csv, ROWS)
+    ingest = IncrementalIngest(tmp_path / 'state')
+    ingest.load(database_csv)
+
+    write_database(database_csv, ROWS[:1])
+    assert ingest.load(database_csv) == load_case_database_columnar(database_csv)
+    assert ingest.last_mode == 'rebuilt'
+
+
+def test_replaced_database_is_read_again(tmp_path, monkeypatch):
+    # only check the header and the last row, so the changed row is in the unchecked middle
+    monkeypatch.setattr(incremental_loader, 'CHECK_BYTES', 16)
+    database_csv = tmp_path / 'case_database.csv'
+    write_database(database_csv, ROWS)
+    ingest = IncrementalIngest(tmp_path / 'state')
+    ingest.load(database_csv)
+
+    # a new export of the same size, with a changed row in the middle, moved over the old one
+    new_csv = tmp_path / 'new_export.csv'
+    write_database(new_csv, [ROWS[0], ('Adams', 'City General', 'Jan', 'Bad!'), ROWS[2]])
+    os.replace(new_csv, database_csv)
+    assert ingest.load(database_csv) == load_case_database_columnar(database_csv)
+    assert ingest.last_mode == 'rebuilt'
+
+
+def test_invalidate_reads_a_database_edited_in_place_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(incremental_loader, 'CHECK_BYTES', 16)
+    database_csv = tmp_path / 'case_database.csv'
+    write_database(database_csv, ROWS)
+    ingest = IncrementalIngest(tmp_path / 'state')
+    ingest.load(database_csv)
+
+    with open(database_csv, 'r+') as csv_file:
+        csv_file.write(HEADER + '\n' + csv_text([ROWS[0], ('Adams', 'City General', 'Jan', 'Bad!'), ROWS[2]]))
+    ingest.invalidate(database_csv)
+    assert ingest.load(database_csv) == load_case_database_columnar(database_csv)
+    assert ingest.last_mode == 'rebuilt'
@@ -0,0 +1,176 @@
+import json
+import os
+from microservices_case_app.atomic_file import write_atomic
+from item_list import ItemList
+
+# directory the planner saves its trips in when started from the command line
+SAVE_DIRECTORY = './saved_trips'
+# file in the save directory holding the id of the trip the planner was last using
+ACTIVE_TRIP_FILE = 'active_trip.txt'
+TRIP_FILE_SUFFIX = '.trip'
+JOURNAL_FILE_SUFFIX = '.journal'
+# version of the trip file format, files of another version are not loaded
+TRIP_FILE_VERSION = 1
+# planner attributes saved as values of the header line, read as soon as a trip is loaded
+HEADER_ATTRIBUTES = ('_trip_name', '_start_date', '_end_date', '_from_location', '_to_location', '_target_budget',
+                     '_currency_pair', '_fx_rate', '_target_budget_converted')
+# planner attributes (dictionaries of items) saved as sections after the header, read the first time they are used
+SECTION_ATTRIBUTES = ('_travel_itinerary', '_packing_list', '_travel_budget', '_contacts', '_fx_rates')
+
+
+def encode_section(items):
+    """Encode a dictionary of items as compact json [key, value] pairs (keeps the item numbers as numbers)"""
+    return json.dumps(list(items.items()), separators=(',', ':')).encode('utf-8')
+
+
+def decode_section(data, section_type=dict):
+    """Decode the dictionary of items of an encoded section (as a section_type, e.g. an ItemList)"""
+    items = ((key, value) for key, value in json.loads(data))
+    if issubclass(section_type, ItemList):
+        section = section_type()
+        section.load_items(items)
+        return section
+    return section_type(items)
+
+
+class LazySection:
+    """
+    Planner attribute that holds a section of a loaded trip: the section is only decoded the first time the
+    attribute is used, after that the attribute is a plain instance attribute (no lookup cost)
+    """
+
+    def __init__(self, section_type=dict) -> None:
+        """
+        :param section_type: dictionary type of the section (e.g. ItemList)
+        """
+        self._section_type = section_type
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, planner, owner=None):
+        if planner is None:
+            return self
+        data = planner._pending_sections.pop(self._name, None)
+        items = self._section_type() if data is None else decode_section(data, self._section_type)
+        planner.__dict__[self._name] = items
+        return items
+
+
+class PlannerStore:
+    """
+    Saves the trips of the planner in a directory, one file per trip: a json header line with the trip details and
+    where every section starts, followed by the encoded sections. Files are replaced atomically so a crash while
+    saving never leaves half a trip, and loading a trip only reads its file, however many trips are saved.
+    """
+
+    def __init__(self, directory=SAVE_DIRECTORY) -> None:
+        """
+        :param directory: directory to save the trips in (created if needed)
+        """
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def trip_file(self, trip_id):
+        """Returns the file a trip is saved in (path to file)"""
+        return os.path.join(self._directory, trip_id + TRIP_FILE_SUFFIX)
+
+    def journal_file(self, trip_id):
+        """Returns the file the edits of a trip are journaled in until the trip is saved again (path to file)"""
+        return os.path.join(self._directory, trip_id + JOURNAL_FILE_SUFFIX)
+
+    def active_trip(self):
+        """Returns the id of the trip the planner was last using, None if no trip was saved"""
+        try:
+            with open(os.path.join(self._directory, ACTIVE_TRIP_FILE), 'r') as active_file:
+                return active_file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_active_trip(self, trip_id):
+        """Remember the trip the planner is using so it is loaded at the next start"""
+        write_atomic(os.path.join(self._directory, ACTIVE_TRIP_FILE), trip_id)
+
+    def trip_ids(self):
+        """Returns the ids of every saved trip"""
+        return [file_name[:-len(TRIP_FILE_SUFFIX)] for file_name in os.listdir(self._directory)
+                if file_name.endswith(TRIP_FILE_SUFFIX)]
+
+    def find_trips(self, name=None, start_date=None, end_date=None, destination=None, limit=None):
+        """
+        Find saved trips (every given condition has to match) by reading the header line of every trip file,
+        the same way as TripDatabase.find_trips
+        :return: list of (trip id, name, start date, end date, destination), ordered by start date
+        """
+        trips = []
+        for trip_id in self.trip_ids():
+            with open(self.trip_file(trip_id), 'rb') as trip_file:
+                values = json.loads(trip_file.readline())['values']
+            trip = (trip_id, values.get('_trip_name'), values.get('_start_date'), values.get('_end_date'),
+                    values.get('_to_location'))
+            if name and not (trip[1] or '').lower().startswith(name.lower()):
+                continue
+            if start_date and (trip[2] is None or trip[2] < start_date):
+                continue
+            if end_date and (trip[3] is None or trip[3] > end_date):
+                continue
+            if destination and (trip[4] or '').lower() != destination.lower():
+                continue
+            trips.append(trip)
+        trips.sort(key=lambda trip: trip[2] or '')
+        return trips if limit is None else trips[:limit]
+
+    def save(self, planner, trip_id):
+        """
+        Save the trip details and sections of the planner (sections that were never used are copied as they were
+        loaded, without decoding them) and make it the active trip
+        :param planner: TravelPlanner to save
+        :param trip_id: id of the trip (file name in the save directory)
+        :return: none
+        """
+        sections = []
+        for name in SECTION_ATTRIBUTES:
+            if name in planner.__dict__:
+                sections.append(encode_section(planner.__dict__[name]))
+            else:
+                sections.append(planner._pending_sections.get(name, b'[]'))
+        # offset and length of every section in the data after the header line
+        section_spans = {}
+        offset = 0
+        for name, data in zip(SECTION_ATTRIBUTES, sections):
+            section_spans[name] = [offset, len(data)]
+            offset += len(data)
+        header = {
+            'version': TRIP_FILE_VERSION,
+            'values': {name: getattr(planner, name) for name in HEADER_ATTRIBUTES},
+            'sections': section_spans
+        }
+        header_line = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        write_atomic(self.trip_file(trip_id), b'\n'.join([header_line, b''.join(sections)]))
+        self.set_active_trip(trip_id)
+
+    def load(self, planner, trip_id):
+        """
+        Load a saved trip into the planner: the trip details are set right away, the sections when first used
+        :param planner: TravelPlanner to load the trip into
+        :param trip_id: id of the saved trip
+        :return: none
+        :raises FileNotFoundError: if the trip was not saved
+        :raises ValueError: if the trip file is not a trip file of this version
+        """
+        with open(self.trip_file(trip_id), 'rb') as trip_file:
+            data = trip_file.read()
+        header_end = data.find(b'\n')
+        header = json.loads(data[:header_end] if header_end >= 0 else data)
+        if header.get('version') != TRIP_FILE_VERSION:
+            raise ValueError(f'Saved trip {trip_id!r} has an unknown file version {header.get("version")!r}')
+        for name in HEADER_ATTRIBUTES:
+            setattr(planner, name, header['values'].get(name))
+        body = data[header_end + 1:]
+        planner._pending_sections = {}
+        for name in SECTION_ATTRIBUTES:
+            # drop the loaded section so the next use of the attribute decodes the saved one
+            planner.__dict__.pop(name, None)
+            offset, length = header['sections'].get(name, [0, 0])
+            if length:
+                planner._pending_sections[name] = body[offset:offset + length]
@@ -0,0 +1,59 @@
+import shutil
+import sys
+
+# prompt shown between the pages of a long display
+MORE_PROMPT = '-- More (enter: next page, q: stop) --'
+
+
+class Renderer:
+    """
+    Collects the lines of a display in one buffer and writes them to the output with one write, instead of one print
+    (and one system call) per line. A long display on a terminal is written one page at a time.
+    """
+
+    def __init__(self, output=None, page_rows=None) -> None:
+        """
+        :param output: text stream to write to (sys.stdout by default)
+        :param page_rows: lines per page, None uses the terminal height (pages only when the user is at a terminal),
+        0 writes every line at once
+        """
+        self._output = output or sys.stdout
+        self._page_rows = page_rows
+        self._lines = []
+
+    def line(self, text=''):
+        """Add a line to the display"""
+        self._lines.append(text)
+
+    def lines(self, lines):
+        """Add every line of an iterable (e.g. a generator of table rows) to the display"""
+        self._lines.extend(lines)
+
+    def page_rows(self):
+        """Returns the number of lines per page, 0 if the display is not paged"""
+        if self._page_rows is not None:
+            return self._page_rows
+        if not (self._output.isatty() and sys.stdin.isatty()):
+            return 0
+        # leave a line for the prompt
+        return max(shutil.get_terminal_size().lines - 1, 1)
+
+    def pages(self):
+        """Yield the text of every page of the display (one page if it is not paged)"""
+        page_rows = self.page_rows()
+        if not page_rows or len(self._lines) <= page_rows:
+            yield ''.join(line + '\n' for line in self._lines)
+            return
+        for start in range(0, len(self._lines), page_rows):
+            yield ''.join(line + '\n' for line in self._lines[start:start + page_rows])
+
+    def flush(self):
+        """Write the display (a page at a time, the user can stop after any page) and start an empty one"""
+        try:
+            for page_number, page in enumerate(self.pages()):
+                if page_number and input(MORE_PROMPT).strip().lower() == 'q':
+                    break
+                self._output.write(page)
+                self._output.flush()
+        finally:
+            self._lines = []
@@ -0,0 +1,32 @@
+from decimal import Decimal
+import pytest
+from budget_ledger import BudgetLedger, to_cents
+
+
+def test_to_cents_int_and_float_are_dollars():
+    assert to_cents(12) == to_cents(12.0) == to_cents('12') == to_cents('12.00') == 1200
+    assert to_cents(12.5) == to_cents('12.50') == 1250
+
+
+def test_to_cents_rejects_non_numbers():
+    with pytest.raises(ValueError):
+        to_cents('twelve')
+
+
+def test_saved_items_keep_their_cents():
+    ledger = BudgetLedger()
+    ledger[1] = ['food', 12]
+    ledger[2] = ['hotel', '99.99']
+    loaded = BudgetLedger()
+    loaded.load_items(ledger.items())
+    assert loaded == ledger
+    assert loaded.total_amount() == Decimal('111.99')
+
+
+def test_converted_amounts_round_half_up():
+    ledger = BudgetLedger()
+    ledger[1] = ['food', '0.05']
+    ledger[2] = ['taxi', '0.07']
+    # 5 * 0.5 = 2.5 cents and 7 * 0.5 = 3.5 cents, half to even would give 2 and 4
+    assert ledger.converted_amount(1, 0.5) == Decimal('0.03')
+    assert ledger.converted_amount(2, 0.5) == Decimal('0.04')
@@ -0,0 +1,64 @@
+import builtins
+from travel_planner import TravelPlanner
+
+
+def converted_planner():
+    """Returns a planner with a budget converted into EUR and GBP (rates cached, no Microservice needed)"""
+    planner = TravelPlanner()
+    planner._target_budget = '100'
+    planner._travel_budget.append(['food', '12.50'])
+    planner._fx_rate_cache.put('USD', 'EUR', 0.9)
+    planner._fx_rate_cache.put('USD', 'GBP', 0.8)
+    planner.convert_budget_to_currencies('USD', ['EUR', 'GBP'])
+    return planner
+
+
+def test_display_after_deleting_converted_budget(monkeypatch, capsys):
+    planner = converted_planner()
+    assert planner._fx_rates == {'EUR': 0.9, 'GBP': 0.8}
+    monkeypatch.setattr(builtins, 'input', lambda prompt: 'y')
+    planner.delete_budget()
+    assert planner._target_budget is None
+    assert planner._fx_rates == {}
+    assert planner._fx_rate is None and planner._target_budget_converted is None
+    planner.display_budget()
+    planner.display_planner()
+    assert 'Your budget is empty.' in capsys.readouterr().out
+
+
+def test_display_budget_category_totals(capsys):
+    planner = converted_planner()
+    planner._travel_budget.append(['hotel', '80'])
+    planner._travel_budget.append(['food', '7.25'])
+    planner.display_budget()
+    output = capsys.readouterr().out
+    assert 'Calculated Total: 99.75' in output
+    assert 'Category Totals: food 19.75, hotel 80.00\n' in output
+
+
+def test_display_budget_target_without_target():
+    # trips saved before the conversion was reset with the budget
+    planner = converted_planner()
+    planner._target_budget = None
+    assert planner.display_budget_target() == 'USD'
+
+
+def test_timed_out_fx_request_keeps_earlier_conversion(monkeypatch, tmp_path, capsys):
+    # the FX Microservice is not running, so the request through the communication pipe files times out
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'CurrencyMS').mkdir()
+    planner = TravelPlanner(fx_timeout=0.2)
+    planner._target_budget = '100'
+    planner._travel_budget.append(['food', '12.50'])
+    planner._fx_rate_cache.put('USD', 'EUR', 0.9)
+    answers = iter(['USD', 'EUR', 'USD', 'GBP'])
+    monkeypatch.setattr(builtins, 'input', lambda prompt: next(answers))
+    planner.get_currency_pair()
+    planner.get_currency_pair()
+    assert planner._currency_pair == {'Base': 'USD', 'Quote': 'EUR'}
+    assert planner._fx_rate == 0.9
+    capsys.readouterr()
+    planner.display_budget()
+    output = capsys.readouterr().out
+    assert 'Target Budget EUR: 90.0' in output
+    assert 'GBP' not in output
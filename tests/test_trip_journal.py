@@ -0,0 +1,60 @@
+import os
+import threading
+from functools import partial
+import travel_planner
+from travel_planner import TravelPlanner
+from trip_journal import TripJournal, COMPACTING_SUFFIX
+
+
+def edit_trip(planner, first_item, last_item):
+    """Set the packing list items first_item to last_item (each edit is journaled)"""
+    for item_id in range(first_item, last_item + 1):
+        planner.set_item('_packing_list', item_id, f'item {item_id}')
+
+
+def test_unsaved_edits_are_replayed_when_the_trip_is_loaded(tmp_path):
+    planner = TravelPlanner(save_directory=str(tmp_path))
+    planner.set_trip_value('_trip_name', 'Lisbon')
+    edit_trip(planner, 1, 3)
+    planner.delete_item('_packing_list', 2)
+    # the planner stops without saving the trip (e.g. it crashed)
+    del planner
+
+    reopened = TravelPlanner(save_directory=str(tmp_path))
+    reopened.load_active_trip()
+    assert reopened._trip_name == 'Lisbon'
+    assert dict(reopened._packing_list.items()) == {1: 'item 1', 3: 'item 3'}
+    # the recovered edits were saved with the trip
+    assert not os.path.exists(reopened._planner_store.journal_file(reopened._trip_id))
+
+
+def test_trip_is_edited_while_the_journal_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(travel_planner, 'TripJournal', partial(TripJournal, compact_after=3))
+    planner = TravelPlanner(save_directory=str(tmp_path))
+    store = planner._planner_store
+    save = store.save
+    snapshot_saved = threading.Event()
+
+    def save_after_the_edits(saved_planner, trip_id):
+        # the snapshot is saved in the background, hold it until the next edits were journaled
+        if threading.current_thread() is not threading.main_thread():
+            snapshot_saved.wait(5)
+        save(saved_planner, trip_id)
+
+    monkeypatch.setattr(store, 'save', save_after_the_edits)
+    edit_trip(planner, 1, 3)
+    assert planner._journal.compacting()
+    journal_file = store.journal_file(planner._trip_id)
+    assert os.path.exists(journal_file + COMPACTING_SUFFIX)
+
+    edit_trip(planner, 4, 5)
+    assert planner._journal.compacting()
+    snapshot_saved.set()
+    planner._journal.wait()
+    assert not os.path.exists(journal_file + COMPACTING_SUFFIX)
+
+    # the snapshot has the first edits, the journal the ones made while it was saved
+    del planner
+    reopened = TravelPlanner(save_directory=str(tmp_path))
+    reopened.load_active_trip()
+    assert dict(reopened._packing_list.items()) == {item_id: f'item {item_id}' for item_id in range(1, 6)}
@@ -1,27 +1,94 @@
 from format import *
-import csv
+from microservices_case_app.file_watcher import FileWatcher
+from fx_pipe import (
+    FX_SERVICE_DIR, write_fx_request, write_fx_batch_request, start_fx_run, read_fx_response, read_fx_batch_response
+)
+from fx_socket import request_fx_over_socket, request_fx_batch_over_socket
+from fx_cache import FxRateCache, FX_RATE_TTL
+from batch_plan import read_plan
+from planner_store import LazySection, PlannerStore, SAVE_DIRECTORY
+from trip_database import TripDatabase
+from trip_journal import TripJournal, read_journal, apply_journal_record
+from item_list import ItemList
+from budget_ledger import BudgetLedger, ConvertedBudget, to_amount, to_cents
+from renderer import Renderer
+from functools import partial
+import argparse
+import contextlib
+import copy
+import json
 import time
+import uuid
 
 
 class TravelPlanner:
     """Represents the travel planner application"""
 
-    def __init__(self) -> None:
-        """Initialize attributes for storing data provided by user"""
+    # number of values of an item in every section of the planner (batch mode)
+    SECTION_VALUES = {'itinerary': 1, 'packing': 2, 'budget': 2, 'contacts': 4}
+    # trip details set by the trip section of a plan, in the order of its values (batch mode)
+    TRIP_FIELDS = ('_trip_name', '_start_date', '_end_date', '_from_location', '_to_location')
+    # attribute holding the items of every section of the planner (batch mode)
+    ITEM_ATTRIBUTES = {'itinerary': '_travel_itinerary', 'packing': '_packing_list', 'budget': '_travel_budget',
+                       'contacts': '_contacts'}
+    # sections of a saved trip are only decoded the first time they are used
+    _travel_itinerary = LazySection(ItemList)
+    _packing_list = LazySection(ItemList)
+    _travel_budget = LazySection(BudgetLedger)
+    _contacts = LazySection(ItemList)
+    _fx_rates = LazySection()
+
+    # saved trips listed at once when switching trips
+    SAVED_TRIPS_SHOWN = 20
+
+    def __init__(self, fx_timeout=30, fx_socket_path=None, fx_rate_ttl=FX_RATE_TTL, fx_cache_file=None,
+                 save_directory=None, trip_database=None, page_rows=None, fx_cache_stats=False) -> None:
+        """
+        Initialize attributes for storing data provided by user, fx_timeout is how long (seconds) to wait for FX,
+        fx_socket_path is the socket file of the FX Microservice to use instead of the communication pipe files,
+        fx_rate_ttl is how long (seconds) received FX rates are reused and fx_cache_file keeps them between sessions,
+        save_directory is where trips are saved on quit and loaded from on start (None does not save them),
+        trip_database is a SQLite database file to save many trips in instead of the save directory and page_rows
+        is the number of lines displayed per page (None uses the terminal height, 0 does not page), fx_cache_stats
+        displays the FX rate cache hits and misses after every conversion
+        """
+        self._fx_timeout = fx_timeout
+        self._fx_socket_path = fx_socket_path
+        self._fx_rate_cache = FxRateCache(fx_rate_ttl, fx_cache_file)
+        self._fx_cache_stats = fx_cache_stats
+        if trip_database is not None:
+            self._planner_store = TripDatabase(trip_database)
+        elif save_directory is not None:
+            self._planner_store = PlannerStore(save_directory)
+        else:
+            self._planner_store = None
+        self._page_rows = page_rows
+        # collects the lines of the display being rendered (None when nothing is being rendered)
+        self._renderer = None
+        self.clear_trip()
+
+    def clear_trip(self):
+        """Set the attributes storing the trip data provided by user to an empty (new) trip"""
         self._trip_name = None
         self._start_date = None
         self._end_date = None
         self._from_location = None
         self._to_location = None
-        self._travel_itinerary = {}
-        self._packing_list = {}
-        self._travel_budget = {}
+        self._travel_itinerary = ItemList()
+        self._packing_list = ItemList()
+        self._travel_budget = BudgetLedger()
         self._target_budget = None
         self._currency_pair = {'Base': 'None', 'Quote': 'None'}
-        self._travel_budget_converted = {}
         self._fx_rate = None
         self._target_budget_converted = None
-        self._contacts = {}
+        # fx rate for every currency the budget was converted into at once (empty after a single conversion)
+        self._fx_rates = {}
+        self._contacts = ItemList()
+        # encoded sections of the loaded trip that were not used yet (attribute name -> bytes)
+        self._pending_sections = {}
+        self._trip_id = None
+        # journal of the edits made since the trip was last saved (opened at the first edit)
+        self._journal = None
 
     ### INTERACTION WITH MICROSERVICE START ###
 
@@ -30,81 +97,208 @@ class TravelPlanner:
         # if a budget hasn't yet been specified then go back to nav, else get from/to currency from user
         if not self._travel_budget:
             self.display_warning('The budget is currently empty! Please create a budget first.')
-            self.budget_nav()
-        else:
-            self.get_currency_pair()
+            return self.budget_nav
+        return self.get_currency_pair()
 
     def convert_budget_to_fx_nav(self):
         """Convert the budget to FX with Microservice navigation menu"""
         # get user input choice, convert the budget to FX or go to other menus based on user choice
-        user_input = self.get_user_choice(["Convert Budget to FX", "Budget Menu", "Main Menu", "Quit"])
-        if user_input == "1":
-            self.check_valid_budget()
-        elif user_input == "2":
-            self.budget_nav()
-        elif user_input == "3":
-            self.main_menu_nav()
-        elif user_input == "4":
-            self.quit_process()
+        return self.choose_next_state(
+            ["Convert Budget to FX", "Budget Menu", "Main Menu", "Quit"],
+            [self.check_valid_budget, self.budget_nav, self.main_menu_nav, self.quit_process]
+        )
 
     def get_currency_pair(self):
         """Get the currency pair from user input to request fx conversion from microservice"""
         from_ccy = input(f'{shellColors.BLUE} From Currency: ')
-        to_ccy = input(f'{shellColors.BLUE} To Currency: ')
-        self._currency_pair['Base'] = from_ccy
-        self._currency_pair['Quote'] = to_ccy
-        # request the fx from microservice based on provided currency pair
-        self.request_fx(str(from_ccy + to_ccy))
-
-    def request_fx(self, pair):
-        """Provide the currency pair to microservice (comm pipe) to request fx rates for provided pair"""
-        pair_amt = [pair, self._target_budget]
+        to_ccy = input(f'{shellColors.BLUE} To Currency (separate several with ","): ')
+        quote_currencies = [ccy.strip() for ccy in to_ccy.split(',') if ccy.strip()]
+        # several currencies are converted in one round trip with microservice and displayed side by side
+        if len(quote_currencies) > 1:
+            return self.convert_budget_to_currencies(from_ccy, quote_currencies)
+        # use the rate received for the pair (or its inverse) if it has not expired, otherwise request the fx from
+        # microservice based on provided currency pair
+        fx_rate = self._fx_rate_cache.get(from_ccy, to_ccy)
+        if fx_rate is None:
+            fx_rate = self.request_fx(from_ccy, to_ccy)
+        # the earlier conversion (currency pair and rates) is kept if no rate came back
+        if fx_rate is None:
+            return self.budget_nav
+        return self.set_fx_conversion(from_ccy, to_ccy, fx_rate)
+
+    def request_fx(self, base, quote):
+        """
+        Provide the currency pair to microservice (comm pipe or socket) to request fx rates for provided pair
+        :return: fx rate of the pair, None if the microservice did not provide it
+        """
+        pair = str(base + quote)
+        if self._fx_socket_path is not None:
+            converted_amount = self.request_fx_over_socket(pair)
+        else:
+            converted_amount = self.request_fx_over_pipe(pair)
+        if converted_amount is None:
+            return None
+        fx_rate = converted_amount / float(self._target_budget)
+        self._fx_rate_cache.put(base, quote, fx_rate)
+        return fx_rate
+
+    def convert_budget_to_currencies(self, base, quote_currencies):
+        """Convert the budget into several currencies, the rates that are not cached are requested in one batch"""
+        fx_rates = {quote: self._fx_rate_cache.get(base, quote) for quote in quote_currencies}
+        missing_quotes = [quote for quote, fx_rate in fx_rates.items() if fx_rate is None]
+        if missing_quotes:
+            converted_amounts = self.request_fx_batch([str(base + quote) for quote in missing_quotes])
+            if converted_amounts is None:
+                return self.budget_nav
+            for quote, converted_amount in zip(missing_quotes, converted_amounts):
+                if converted_amount is None:
+                    self.display_warning(f'Microservice could not convert {base}{quote}, please check the currencies.')
+                    continue
+                fx_rates[quote] = converted_amount / float(self._target_budget)
+                self._fx_rate_cache.put(base, quote, fx_rates[quote])
+
+        fx_rates = {quote: fx_rate for quote, fx_rate in fx_rates.items() if fx_rate is not None}
+        if not fx_rates:
+            return self.budget_nav
+        # the first converted currency is also the one displayed with the target budget
+        quote, fx_rate = next(iter(fx_rates.items()))
+        return self.set_fx_conversion(base, quote, fx_rate, fx_rates)
+
+    def request_fx_batch(self, pairs):
+        """Request the conversion of the target budget for every pair in one round trip, None if it failed"""
+        pair_amounts = [(pair, self._target_budget) for pair in pairs]
+        if self._fx_socket_path is not None:
+            try:
+                converted_amounts = request_fx_batch_over_socket(pair_amounts, self._fx_socket_path, self._fx_timeout)
+            except OSError as error:
+                self.display_warning(f'Microservice could not be reached ({error}), please try again.')
+                return None
+        else:
+            # every row of the batch carries the request id so the response rows can be matched to it
+            request_id = uuid.uuid4().hex
+            write_fx_batch_request([[pair, amount, request_id] for pair, amount in pair_amounts])
+            converted_amounts = self.run_fx_request(request_id, len(pairs))
+        if converted_amounts is None:
+            self.display_warning('Microservice did not respond to the conversions, please try again.')
+        return converted_amounts
+
+    def request_fx_over_pipe(self, pair):
+        """Request the conversion of the target budget through the communication pipe files, None if it failed"""
+        # tag the request with an id so the response can be matched to it (and stale responses ignored)
+        request_id = uuid.uuid4().hex
+        pair_amt = [pair, self._target_budget, request_id]
         # call the functions to write, request and read from the Microservice communication pipe files
         self.write_to_fx_request_file(pair_amt)
-        self.run_fx_request()
-        self.read_from_fx_converted_file()
-        # update the budget amounts with the fx received
-        self.update_budget_with_converted_fx()
+        converted_amount = self.run_fx_request(request_id)
+        if converted_amount is None:
+            self.display_warning(f'Microservice did not respond within {self._fx_timeout} seconds, please try again.')
+        return converted_amount
+
+    def request_fx_over_socket(self, pair):
+        """Request the conversion of the target budget over the Microservice socket, None if it failed"""
+        try:
+            converted_amount = request_fx_over_socket(pair, self._target_budget, self._fx_socket_path, self._fx_timeout)
+        except OSError as error:
+            self.display_warning(f'Microservice could not be reached ({error}), please try again.')
+            return None
+        if converted_amount is None:
+            self.display_warning(f'Microservice could not convert {pair}, please check the currencies.')
+        return converted_amount
 
     def write_to_fx_request_file(self, pair_amt):
-        """Write to the FX request file the fx pair and amount for Microservice to convert"""
-        with open('./CurrencyMS/fx_request.csv', 'w') as fx_req_file:
-            writer = csv.writer(fx_req_file)
-            writer.writerow(pair_amt)
-
-    def run_fx_request(self):
-        """Write to the FX run text file 'RUN' so Microservice can check communication pipeline"""
-        with open('./CurrencyMS/fx_run.txt', 'w') as req_file:
-            req_file.write('RUN')
-        # display message to the user that the service is running and wait for it to complete
-        self.display_warning('Microservice is fetching rates and performing calculations...')
-        time.sleep(10)
-
-    def read_from_fx_converted_file(self):
-        """Read the converted fx from the fx converted file that Microservice provided"""
-        with open('./CurrencyMS/fx_converted.csv', 'r') as fx_rec_file:
-            datareader = csv.reader(fx_rec_file)
-            # convert to float to be used in the application and set the fx rate & update the amount with the fx
-            converted_amount = next(datareader)
-            converted_amount = float(converted_amount[0])
-            self._fx_rate = converted_amount / float(self._target_budget)
-            self._target_budget_converted = converted_amount
+        """Write to the FX request file the fx pair, amount and request id for Microservice to convert"""
+        write_fx_request(pair_amt)
+
+    def run_fx_request(self, request_id, batch_size=None):
+        """
+        Write to the FX run text file 'RUN' and wait for the Microservice response, returns the converted amount
+        (the list of converted amounts for a batch request of batch_size pairs)
+        """
+        # start watching before the request is made so a fast response cannot be missed
+        with FileWatcher(FX_SERVICE_DIR) as watcher:
+            sent_at = start_fx_run()
+            # display message to the user that the service is running and wait for it to complete
+            self.display_warning('Microservice is fetching rates and performing calculations...')
+            if batch_size is None:
+                return self.wait_for_fx_response(watcher, partial(read_fx_response, request_id, sent_at))
+            return self.wait_for_fx_response(watcher, partial(read_fx_batch_response, request_id, batch_size))
+
+    def wait_for_fx_response(self, watcher, read_response):
+        """Wait until read_response finds the response in the converted file, returns None if the timeout passes"""
+        deadline = time.monotonic() + self._fx_timeout
+        response = read_response()
+        while response is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            watcher.wait(remaining)
+            response = read_response()
+        return response
+
+    def set_fx_rate(self, fx_rate):
+        """Set the fx rate (e.g. a rate received earlier for the pair) and convert the target budget with it"""
+        self._fx_rate = fx_rate
+        self._target_budget_converted = float(self._target_budget) * fx_rate
+
+    def set_fx_conversion(self, base, quote, fx_rate, fx_rates=None):
+        """
+        Replace the FX conversion of the budget once the rates came back (so a failed request keeps the earlier one)
+        :param base: currency of the budget
+        :param quote: currency displayed with the target budget
+        :param fx_rate: rate of the pair
+        :param fx_rates: rate of every currency when the budget was converted into several at once
+        :return: next state
+        """
+        self._currency_pair = {'Base': base, 'Quote': quote}
+        self._fx_rates = fx_rates or {}
+        self.set_fx_rate(fx_rate)
+        return self.update_budget_with_converted_fx()
 
     def update_budget_with_converted_fx(self):
-        """Update all budget items with the FX conversion for target that was provided by Microservice"""
-        # apply the received fx rate from the microservice to all items in the budget then go back to nav
-        for key in self._travel_budget:
-            self.apply_fx_rate(key)
+        """
+        Keep the FX conversion provided by Microservice for the budget: the budget items are converted with the fx
+        rate when they are displayed (the whole budget at once), so nothing is computed per item here
+        """
+        # amounts converted with earlier rates are not displayed anymore
+        self._travel_budget.forget_conversions()
+        self.journal_edit(
+            ['set', '_currency_pair', self._currency_pair],
+            ['set', '_fx_rate', self._fx_rate],
+            ['set', '_target_budget_converted', self._target_budget_converted],
+            ['set', '_fx_rates', self._fx_rates]
+        )
         self.display_warning('Conversions Completed!')
-        self.budget_nav()
+        if self._fx_cache_stats:
+            print(self._fx_rate_cache.stats())
+        return self.budget_nav
 
-    def apply_fx_rate(self, key):
-        """Apply the fx rate and conversion from Microservice to the specified budget item"""
-        category = self._travel_budget[key][0]
-        amount = float(self._travel_budget[key][1])
-        amt_fx = round(amount * self._fx_rate, 2)
-        amt_fx = str(amt_fx)
-        self._travel_budget_converted[key] = [category, amt_fx]
+    def clear_fx_conversion(self):
+        """Forget the FX conversion of the budget (e.g. the budget was deleted) and journal it"""
+        self._currency_pair = {'Base': 'None', 'Quote': 'None'}
+        self._fx_rate = None
+        self._target_budget_converted = None
+        self._fx_rates = {}
+        self._travel_budget.forget_conversions()
+        self.journal_edit(
+            ['set', '_currency_pair', self._currency_pair],
+            ['set', '_fx_rate', self._fx_rate],
+            ['set', '_target_budget_converted', self._target_budget_converted],
+            ['set', '_fx_rates', self._fx_rates]
+        )
+
+    def converted_budgets(self):
+        """
+        Returns a view of the budget converted into every currency the budget was converted into (item number ->
+        [category, converted amount]), empty if the budget was not converted. The views are computed from the
+        current budget when read, so they are never stale.
+        """
+        if self._fx_rates:
+            fx_rates = self._fx_rates.values()
+        elif self._target_budget_converted is not None:
+            fx_rates = [self._fx_rate]
+        else:
+            fx_rates = []
+        return [ConvertedBudget(self._travel_budget, fx_rate) for fx_rate in fx_rates]
 
     ### INTERACTION WITH MICROSERVICE END ###
 
@@ -171,6 +365,7 @@ class TravelPlanner:
 
     def quit_process(self):
         """Quits the process"""
+        self.save_trip()
         print('Quitting the application, thanks for using the Travel App...Bye!')
         exit()
 
@@ -190,7 +385,44 @@ class TravelPlanner:
 
     def display_warning(self, msg):
         """Displays warning message (yellow) of provided message"""
-        print(f'{shellColors.YELLOW}{msg}{shellColors.ENDCOLOR}')
+        with self.rendering() as renderer:
+            renderer.line(f'{shellColors.YELLOW}{msg}{shellColors.ENDCOLOR}')
+
+    @contextlib.contextmanager
+    def rendering(self):
+        """
+        Collect the lines displayed in the block and write them with one write when the block ends (a display
+        rendered inside another one is written with it)
+        """
+        if self._renderer is not None:
+            yield self._renderer
+            return
+        self._renderer = Renderer(page_rows=self._page_rows)
+        try:
+            yield self._renderer
+        finally:
+            renderer, self._renderer = self._renderer, None
+            renderer.flush()
+
+    def choose_next_state(self, choices, next_states):
+        """Gets the user choice from the provided choices and returns the navigation state for it (same order)"""
+        user_input = self.get_user_choice(choices)
+        return next_states[int(user_input) - 1]
+
+    def then(self, action, next_state):
+        """Returns a navigation state that runs the action (e.g. displays the budget) and then goes to next_state"""
+        def state():
+            action()
+            return next_state
+        return state
+
+    def run_navigation(self, state):
+        """
+        Runs the application navigation: every state (menu or step) returns the next state instead of calling it,
+        so this flat loop keeps the call stack the same size however many menus the user goes through
+        """
+        while state is not None:
+            state = state()
 
     def display_application_title(self):
         """Displays the application title to the user"""
@@ -206,7 +438,8 @@ class TravelPlanner:
         print(Format.LINE)
         self.display_intro_msg()
         print(Format.LINE)
-        self.main_menu_nav()
+        self.load_active_trip()
+        self.run_navigation(self.main_menu_nav)
 
     def main_nav_choices(self):
         """Return a list of all the features of the application that a user can navigate to from main menu"""
@@ -217,6 +450,7 @@ class TravelPlanner:
             "Important Contacts",
             "Travel Planner",
             "Travel Tips",
+            "Saved Trips",
             "Quit"
         ]
         return choices
@@ -226,21 +460,16 @@ class TravelPlanner:
         self.display_application_title()
         # get user choice to take the user to where they would like to go
         print(f'{shellColors.BLUE}Where would you like to go?{shellColors.ENDCOLOR}')
-        user_input = self.get_user_choice(self.main_nav_choices())
-        if user_input == "1":
-            self.itinerary_nav()
-        elif user_input == "2":
-            self.packing_nav()
-        elif user_input == "3":
-            self.budget_nav()
-        elif user_input == "4":
-            self.contacts_nav()
-        elif user_input == "5":
-            self.planner_nav()
-        elif user_input == "6":
-            self.display_travel_tips()
-        elif user_input == "7":
-            self.quit_process()
+        return self.choose_next_state(self.main_nav_choices(), [
+            self.itinerary_nav,
+            self.packing_nav,
+            self.budget_nav,
+            self.contacts_nav,
+            self.planner_nav,
+            self.display_travel_tips,
+            self.saved_trips_nav,
+            self.quit_process
+        ])
 
     ### SETUP AND MAIN APPLICATION NAVIGATION END ###
 
@@ -263,21 +492,16 @@ class TravelPlanner:
         self.display_itinerary_title()
         print(f'{shellColors.BLUE}What would you like to do?{shellColors.ENDCOLOR}')
         # get the user choice and go to the section
-        user_input = self.get_user_choice(self.itinerary_nav_choices())
+        next_state = self.choose_next_state(self.itinerary_nav_choices(), [
+            self.create_new_itinerary,
+            self.update_itinerary_nav,
+            self.delete_itinerary_nav,
+            self.then(self.display_itinerary, self.itinerary_nav),
+            self.main_menu_nav,
+            self.quit_process
+        ])
         print('')
-        if user_input == "1":
-            self.create_new_itinerary()
-        elif user_input == "2":
-            self.update_itinerary_nav()
-        elif user_input == "3":
-            self.delete_itinerary_nav()
-        elif user_input == "4":
-            self.display_itinerary()
-            self.itinerary_nav()
-        elif user_input == "5":
-            self.main_menu_nav()
-        elif user_input == "6":
-            self.quit_process()
+        return next_state
 
     def create_new_itinerary(self):
         """Creates a new itinerary"""
@@ -285,7 +509,7 @@ class TravelPlanner:
         self.set_trip_name()
         self.set_trip_dates()
         self.set_trip_locations()
-        self.set_itinerary()
+        return self.set_itinerary()
 
     def set_trip_dates(self):
         """Sets trip dates"""
@@ -301,31 +525,31 @@ class TravelPlanner:
         """Sets trip name from user input"""
         prompt = 'What would you like to name this trip?'
         trip_name = self.get_user_input(prompt)
-        self._trip_name = trip_name
+        self.set_trip_value('_trip_name', trip_name)
 
     def set_start_date(self):
         """Sets start date from user input"""
         prompt = 'When does your trip start?'
         start_date = self.get_user_input(prompt)
-        self._start_date = start_date
+        self.set_trip_value('_start_date', start_date)
 
     def set_end_date(self):
         """Sets end date from user input"""
         prompt = 'When does your trip end?'
         end_date = self.get_user_input(prompt)
-        self._end_date = end_date
+        self.set_trip_value('_end_date', end_date)
 
     def set_from_location(self):
         """Set from Location from user input"""
         prompt = 'Where you you leaving from?'
         from_location = self.get_user_input(prompt)
-        self._from_location = from_location
+        self.set_trip_value('_from_location', from_location)
 
     def set_to_location(self):
         """Set to Location from user input"""
         prompt = 'Where you you going to?'
         to_location = self.get_user_input(prompt)
-        self._to_location = to_location
+        self.set_trip_value('_to_location', to_location)
 
     def set_itinerary_activities(self):
         """Sets the itinerary activities based on user input - user can enter as many items as desired"""
@@ -334,7 +558,7 @@ class TravelPlanner:
         while continue_flag is True:
             activity_counter += 1
             user_activity = input(f'{shellColors.BLUE}{activity_counter}) Activity Description: ')
-            self._travel_itinerary[activity_counter] = user_activity
+            self.set_item('_travel_itinerary', activity_counter, user_activity)
             # ask if the user would like to continue, continue to provide another activity otherwise stop loop
             continue_input = self.continue_input()
             continue_flag = self.update_continue_input_flag(continue_input)
@@ -345,7 +569,7 @@ class TravelPlanner:
         user_input = self.get_user_input(prompt)
         if str.lower(user_input) == "yes" or str.lower(user_input) == "y":
             self.display_itinerary()
-        self.itinerary_nav()
+        return self.itinerary_nav
 
     def set_itinerary(self):
         """Set and create an itinerary of activities based on user input"""
@@ -355,7 +579,7 @@ class TravelPlanner:
         if str.lower(user_input) == "yes" or str.lower(user_input) == str.lower("y"):
             self.set_itinerary_activities()
         # ask if user would like to see the itinerary
-        self.prompt_view_itinerary()
+        return self.prompt_view_itinerary()
 
     def update_activities_nav_choices(self):
         """Return list of all the features of the app that a user can navigate to from itinerary update menu"""
@@ -366,20 +590,14 @@ class TravelPlanner:
         """Update activities navigation menu"""
         print(f'\nWhat activities would you like to {shellColors.YELLOW}update{shellColors.ENDCOLOR}?')
         # go to section based on user input
-        user_input = self.get_user_choice(self.update_activities_nav_choices())
-        if user_input == "1":
-            self.set_itinerary()
-        if user_input == "2":
-            self.update_selected_activity_nav()
-        if user_input == "3":
-            self.itinerary_nav()
-        if user_input == "4":
-            self.display_itinerary()
-            self.update_itinerary_nav()
-        if user_input == "5":
-            self.main_menu_nav()
-        if user_input == "6":
-            self.quit_process()
+        return self.choose_next_state(self.update_activities_nav_choices(), [
+            self.set_itinerary,
+            self.update_selected_activity_nav,
+            self.itinerary_nav,
+            self.then(self.display_itinerary, self.update_itinerary_nav),
+            self.main_menu_nav,
+            self.quit_process
+        ])
 
     def create_itinerary_update_nav_choices(self):
         """Creates the menu of itinerary activity choices for updating an activity"""
@@ -396,23 +614,26 @@ class TravelPlanner:
         print(f'Updating Activity {user_input}: {self._travel_itinerary[int(user_input)]}...')
         prompt = 'Updated Activity: '
         new_description = self.get_user_input(prompt)
-        self._travel_itinerary[int(user_input)] = new_description
+        self.set_item('_travel_itinerary', int(user_input), new_description)
 
     def update_selected_activity_nav(self):
         """Update selected activities navigation menu"""
+        # the choices are the item numbers, number the items in order again if any were deleted
+        self.renumber_section('_travel_itinerary')
         choices_list, main_choices = self.create_itinerary_update_nav_choices()
         print('\nWhat activity would you like to update?')
         user_input = self.get_user_choice(choices_list)
         # update the corresponding user selected item
         if int(user_input) <= (len(choices_list) - len(main_choices)):
             self.update_selected_activity(user_input)
+            return self.itinerary_nav
         elif user_input == str(len(choices_list) - 2):
-            self.itinerary_nav()
+            return self.itinerary_nav
         elif user_input == str(len(choices_list) - 1):
             self.display_itinerary()
-            self.itinerary_nav()
+            return self.itinerary_nav
         elif user_input == str(len(choices_list)):
-            self.main_menu_nav()
+            return self.main_menu_nav
 
     def update_itinerary_nav_choices(self):
         """Return list of all the features of the application that a user can navigate to from itinerary update menu"""
@@ -431,41 +652,30 @@ class TravelPlanner:
         """Update itinerary dates"""
         self.set_start_date()
         self.set_end_date()
-        self.itinerary_nav()
+        return self.itinerary_nav
 
     def update_itinerary_locations(self):
         """Update itinerary locations"""
         self.set_from_location()
         self.set_to_location()
-        self.itinerary_nav()
+        return self.itinerary_nav
 
     def update_itinerary_nav(self):
         """Update itinerary navigation menu"""
         blue, yellow, end_color = shellColors.BLUE, shellColors.YELLOW, shellColors.ENDCOLOR
         print(f'\n{blue}What would you like to {end_color}{yellow}update{end_color}?')
         # get the user input and go to the section
-        user_input = self.get_user_choice(self.update_itinerary_nav_choices())
-        if user_input == "1":
-            self.create_new_itinerary()
-        elif user_input == "2":
-            self.set_trip_name()
-            self.itinerary_nav()
-        elif user_input == "3":
-            self.update_itinerary_dates()
-        elif user_input == "4":
-            self.update_itinerary_locations()
-        elif user_input == "5":
-            self.update_activities_nav()
-            self.itinerary_nav()
-        elif user_input == "6":
-            self.itinerary_nav()
-        elif user_input == "7":
-            self.display_itinerary()
-            self.itinerary_nav()
-        elif user_input == "8":
-            self.main_menu_nav()
-        elif user_input == "9":
-            self.quit_process()
+        return self.choose_next_state(self.update_itinerary_nav_choices(), [
+            self.create_new_itinerary,
+            self.then(self.set_trip_name, self.itinerary_nav),
+            self.update_itinerary_dates,
+            self.update_itinerary_locations,
+            self.update_activities_nav,
+            self.itinerary_nav,
+            self.then(self.display_itinerary, self.itinerary_nav),
+            self.main_menu_nav,
+            self.quit_process
+        ])
 
     def itinerary_delete_nav_choices(self):
         """Return list of all features of the application that a user can navigate to from itinerary delete menu"""
@@ -484,25 +694,17 @@ class TravelPlanner:
         """Delete itinerary navigation menu"""
         print(f'What would you like to {shellColors.RED}delete?{shellColors.ENDCOLOR}')
         # display warning that deletions cannot be undone, make change or go to section based on user input
-        user_input = self.get_user_choice(self.itinerary_delete_nav_choices())
-        if user_input == "1":
-            self.delete_all_itinerary_items()
-        elif user_input == "2":
-            self.delete_trip_name()
-        elif user_input == "3":
-            self.delete_dates()
-        elif user_input == "4":
-            self.delete_locations()
-        elif user_input == "5":
-            self.delete_activities()
-        elif user_input == "6":
-            self.itinerary_nav()
-        elif user_input == "7":
-            self.display_itinerary()
-        elif user_input == "8":
-            self.main_menu_nav()
-        elif user_input == "9":
-            self.quit_process()
+        return self.choose_next_state(self.itinerary_delete_nav_choices(), [
+            self.delete_all_itinerary_items,
+            self.delete_trip_name,
+            self.delete_dates,
+            self.delete_locations,
+            self.delete_activities,
+            self.itinerary_nav,
+            self.then(self.display_itinerary, self.itinerary_nav),
+            self.main_menu_nav,
+            self.quit_process
+        ])
 
     def delete_all_itinerary_items(self):
         """Deletes all itinerary details and activities if user chooses yes"""
@@ -512,14 +714,14 @@ class TravelPlanner:
             f'{red}Are you sure you want to delete all fields{end_color}? Type {bold}{red}"yes" or "y": {end_color}'
         )
         if user_input.lower() == "yes" or user_input.lower() == "y":
-            self._trip_name = None
-            self._start_date = None
-            self._end_date = None
-            self._from_location = None
-            self._to_location = None
-            self._travel_itinerary = {}
+            self.set_trip_value('_trip_name', None)
+            self.set_trip_value('_start_date', None)
+            self.set_trip_value('_end_date', None)
+            self.set_trip_value('_from_location', None)
+            self.set_trip_value('_to_location', None)
+            self.clear_section('_travel_itinerary')
             self.display_warning("All items deleted.")
-        self.itinerary_nav()
+        return self.itinerary_nav
 
     def delete_trip_name(self):
         """Deletes the trip name if user chooses yes"""
@@ -529,9 +731,9 @@ class TravelPlanner:
             f'{red}Are you sure you want to delete the trip name?{end_color}? Type {bold}{red}"yes" or "y": {end_color}'
         )
         if user_input.lower() == "yes" or user_input.lower() == "y":
-            self._trip_name = None
+            self.set_trip_value('_trip_name', None)
             self.display_warning("Trip name deleted.")
-        self.itinerary_nav()
+        return self.itinerary_nav
 
     def delete_dates(self):
         """Deletes the dates of the trip if user chooses yes"""
@@ -541,10 +743,10 @@ class TravelPlanner:
             f'{red}Are you sure you want to delete the dates{end_color}? Type {bold}{red}"yes" or "y": {end_color}'
         )
         if user_input.lower() == "yes" or user_input.lower() == "y":
-            self._start_date = None
-            self._end_date = None
+            self.set_trip_value('_start_date', None)
+            self.set_trip_value('_end_date', None)
             self.display_warning("Dates deleted.")
-        self.itinerary_nav()
+        return self.itinerary_nav
 
     def delete_locations(self):
         """Deletes the locations of the trip if user chooses yes"""
@@ -554,10 +756,10 @@ class TravelPlanner:
             f'{red}Are you sure you want to delete the locations{end_color}? Type {bold}{red}"yes" or "y": {end_color}'
         )
         if user_input.lower() == "yes" or user_input.lower() == "y":
-            self._from_location = None
-            self._to_location = None
+            self.set_trip_value('_from_location', None)
+            self.set_trip_value('_to_location', None)
             self.display_warning("Locations deleted.")
-        self.itinerary_nav()
+        return self.itinerary_nav
 
     def delete_activities(self):
         """Deletes all the activities of the trip if user chooses yes"""
@@ -567,38 +769,47 @@ class TravelPlanner:
             f'{red}Are you sure you want to delete the activities{end_color}? Type {bold}{red}"yes" or "y": {end_color}'
         )
         if user_input.lower() == "yes" or user_input.lower() == "y":
-            self._travel_itinerary = {}
+            self.clear_section('_travel_itinerary')
             self.display_warning("Itinerary of activities deleted.")
-        self.itinerary_nav()
+        return self.itinerary_nav
 
     def display_a_to_b(self, a, msg, b):
         """Display provided message in the format of 'a' to 'b'"""
         green, bold, end_color = shellColors.GREEN, shellColors.BOLD, shellColors.ENDCOLOR
-        print(f'{bold}{msg}{end_color} {green}{a}{end_color} {bold}to{end_color} {green}{b}{end_color}')
+        with self.rendering() as renderer:
+            renderer.line(f'{bold}{msg}{end_color} {green}{a}{end_color} {bold}to{end_color} {green}{b}{end_color}')
 
     def display_trip_details(self):
         """Displays trip name, dates and location details"""
         # store formatting
         green, bold, end_color = shellColors.GREEN, shellColors.BOLD, shellColors.ENDCOLOR
-        print('')
-        print(f'{bold}Trip Name{end_color}: {green}{self._trip_name}{end_color}')
-        self.display_a_to_b(self._start_date, 'Leaving', self._end_date)
-        self.display_a_to_b(self._from_location, 'From', self._to_location)
+        with self.rendering() as renderer:
+            renderer.line()
+            renderer.line(f'{bold}Trip Name{end_color}: {green}{self._trip_name}{end_color}')
+            self.display_a_to_b(self._start_date, 'Leaving', self._end_date)
+            self.display_a_to_b(self._from_location, 'From', self._to_location)
 
     def display_itinerary_activities(self):
         """Displays the list of itinerary activities"""
         # if there is an activity then display it otherwise notify user there are no activities
         if self._travel_itinerary:
-            print(f'\n{shellColors.BOLD}{shellColors.UNDERLINE}Activities:{shellColors.ENDCOLOR}')
-            for i in self._travel_itinerary:
-                print(f'{shellColors.BOLD}{i}{shellColors.ENDCOLOR} : {self._travel_itinerary[i]}')
+            with self.rendering() as renderer:
+                renderer.line(f'\n{shellColors.BOLD}{shellColors.UNDERLINE}Activities:{shellColors.ENDCOLOR}')
+                renderer.lines(self.itinerary_activity_rows())
         else:
             self.display_warning('Your itinerary of activities is empty!')
 
+    def itinerary_activity_rows(self):
+        """Yield the display line of every itinerary activity"""
+        bold, end_color = shellColors.BOLD, shellColors.ENDCOLOR
+        for i, activity in self._travel_itinerary.items():
+            yield f'{bold}{i}{end_color} : {activity}'
+
     def display_itinerary(self):
         """Displays itinerary details and activities"""
-        self.display_trip_details()
-        self.display_itinerary_activities()
+        with self.rendering():
+            self.display_trip_details()
+            self.display_itinerary_activities()
 
     #### ITINERARY SECTION END ####
 
@@ -626,21 +837,16 @@ class TravelPlanner:
         self.display_packing_title()
         print(f'{shellColors.BLUE}What would you like to do?{shellColors.ENDCOLOR}')
         # get the user choice and then go to the section
-        user_input = self.get_user_choice(self.packing_nav_choices())
+        next_state = self.choose_next_state(self.packing_nav_choices(), [
+            self.create_new_packing_list,
+            self.update_packing_list_nav,
+            self.delete_packing_nav,
+            self.then(self.display_packing_list, self.packing_nav),
+            self.main_menu_nav,
+            self.quit_process
+        ])
         print('')
-        if user_input == "1":
-            self.create_new_packing_list()
-        elif user_input == "2":
-            self.update_packing_list_nav()
-        elif user_input == "3":
-            self.delete_packing_nav()
-        elif user_input == "4":
-            self.display_packing_list()
-            self.packing_nav()
-        elif user_input == "5":
-            self.main_menu_nav()
-        elif user_input == "6":
-            self.quit_process()
+        return next_state
 
     def prompt_view_packing_list(self):
         """Prompts user asking if the user would like to view the packing list"""
@@ -648,7 +854,7 @@ class TravelPlanner:
         user_input = self.get_user_input(prompt)
         if str.lower(user_input) == "yes" or str.lower(user_input) == "y":
             self.display_packing_list()
-        self.packing_nav()
+        return self.packing_nav
 
     def create_new_packing_list(self):
         """Creates new packing list to add new items if user chooses yes"""
@@ -658,7 +864,7 @@ class TravelPlanner:
         if str.lower(user_input) == "yes" or str.lower(user_input) == str.lower("y"):
             self.add_new_packing_item()
         # asks if user wants to view packing list
-        self.prompt_view_packing_list()
+        return self.prompt_view_packing_list()
 
     def create_packing_update_choices(self):
         """Creates and returns the menu of choices for updating a packing item"""
@@ -677,19 +883,11 @@ class TravelPlanner:
         item_quantity = 'Updated Item Quantity: '
         new_name = self.get_user_input(item_name)
         new_quantity = self.get_user_input(item_quantity)
-        self._packing_list[int(item)] = [new_name, new_quantity]
+        self.set_item('_packing_list', int(item), [new_name, new_quantity])
 
     def get_packing_item_counter(self):
-        """Gets the item number (count) in packing list"""
-        # if there are items in the list then get the latest count of items to display numbered order for user
-        item_counter = 0
-        if self._packing_list:
-            keys = self._packing_list.keys()
-            key_list = []
-            for key in keys:
-                key_list.append(key)
-            item_counter = int(key_list[-1])
-        return item_counter
+        """Gets the number of the last item in packing list (the list keeps it, no need to go through the items)"""
+        return self._packing_list.last_id
 
     def add_new_packing_item(self):
         """Add a new packing item to the packing list while user wants to continue adding items"""
@@ -706,27 +904,29 @@ class TravelPlanner:
         """Sets the item name and quantity in the packing list from user input"""
         item_name = input(f'{shellColors.BLUE}{item_counter}) Item name: ')
         item_quantity = input(f'{shellColors.BLUE}{item_counter}) Item quantity: ')
-        self._packing_list[item_counter] = [item_name, item_quantity]
+        self.set_item('_packing_list', item_counter, [item_name, item_quantity])
 
     def update_packing_list_nav(self):
         """Update packing list navigation menu"""
+        # the choices are the item numbers, number the items in order again if any were deleted
+        self.renumber_section('_packing_list')
         choices_list, main_choices = self.create_packing_update_choices()
         print('\nWhat item would you like to update')
         user_input = self.get_user_choice(choices_list)
         # if the user choose to update a specific item then update it
         if int(user_input) <= (len(choices_list) - len(main_choices)):
             self.update_packing_item(user_input)
-            self.packing_nav()
+            return self.packing_nav
         elif user_input == str(len(choices_list) - 3):
             self.add_new_packing_item()
-            self.packing_nav()
+            return self.packing_nav
         elif user_input == str(len(choices_list) - 2):
-            self.packing_nav()
+            return self.packing_nav
         elif user_input == str(len(choices_list) - 1):
             self.display_packing_list()
-            self.packing_nav()
+            return self.packing_nav
         elif user_input == str(len(choices_list)):
-            self.main_menu_nav()
+            return self.main_menu_nav
 
     def delete_all_packing_items(self):
         """Deletes all packing list items if user chooses yes"""
@@ -737,54 +937,55 @@ class TravelPlanner:
             f'{red}Do you want to delete all packing items{end_color}? Type {bold}{red}"yes" or "y": {end_color}'
         )
         if user_input.lower() == "yes" or user_input.lower() == "y":
-            self._packing_list = {}
+            self.clear_section('_packing_list')
             self.display_warning("Packing List deleted.")
-        self.packing_nav()
+        return self.packing_nav
 
     def delete_packing_nav(self):
         """Delete packing list navigation menu"""
         # display warning message to user, either delete the packing list or go to section
         self.display_delete_warning()
-        user_input = self.get_user_choice(["Delete All", "Packing Menu", "Main Menu", "Quit"])
-        if user_input == "1":
-            self.delete_all_packing_items()
-        elif user_input == "2":
-            self.packing_nav()
-        elif user_input == "3":
-            self.main_menu_nav()
-        elif user_input == "4":
-            self.quit_process()
+        return self.choose_next_state(
+            ["Delete All", "Packing Menu", "Main Menu", "Quit"],
+            [self.delete_all_packing_items, self.packing_nav, self.main_menu_nav, self.quit_process]
+        )
 
     def display_packing_table_headers(self):
         """Display table headers for packing list"""
         # store formatting then display the headers
         bold, underline, end_color = shellColors.BOLD, shellColors.UNDERLINE, shellColors.ENDCOLOR
         green, space, column_size = shellColors.GREEN, '    ', "{:<10} {:<10} {:<10}"
-        print(column_size.format(
-            f'{green}{bold}Item #',
-            f'{space}{green}{bold}Item',
-            f'{space}{green}{bold}Quantity{end_color}'
-        ))
+        with self.rendering() as renderer:
+            renderer.line(column_size.format(
+                f'{green}{bold}Item #',
+                f'{space}{green}{bold}Item',
+                f'{space}{green}{bold}Quantity{end_color}'
+            ))
 
     def display_packing_table_rows(self):
         """Display packing table data rows (items and associated quantities)"""
-        # display each packing item
+        with self.rendering() as renderer:
+            renderer.lines(self.packing_table_rows())
+
+    def packing_table_rows(self):
+        """Yield the table row of every packing item"""
         column_size = "{:<10} {:<10} {:<10}"
         for key, value in self._packing_list.items():
             item, quantity = value
-            print(column_size.format(f'{key}', f'{item}', f'{quantity}'))
+            yield column_size.format(f'{key}', f'{item}', f'{quantity}')
 
     def display_packing_list(self):
         """Display packing list"""
         # store formatting
         bold, underline, end_color = shellColors.BOLD, shellColors.UNDERLINE, shellColors.ENDCOLOR
-        print(f'\n{bold}{underline}Packing List:{end_color}')
-        # if there are items in the packing list then display a table, else it's empty so notify user
-        if self._packing_list:
-            self.display_packing_table_headers()
-            self.display_packing_table_rows()
-        else:
-            self.display_warning('Your packing list is empty.')
+        with self.rendering() as renderer:
+            renderer.line(f'\n{bold}{underline}Packing List:{end_color}')
+            # if there are items in the packing list then display a table, else it's empty so notify user
+            if self._packing_list:
+                self.display_packing_table_headers()
+                self.display_packing_table_rows()
+            else:
+                self.display_warning('Your packing list is empty.')
 
     #### PACKING LIST END ####
 
@@ -812,24 +1013,18 @@ class TravelPlanner:
         """Display the budget navigation menu"""
         self.display_budget_title()
         print(f'{shellColors.BLUE}What would you like to do?{shellColors.ENDCOLOR}')
-        user_input = self.get_user_choice(self.budget_nav_choices())
-        print('')
         # go to the section based on user choice
-        if user_input == "1":
-            self.create_new_budget()
-        elif user_input == "2":
-            self.update_budget_nav()
-        elif user_input == "3":
-            self.delete_budget_nav()
-        elif user_input == "4":
-            self.display_budget()
-            self.budget_nav()
-        elif user_input == "5":
-            self.convert_budget_to_fx_nav()
-        elif user_input == "6":
-            self.main_menu_nav()
-        elif user_input == "7":
-            self.quit_process()
+        next_state = self.choose_next_state(self.budget_nav_choices(), [
+            self.create_new_budget,
+            self.update_budget_nav,
+            self.delete_budget_nav,
+            self.then(self.display_budget, self.budget_nav),
+            self.convert_budget_to_fx_nav,
+            self.main_menu_nav,
+            self.quit_process
+        ])
+        print('')
+        return next_state
 
     def add_new_budget_item(self):
         """Adds a new budget item to the budget by allowing a user to add as many as they choose"""
@@ -845,13 +1040,24 @@ class TravelPlanner:
     def set_budget_details(self, item_counter):
         """Sets the spend name and amount in the budget from user input"""
         spend_name = input(f'{shellColors.BLUE}{item_counter}) Spend name: ')
-        spend_amount = input(f'{shellColors.BLUE}{item_counter}) Spend amount: ')
-        self._travel_budget[item_counter] = [spend_name, spend_amount]
+        spend_amount = self.get_amount_input(f'{item_counter}) Spend amount')
+        self.set_item('_travel_budget', item_counter, [spend_name, spend_amount])
+
+    def get_amount_input(self, prompt):
+        """Gets an amount from user input based on provided prompt, asks again until it is a number"""
+        while True:
+            amount = self.get_user_input(prompt)
+            try:
+                to_cents(amount)
+            except ValueError as error:
+                self.display_warning(str(error))
+                continue
+            return amount
 
     def set_target_budget(self):
         """Sets the target budget from user input"""
-        target_budget = self.get_user_input('What is your total budget?')
-        self._target_budget = target_budget
+        target_budget = self.get_amount_input('What is your total budget?')
+        self.set_trip_value('_target_budget', target_budget)
 
     def prompt_view_budget(self):
         """Prompts user if they want to view budget and displays the budget if so"""
@@ -859,7 +1065,7 @@ class TravelPlanner:
         user_input = self.get_user_input(prompt)
         if str.lower(user_input) == "yes" or str.lower(user_input) == "y":
             self.display_budget()
-        self.budget_nav()
+        return self.budget_nav
 
     def create_new_budget(self):
         """Asks user if they would like to create a new budget"""
@@ -871,41 +1077,36 @@ class TravelPlanner:
             self.add_new_budget_item()
         print('')
         # ask if the user wants to view the budget
-        self.prompt_view_budget()
+        return self.prompt_view_budget()
 
     def create_budget_update_nav_choices(self):
         """Creates the menu of budget items and the main choices for updating a budget item"""
         choices_list = []
         # go through each item in the budget to get assign a number for a choice
-        for i in self._travel_budget:
-            choices_list.append(f'{self._travel_budget[i]}')
+        for category, cents in self._travel_budget.values():
+            choices_list.append(f'{[category, str(to_amount(cents))]}')
         main_choices = ["Add New Budget Item", "Budget Menu", "View Budget", "Main Menu"]
         choices_list = choices_list + main_choices
         return choices_list, main_choices
 
     def update_budget_item(self, item):
         """Update specified budget item"""
-        print(f'Updating Budget {item}: {self._travel_budget[int(item)]}...')
+        category = self._travel_budget[int(item)][0]
+        print(f'Updating Budget {item}: {[category, str(self._travel_budget.amount(int(item)))]}...')
         item_name = 'Updated Spend Name: '
         item_spend = 'Updated Spend Amount: '
         new_name = self.get_user_input(item_name)
-        new_spend = self.get_user_input(item_spend)
-        self._travel_budget[int(item)] = [new_name, new_spend]
+        new_spend = self.get_amount_input(item_spend)
+        self.set_item('_travel_budget', int(item), [new_name, new_spend])
 
     def get_budget_item_counter(self):
-        """Gets the item number (count) in budget"""
-        # if there are items in the budget then assign numbers for choices to display
-        item_counter = 0
-        if self._travel_budget:
-            keys = self._travel_budget.keys()
-            key_list = []
-            for key in keys:
-                key_list.append(key)
-            item_counter = int(key_list[-1]) + 1
-        return item_counter
+        """Gets the number of the last item in budget (the budget keeps it, no need to go through the items)"""
+        return self._travel_budget.last_id
 
     def update_budget_nav(self):
         """Update budget navigation menu"""
+        # the choices are the item numbers, number the items in order again if any were deleted
+        self.renumber_section('_travel_budget')
         choices_list, main_choices = self.create_budget_update_nav_choices()
         # ask the user what they would like to update from the choices list
         print('\nWhat item would you like to update')
@@ -913,17 +1114,17 @@ class TravelPlanner:
         # if user selected specific item then update it else go to the section
         if int(user_input) <= (len(choices_list) - len(main_choices)):
             self.update_budget_item(user_input)
-            self.budget_nav()
+            return self.budget_nav
         elif user_input == str(len(choices_list) - 3):
             self.add_new_budget_item()
-            self.budget_nav()
+            return self.budget_nav
         elif user_input == str(len(choices_list) - 2):
-            self.budget_nav()
+            return self.budget_nav
         elif user_input == str(len(choices_list) - 1):
             self.display_budget()
-            self.budget_nav()
+            return self.budget_nav
         elif user_input == str(len(choices_list)):
-            self.main_menu_nav()
+            return self.main_menu_nav
 
     def delete_budget(self):
         """Delete the budget if a user chooses yes"""
@@ -934,99 +1135,119 @@ class TravelPlanner:
             f'{red}Do you want to delete all budget items{end_color}? Type {bold}{red}"yes" or "y": {end_color}'
         )
         if user_input.lower() == "yes" or user_input.lower() == "y":
-            self._target_budget = None
-            self._travel_budget = {}
+            self.set_trip_value('_target_budget', None)
+            self.clear_section('_travel_budget')
+            # the conversions were of the deleted target budget
+            self.clear_fx_conversion()
             self.display_warning("Packing List deleted.")
-        self.budget_nav()
+        return self.budget_nav
 
     def delete_budget_nav(self):
         """Delete budget navigation menu"""
         # display delete warning and then delete or navigate to section depending on user input
         self.display_delete_warning()
-        user_input = self.get_user_choice(["Delete All", "Budget Menu", "Main Menu", "Quit"])
-        if user_input == "1":
-            self.delete_budget()
-        elif user_input == "2":
-            self.budget_nav()
-        elif user_input == "3":
-            self.main_menu_nav()
-        elif user_input == "4":
-            self.quit_process()
+        return self.choose_next_state(
+            ["Delete All", "Budget Menu", "Main Menu", "Quit"],
+            [self.delete_budget, self.budget_nav, self.main_menu_nav, self.quit_process]
+        )
 
     def display_budget_target(self):
         """Display the provided target budget and fx from Microservice if applied"""
-        print(f'\n{shellColors.BOLD}{shellColors.UNDERLINE}Budget:{shellColors.ENDCOLOR}')
-        # show if the currency pair if it has been specified for the budget
-        if self._currency_pair['Base'] != 'None':
-            user_ccy = self._currency_pair['Base']
-            print(f'Target Budget {self._currency_pair["Quote"]}: {self._target_budget_converted}')
-        else:
-            user_ccy = ''
+        with self.rendering() as renderer:
+            renderer.line(f'\n{shellColors.BOLD}{shellColors.UNDERLINE}Budget:{shellColors.ENDCOLOR}')
+            # show the currency pair if it has been specified for the budget (every currency if converted into several)
+            if self._fx_rates:
+                user_ccy = self._currency_pair['Base']
+                # there is no target budget to show converted if it was deleted after the conversion
+                if self._target_budget is not None:
+                    for quote, fx_rate in self._fx_rates.items():
+                        renderer.line(f'Target Budget {quote}: {round(float(self._target_budget) * fx_rate, 2)}')
+            elif self._currency_pair['Base'] != 'None':
+                user_ccy = self._currency_pair['Base']
+                renderer.line(f'Target Budget {self._currency_pair["Quote"]}: {self._target_budget_converted}')
+            else:
+                user_ccy = ''
         return user_ccy
 
     def budget_vs_target(self, user_ccy):
         """Get calculated budget total to display the provided items calculated total vs input target"""
         # get the calculated total spend from provided input
         calc_total = self.calculate_total_spend()
-        print(f'Target Budget {user_ccy}: {self._target_budget} vs Calculated Total: {calc_total}')
-        # if a target budget has been specified then display the calculated total vs the target
-        if self._target_budget is not None:
-            self.display_over_under_budget(calc_total)
-        print('')
+        with self.rendering() as renderer:
+            renderer.line(f'Target Budget {user_ccy}: {self._target_budget} vs Calculated Total: {calc_total}')
+            # the calculated total in every currency the budget was converted into
+            fx_rates = self._fx_rates or ({self._currency_pair['Quote']: self._fx_rate} if self._fx_rate else {})
+            for quote, total in self._travel_budget.currency_totals(user_ccy, fx_rates).items():
+                if quote != user_ccy:
+                    renderer.line(f'Calculated Total {quote}: {total}')
+            # the total of every category (kept up to date by the budget ledger)
+            category_totals = self._travel_budget.category_totals()
+            if category_totals:
+                renderer.line('Category Totals: ' + ', '.join(
+                    f'{category} {total}' for category, total in category_totals.items()))
+            # if a target budget has been specified then display the calculated total vs the target
+            if self._target_budget is not None:
+                self.display_over_under_budget(calc_total)
+            renderer.line()
 
     def display_over_under_budget(self, calc_total):
         """Displays the formatted over or under budget calculation"""
         # store formats and get total calculated spend based on user input items
         red, green, bold, end_color = shellColors.RED, shellColors.GREEN, shellColors.BOLD, shellColors.ENDCOLOR
-        # display red if over and green if under budget
-        if int(calc_total) <= int(self._target_budget):
-            print(f'You are under budget by {green}{bold}{int(self._target_budget) - int(calc_total)}{end_color}')
-        else:
-            print(f'You are over budget by {red}{bold}{int(self._target_budget) - int(calc_total)}{end_color}')
+        # amounts are compared exactly (in cents), display red if over and green if under budget
+        difference = to_amount(to_cents(self._target_budget)) - calc_total
+        with self.rendering() as renderer:
+            if difference >= 0:
+                renderer.line(f'You are under budget by {green}{bold}{difference}{end_color}')
+            else:
+                renderer.line(f'You are over budget by {red}{bold}{difference}{end_color}')
 
     def calculate_total_spend(self):
-        """Calculate total spend of items provided by user input for budget"""
-        # iterate through the budget and increment the total accordingly
-        total = 0
-        if self._travel_budget:
-            keys = self._travel_budget.keys()
-            for key in keys:
-                total += int(self._travel_budget[key][1])
-        return total
+        """Returns the exact total spend of the budget items (the budget ledger keeps it up to date)"""
+        return self._travel_budget.total_amount()
 
     def display_budget_table_headers(self):
         """Display budget table headers"""
         # store formats and display the table headers
         green, bold, end_color = shellColors.GREEN, shellColors.BOLD, shellColors.ENDCOLOR
-        column_headers = '{:<10} {:<10} {:<10}'
-        print(column_headers.format(
-            f'{green}{bold}Category{end_color}',
-            f'  {green}{bold}Amount{end_color}',
-            f'  {green}{bold}FX ({self._currency_pair["Quote"]}){end_color}'))
+        # one fx column for every currency the budget was converted into
+        quote_currencies = list(self._fx_rates) or [self._currency_pair["Quote"]]
+        column_headers = ' '.join(['{:<10}'] * (len(quote_currencies) + 2))
+        with self.rendering() as renderer:
+            renderer.line(column_headers.format(
+                f'{green}{bold}Category{end_color}',
+                f'  {green}{bold}Amount{end_color}',
+                *[f'  {green}{bold}FX ({quote}){end_color}' for quote in quote_currencies]))
 
     def display_budget_table_rows(self):
         """Display table data rows of budget items"""
-        # iterate through the budget and display the items (show fx if requested via Microservice)
+        with self.rendering() as renderer:
+            renderer.lines(self.budget_table_rows())
+
+    def budget_table_rows(self):
+        """Yield the table row of every budget item"""
+        # iterate through the budget items (show fx if requested via Microservice), the converted amounts are
+        # memoized by the budget and only rounded and formatted for the items displayed
+        converted_budgets = self.converted_budgets()
+        row = ' '.join(['{:<10}'] * (max(len(converted_budgets), 1) + 2))
         for key, value in self._travel_budget.items():
-            category, spend = value
-            if self._target_budget_converted is None:
-                fx_amt = None
-            else:
-                fx_amt = self._travel_budget_converted[key][1]
-            print("{:<10} {:<10} {:<10}".format(f'{category}', f'{spend}', f'{fx_amt}'))
+            category, spend = value[0], to_amount(value[1])
+            fx_amts = [converted[key][1] for converted in converted_budgets] or [None]
+            yield row.format(f'{category}', f'{spend}', *[f'{fx_amt}' for fx_amt in fx_amts])
 
     def display_budget(self):
         """Display the budget"""
-        # display the target and get calculated total to show if the budget is over or under the target
-        user_ccy = self.display_budget_target()
-        self.budget_vs_target(user_ccy)
-        print('')
-        # if there is a target budget then display all the budget line items, otherwise notify user it's empty
-        if self._target_budget:
-            self.display_budget_table_headers()
-            self.display_budget_table_rows()
-        else:
-            self.display_warning('Your budget is empty.')
+        with self.rendering() as renderer:
+            # display the target and get calculated total to show if the budget is over or under the target
+            user_ccy = self.display_budget_target()
+            self.budget_vs_target(user_ccy)
+            renderer.line()
+            # if there is a target budget then display all the budget line items, otherwise notify user it's empty
+            if self._target_budget:
+                self.display_budget_table_headers()
+                self.display_budget_table_rows()
+            else:
+                self.display_warning('Your budget is empty.')
 
     #### BUDGET SECTION END ####
 
@@ -1054,21 +1275,16 @@ class TravelPlanner:
         # display the section title and go to section based on user input
         self.display_contacts_title()
         print(f'{shellColors.BLUE}What would you like to do?{shellColors.ENDCOLOR}')
-        user_input = self.get_user_choice(self.contacts_nav_choices())
+        next_state = self.choose_next_state(self.contacts_nav_choices(), [
+            self.create_new_contact,
+            self.update_contact_nav,
+            self.delete_contact_nav,
+            self.then(self.display_contacts, self.contacts_nav),
+            self.main_menu_nav,
+            self.quit_process
+        ])
         print('')
-        if user_input == "1":
-            self.create_new_contact()
-        elif user_input == "2":
-            self.update_contact_nav()
-        elif user_input == "3":
-            self.delete_contact_nav()
-        elif user_input == "4":
-            self.display_contacts()
-            self.contacts_nav()
-        elif user_input == "5":
-            self.main_menu_nav()
-        elif user_input == "6":
-            self.quit_process()
+        return next_state
 
     def add_new_contact_item(self):
         """Adds a new contact item to the list with details input by user"""
@@ -1087,7 +1303,7 @@ class TravelPlanner:
         phone_number = input(f'{shellColors.BLUE}{contact_counter}) Contact Phone Number: ')
         email = input(f'{shellColors.BLUE}{contact_counter}) Contact Email: ')
         notes = input(f'{shellColors.BLUE}{contact_counter}) Notes: ')
-        self._contacts[contact_counter] = [name, phone_number, email, notes]
+        self.set_item('_contacts', contact_counter, [name, phone_number, email, notes])
 
     def prompt_view_contacts(self):
         """Prompts user if they want to view contacts and displays contacts if so"""
@@ -1095,7 +1311,7 @@ class TravelPlanner:
         user_input = self.get_user_input(prompt)
         if str.lower(user_input) == "yes" or str.lower(user_input) == "y":
             self.display_contacts()
-        self.contacts_nav()
+        return self.contacts_nav
 
     def create_new_contact(self):
         """Asks user if they would like to create a new contact to add to the contact information"""
@@ -1106,34 +1322,41 @@ class TravelPlanner:
             self.add_new_contact_item()
         print('')
         # ask if user wants to view contacts
-        self.prompt_view_contacts()
+        return self.prompt_view_contacts()
 
     def display_contacts_table_headers(self):
         """Display contacts table headers"""
         # store formats and display table headers
         green, bold, end_color = shellColors.GREEN, shellColors.BOLD, shellColors.ENDCOLOR
         column_headers = '{:<10} {:<10} {:<10} {:<10}'
-        print(column_headers.format(f'{green}{bold}Name{end_color}',
-                                    f'    {green}{bold}Phone{end_color}',
-                                    f'      {green}{bold}Email{end_color}',
-                                    f'      {green}{bold}Notes{end_color}'))
+        with self.rendering() as renderer:
+            renderer.line(column_headers.format(f'{green}{bold}Name{end_color}',
+                                                f'    {green}{bold}Phone{end_color}',
+                                                f'      {green}{bold}Email{end_color}',
+                                                f'      {green}{bold}Notes{end_color}'))
 
     def display_contacts_table_rows(self):
         """Display contacts table rows"""
-        # display the contact detail/data rows
+        with self.rendering() as renderer:
+            renderer.lines(self.contacts_table_rows())
+
+    def contacts_table_rows(self):
+        """Yield the table row of every contact"""
+        row = "{:<10} {:<10} {:<10} {:<10}"
         for key, value in self._contacts.items():
             name, phone, email, notes = value
-            print("{:<10} {:<10} {:<10} {:<10}".format(f'{name}', f'{phone}', f'{email}', f'{notes}'))
+            yield row.format(f'{name}', f'{phone}', f'{email}', f'{notes}')
 
     def display_contacts(self):
         """Display contacts list"""
-        print(f'\n{shellColors.BOLD}{shellColors.UNDERLINE}Contacts:{shellColors.ENDCOLOR}')
-        # display the contacts (full table) if any, otherwise notify user it's empty
-        if self._contacts:
-            self.display_contacts_table_headers()
-            self.display_contacts_table_rows()
-        else:
-            self.display_warning('Your contact list is empty.')
+        with self.rendering() as renderer:
+            renderer.line(f'\n{shellColors.BOLD}{shellColors.UNDERLINE}Contacts:{shellColors.ENDCOLOR}')
+            # display the contacts (full table) if any, otherwise notify user it's empty
+            if self._contacts:
+                self.display_contacts_table_headers()
+                self.display_contacts_table_rows()
+            else:
+                self.display_warning('Your contact list is empty.')
 
     def create_contacts_update_nav_choices(self):
         """Creates the menu of choices for updating a contact"""
@@ -1152,7 +1375,7 @@ class TravelPlanner:
         new_phone = self.update_contact_phone()
         new_email = self.update_contact_email()
         new_notes = self.update_contact_notes()
-        self._contacts[int(item)] = [new_name, new_phone, new_email, new_notes]
+        self.set_item('_contacts', int(item), [new_name, new_phone, new_email, new_notes])
 
     def update_contact_name(self):
         """Gets new name from user input for contact name"""
@@ -1175,36 +1398,30 @@ class TravelPlanner:
         return new_notes
 
     def get_contact_item_counter(self):
-        """Gets the item number (count) in budget"""
-        # if there are items in the contacts then assign numbers for choices
-        item_counter = 0
-        if self._contacts:
-            keys = self._contacts.keys()
-            key_list = []
-            for key in keys:
-                key_list.append(key)
-            item_counter = int(key_list[-1]) + 1
-        return item_counter
+        """Gets the number of the last contact (the contacts keep it, no need to go through the items)"""
+        return self._contacts.last_id
 
     def update_contact_nav(self):
         """Update contact navigation menu"""
+        # the choices are the item numbers, number the items in order again if any were deleted
+        self.renumber_section('_contacts')
         print('\nWhat item would you like to update')
         # get the available contacts to update and update the specified contact
         choices_list, main_choices = self.create_contacts_update_nav_choices()
         user_input = self.get_user_choice(choices_list)
         if int(user_input) <= (len(choices_list) - len(main_choices)):
             self.update_contact_item(user_input)
-            self.contacts_nav()
+            return self.contacts_nav
         elif user_input == str(len(choices_list) - 3):
             self.add_new_contact_item()
-            self.contacts_nav()
+            return self.contacts_nav
         elif user_input == str(len(choices_list) - 2):
-            self.contacts_nav()
+            return self.contacts_nav
         elif user_input == str(len(choices_list) - 1):
             self.display_contacts()
-            self.contacts_nav()
+            return self.contacts_nav
         elif user_input == str(len(choices_list)):
-            self.main_menu_nav()
+            return self.main_menu_nav
 
     def delete_contacts(self):
         """Deletes contacts list if user chooses yes"""
@@ -1214,23 +1431,18 @@ class TravelPlanner:
         user_input = input(
             f'{red}Are you sure you want to delete all contacts{end_color}? Type {bold}{red}"yes" or "y": {end_color}')
         if user_input.lower() == "yes" or user_input.lower() == "y":
-            self._contacts = {}
+            self.clear_section('_contacts')
             self.display_warning("Contacts list deleted.")
-        self.contacts_nav()
+        return self.contacts_nav
 
     def delete_contact_nav(self):
         """Delete contact navigation menu"""
         # display delete warning to user, delete if user chooses to or go to other menu
         self.display_delete_warning()
-        user_input = self.get_user_choice(["Delete All", "Contacts Menu", "Main Menu", "Quit"])
-        if user_input == "1":
-            self.delete_contacts()
-        elif user_input == "2":
-            self.contacts_nav()
-        elif user_input == "3":
-            self.main_menu_nav()
-        elif user_input == "4":
-            self.quit_process()
+        return self.choose_next_state(
+            ["Delete All", "Contacts Menu", "Main Menu", "Quit"],
+            [self.delete_contacts, self.contacts_nav, self.main_menu_nav, self.quit_process]
+        )
 
     #### CONTACTS SECTION END ####
 
@@ -1281,7 +1493,7 @@ class TravelPlanner:
         print('')
         # ask if user is traveling internationally then go back to main menu
         self.prompt_user_international_travel()
-        self.main_menu_nav()
+        return self.main_menu_nav
 
     #### TRAVEL PLANNER ####
 
@@ -1297,29 +1509,336 @@ class TravelPlanner:
         # display section title and go to section user chooses (or display planner)
         self.display_travel_planner_title()
         print(f'{shellColors.BLUE}What would you like to do?{shellColors.ENDCOLOR}')
-        user_input = self.get_user_choice(["View Planner", "Main Menu", "Quit"])
+        next_state = self.choose_next_state(
+            ["View Planner", "Main Menu", "Quit"],
+            [self.display_planner, self.main_menu_nav, self.quit_process]
+        )
         print('')
-        if user_input == "1":
-            self.display_planner()
-        elif user_input == "2":
-            self.main_menu_nav()
-        elif user_input == "3":
-            self.quit_process()
+        return next_state
 
     def display_planner(self):
-        """Display the Travel Planner"""
-        print(Format.LINE)
-        self.display_itinerary()
-        print('')
-        self.display_packing_list()
-        print('')
-        self.display_budget()
-        print('')
-        self.display_contacts()
-        print(Format.LINE)
-        self.planner_nav()
+        """Display the Travel Planner (written at once, one page at a time if it is long)"""
+        with self.rendering() as renderer:
+            renderer.line(Format.LINE)
+            self.display_itinerary()
+            renderer.line()
+            self.display_packing_list()
+            renderer.line()
+            self.display_budget()
+            renderer.line()
+            self.display_contacts()
+            renderer.line(Format.LINE)
+        return self.planner_nav
+
+    #### SAVED TRIPS ####
+
+    def load_active_trip(self):
+        """Load the trip the planner was using when it last quit (if trips are saved)"""
+        if self._planner_store is None:
+            return
+        trip_id = self._planner_store.active_trip()
+        if trip_id is None:
+            return
+        try:
+            self._planner_store.load(self, trip_id)
+        except (OSError, ValueError) as error:
+            self.display_warning(f'Could not load the saved trip: {error}')
+            return
+        self._trip_id = trip_id
+        print(f'Loaded saved trip: {self._trip_name or "(no name)"}\n')
+        self.recover_journal()
+
+    def recover_journal(self):
+        """Replay the edits journaled after the trip was last saved (e.g. the planner crashed) and save them"""
+        edits = 0
+        try:
+            for record in read_journal(self._planner_store.journal_file(self._trip_id)):
+                apply_journal_record(self, record)
+                edits += 1
+        except (IndexError, TypeError, ValueError) as error:
+            self.display_warning(f'Could not recover every unsaved edit: {error}')
+        if edits:
+            # the recovered edits stay in the journal until the trip is saved with them
+            self.open_journal()
+            self.save_trip()
+            print(f'Recovered {edits} unsaved edits of the trip\n')
+
+    def snapshot(self):
+        """
+        Returns a copy of the trip to save while the trip is still edited: the sections are copied, their items are
+        shared as an edit replaces an item instead of changing it
+        """
+        snapshot = copy.copy(self)
+        for name, value in self.__dict__.items():
+            if isinstance(value, dict):
+                snapshot.__dict__[name] = copy.copy(value)
+        return snapshot
+
+    def open_journal(self):
+        """Open the journal of the trip (appending to the edits already journaled)"""
+        if self._trip_id is None:
+            # a new trip is saved first, so its journal is replayed over it after a crash
+            self._trip_id = uuid.uuid4().hex
+            self._planner_store.save(self, self._trip_id)
+        self._journal = TripJournal(self._planner_store.journal_file(self._trip_id),
+                                    partial(self._planner_store.save, trip_id=self._trip_id))
+
+    def journal_edit(self, *records):
+        """Append edits of the trip (see trip_journal.apply_journal_record) to its journal (if trips are saved)"""
+        if self._planner_store is None:
+            return
+        if self._journal is None:
+            self.open_journal()
+        self._journal.append(*records)
+        if self._journal.compaction_due():
+            self._journal.compact(self.snapshot())
+
+    def set_trip_value(self, attribute, value):
+        """Set a trip detail (e.g. '_trip_name') and journal the edit"""
+        setattr(self, attribute, value)
+        self.journal_edit(['set', attribute, value])
+
+    def set_item(self, attribute, item_id, details):
+        """Set an item of a section (e.g. '_packing_list') and journal the edit"""
+        getattr(self, attribute)[item_id] = details
+        self.journal_edit(['item', attribute, item_id, details])
+
+    def delete_item(self, attribute, item_id):
+        """Delete an item of a section and journal the edit"""
+        del getattr(self, attribute)[item_id]
+        self.journal_edit(['delete', attribute, item_id])
+
+    def clear_section(self, attribute):
+        """Delete every item of a section and journal the edit"""
+        getattr(self, attribute).clear()
+        self.journal_edit(['items', attribute, []])
+
+    def renumber_section(self, attribute):
+        """
+        Number the items of a section 1, 2, 3... again if items were deleted (menus choose items by their position)
+        and journal the edit
+        """
+        items = getattr(self, attribute)
+        if items.is_numbered():
+            return
+        items.renumber()
+        self.journal_edit(['items', attribute, list(items.items())])
+
+    def switch_trip(self, trip_id):
+        """
+        Save the trip and make another saved trip the active trip
+        :param trip_id: id of the saved trip to switch to
+        :return: none
+        :raises OSError, ValueError: if the trip could not be loaded (the planner then has an empty new trip)
+        """
+        self.save_trip()
+        self.clear_trip()
+        self._planner_store.load(self, trip_id)
+        self._trip_id = trip_id
+        self._planner_store.set_active_trip(trip_id)
+        self.recover_journal()
+
+    def new_trip(self):
+        """Save the trip and start planning a new (empty) trip"""
+        self.save_trip()
+        self.clear_trip()
+
+    def save_trip(self):
+        """Save the trip so it is loaded the next time the planner starts (if trips are saved)"""
+        if self._planner_store is None:
+            return
+        if self._trip_id is None:
+            self._trip_id = uuid.uuid4().hex
+        if self._journal is not None:
+            self._journal.wait()
+        try:
+            self._planner_store.save(self, self._trip_id)
+        except OSError as error:
+            self.display_warning(f'Could not save the trip: {error}')
+            return
+        # every journaled edit is in the saved trip now
+        if self._journal is not None:
+            self._journal.discard()
+            self._journal = None
+
+    def display_saved_trips_title(self):
+        """Displays saved trips section title to the user"""
+        print(Format.NEWLINE)
+        print(Format.LINEBLU)
+        print(Format.TRPNAME)
+        print(Format.LINEBLU)
 
+    def saved_trip_label(self, trip):
+        """Returns the text describing a saved (trip id, name, start date, end date, destination) trip"""
+        trip_id, name, start_date, end_date, destination = trip
+        return f'{name or "(no name)"} | {start_date or "?"} - {end_date or "?"} | {destination or "?"}'
+
+    def saved_trips_nav(self):
+        """Saved trips navigation menu"""
+        self.display_saved_trips_title()
+        if self._planner_store is None:
+            self.display_warning('Trips are not saved, start the planner without --no-save to plan several trips')
+            return self.main_menu_nav
+        print(f'{shellColors.BOLD}Current trip: {self._trip_name or "(no name)"}{shellColors.ENDCOLOR}')
+        print(f'{shellColors.BLUE}What would you like to do?{shellColors.ENDCOLOR}')
+        return self.choose_next_state(
+            ["Switch Trip", "New Trip", "Main Menu", "Quit"],
+            [self.switch_trip_nav, self.then(self.new_trip, self.main_menu_nav), self.main_menu_nav,
+             self.quit_process]
+        )
 
-# start process
-travel_planner = TravelPlanner()
-travel_planner.start_process()
\ No newline at end of file
+    def switch_trip_nav(self):
+        """Find a saved trip by name and switch to it"""
+        name = self.get_user_input('Enter the start of the trip name (press enter to list all trips)')
+        trips = self._planner_store.find_trips(name=name.strip(), limit=self.SAVED_TRIPS_SHOWN)
+        if not trips:
+            self.display_warning('No saved trips found')
+            return self.saved_trips_nav
+        user_input = self.get_user_choice([self.saved_trip_label(trip) for trip in trips] + ["Saved Trips Menu"])
+        if int(user_input) > len(trips):
+            return self.saved_trips_nav
+        try:
+            self.switch_trip(trips[int(user_input) - 1][0])
+        except (OSError, ValueError) as error:
+            self.display_warning(f'Could not load the saved trip: {error}')
+            return self.saved_trips_nav
+        print(f'{shellColors.GREEN}Switched to trip: {self._trip_name or "(no name)"}{shellColors.ENDCOLOR}')
+        return self.main_menu_nav
+
+    #### BATCH MODE ####
+
+    def section_items(self, section):
+        """Returns the dictionary of items (item number -> details) of the section"""
+        return getattr(self, self.ITEM_ATTRIBUTES[section])
+
+    def next_item_id(self, items):
+        """Returns the number for a new item, one after the highest item number (kept by the item list, O(1))"""
+        return items.next_id()
+
+    def item_details(self, section, values):
+        """Returns the details of an item as they are stored in the section (missing values are left empty)"""
+        values = (values + [''] * self.SECTION_VALUES[section])[:self.SECTION_VALUES[section]]
+        # itinerary activities are a description, the other sections a list of details
+        return values[0] if section == 'itinerary' else values
+
+    def apply_operation(self, op, section, item_id, values):
+        """
+        Apply an operation of a plan to the planner without prompting (batch mode)
+        :param op: 'set', 'create', 'update' or 'delete'
+        :param section: 'trip', 'target_budget', 'itinerary', 'packing', 'budget' or 'contacts'
+        :param item_id: item number to update or delete (None deletes the whole section)
+        :param values: values of the operation as strings (e.g. item name and quantity for a packing item)
+        :return: none
+        """
+        if section == 'trip':
+            if op == 'delete':
+                values = [None] * len(self.TRIP_FIELDS)
+            # only the provided (not empty) trip details are changed
+            for field, value in zip(self.TRIP_FIELDS, values):
+                if value != '':
+                    self.set_trip_value(field, value)
+        elif section == 'target_budget':
+            target_budget = values[0] if op != 'delete' and values else None
+            if target_budget is not None:
+                # raises ValueError if it is not an amount
+                to_cents(target_budget)
+            self.set_trip_value('_target_budget', target_budget)
+        else:
+            attribute = self.ITEM_ATTRIBUTES[section]
+            items = getattr(self, attribute)
+            if op == 'set':
+                raise ValueError(f'Items of the {section} section can be created, updated or deleted, not set')
+            elif op == 'create':
+                self.set_item(attribute, self.next_item_id(items), self.item_details(section, values))
+            elif op == 'delete' and item_id is None:
+                self.clear_section(attribute)
+            elif item_id not in items:
+                raise ValueError(f'There is no {section} item {item_id} to {op}')
+            elif op == 'update':
+                self.set_item(attribute, item_id, self.item_details(section, values))
+            else:
+                self.delete_item(attribute, item_id)
+
+    def apply_operations(self, operations):
+        """Apply the (op, section, item id, values) operations of a plan to the planner in order"""
+        for op, section, item_id, values in operations:
+            self.apply_operation(op, section, item_id, values)
+
+    def to_dict(self):
+        """Returns the planner details as a dictionary (items as [item number, details...] rows) for json output"""
+        def rows(items):
+            return [[key, value] if isinstance(value, str) else [key, *value] for key, value in items.items()]
+        return {
+            'trip_name': self._trip_name,
+            'start_date': self._start_date,
+            'end_date': self._end_date,
+            'from_location': self._from_location,
+            'to_location': self._to_location,
+            'itinerary': rows(self._travel_itinerary),
+            'packing': rows(self._packing_list),
+            'target_budget': self._target_budget,
+            'budget': [[key, category, str(to_amount(cents))]
+                       for key, (category, cents) in self._travel_budget.items()],
+            'contacts': rows(self._contacts)
+        }
+
+
+def run_batch(plan_file, output_format='text'):
+    """
+    Apply the operations of a plan file to a new planner for every trip, then display every consolidated planner
+    :param plan_file: plan file of operations (.json or .csv)
+    :param output_format: 'text' displays the planners as in the application, 'json' prints them as one json list
+    :return: number of trips planned
+    """
+    planners = []
+    for trip, operations in read_plan(plan_file).items():
+        # nothing waits for a key press between pages in batch mode
+        planner = TravelPlanner(page_rows=0)
+        try:
+            planner.apply_operations(operations)
+        except ValueError as error:
+            raise ValueError(f'Trip {trip!r}: {error}') from None
+        planners.append(planner)
+
+    if output_format == 'json':
+        print(json.dumps([planner.to_dict() for planner in planners]))
+    else:
+        for planner in planners:
+            planner.display_planner()
+    return len(planners)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Travel Planner: plan trips from the command line')
+    parser.add_argument('--fx-timeout', type=float, default=30, help='seconds to wait for the FX Microservice')
+    parser.add_argument('--fx-socket', metavar='SOCKET',
+                        help='socket file of the FX Microservice to use instead of the communication pipe files')
+    parser.add_argument('--fx-rate-ttl', type=float, default=FX_RATE_TTL,
+                        help='seconds a received FX rate is reused before it is requested again (0 turns it off)')
+    parser.add_argument('--fx-cache', metavar='FILE', help='json file to keep received FX rates in between sessions')
+    parser.add_argument('--fx-cache-stats', action='store_true',
+                        help='display the FX rate cache hits and misses after every conversion')
+    parser.add_argument('--save-dir', metavar='DIR', default=SAVE_DIRECTORY,
+                        help='directory the trip is saved in on quit and loaded from on start')
+    parser.add_argument('--trip-db', metavar='FILE',
+                        help='SQLite database to save many trips in instead of the save directory')
+    parser.add_argument('--no-save', action='store_true', help='do not load or save the trip')
+    parser.add_argument('--page-rows', type=int, metavar='N',
+                        help='lines of the planner displayed per page (default: terminal height, 0 does not page)')
+    parser.add_argument('--batch', metavar='PLAN',
+                        help='apply the operations of a plan file (.json or .csv) without prompting and display the '
+                             'planner of every trip')
+    parser.add_argument('--output', choices=('text', 'json'), default='text', help='how --batch displays the planners')
+    args = parser.parse_args()
+
+    if args.batch:
+        try:
+            run_batch(args.batch, args.output)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+    else:
+        # start process
+        travel_planner = TravelPlanner(args.fx_timeout, args.fx_socket, args.fx_rate_ttl, args.fx_cache,
+                                       None if args.no_save else args.save_dir,
+                                       None if args.no_save else args.trip_db, args.page_rows, args.fx_cache_stats)
+        travel_planner.start_process()
\ No newline at end of file
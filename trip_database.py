@@ -0,0 +1,193 @@
+import json
+import os
+import sqlite3
+import threading
+
+# planner attribute of every trip detail column of the trips table
+TRIP_COLUMNS = {
+    'name': '_trip_name',
+    'start_date': '_start_date',
+    'end_date': '_end_date',
+    'from_location': '_from_location',
+    'to_location': '_to_location',
+    'target_budget': '_target_budget',
+    'fx_rate': '_fx_rate',
+    'target_budget_converted': '_target_budget_converted'
+}
+# planner attribute of the trips table columns that hold a dictionary as json
+TRIP_JSON_COLUMNS = {'currency_pair': '_currency_pair', 'fx_rates': '_fx_rates'}
+# planner attribute (dictionary of items) of every section in the items table
+ITEM_SECTIONS = {
+    'itinerary': '_travel_itinerary',
+    'packing': '_packing_list',
+    'budget': '_travel_budget',
+    'contacts': '_contacts'
+}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS trips (
+    id TEXT PRIMARY KEY,
+    name TEXT COLLATE NOCASE,
+    start_date TEXT,
+    end_date TEXT,
+    from_location TEXT,
+    to_location TEXT COLLATE NOCASE,
+    target_budget TEXT,
+    fx_rate REAL,
+    target_budget_converted REAL,
+    currency_pair TEXT,
+    fx_rates TEXT
+);
+CREATE INDEX IF NOT EXISTS trips_by_name ON trips (name);
+CREATE INDEX IF NOT EXISTS trips_by_dates ON trips (start_date, end_date);
+CREATE INDEX IF NOT EXISTS trips_by_destination ON trips (to_location);
+CREATE TABLE IF NOT EXISTS items (
+    trip_id TEXT NOT NULL REFERENCES trips (id) ON DELETE CASCADE,
+    section TEXT NOT NULL,
+    item_id INTEGER NOT NULL,
+    details TEXT NOT NULL,
+    PRIMARY KEY (trip_id, section, item_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+
+class TripDatabase:
+    """
+    Saves many trips with their itinerary, packing, budget and contacts items in a SQLite database. Trips are
+    indexed on name, dates and destination so finding and opening a trip does not depend on how many are saved.
+    Has the same save/load interface as PlannerStore, and can be used from several threads (e.g. a snapshot saved
+    in the background).
+    """
+
+    def __init__(self, database_file) -> None:
+        """
+        :param database_file: SQLite database file (path to file, created if needed)
+        """
+        self._connection = sqlite3.connect(database_file, check_same_thread=False)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.executescript(SCHEMA)
+        # the connection is shared by the threads, one of them uses it at a time
+        self._lock = threading.Lock()
+        # edits of the trips are journaled in files next to the database until the trip is saved again
+        self._journal_directory = database_file + '.journals'
+        os.makedirs(self._journal_directory, exist_ok=True)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    def journal_file(self, trip_id):
+        """Returns the file the edits of a trip are journaled in until the trip is saved again (path to file)"""
+        return os.path.join(self._journal_directory, trip_id + '.journal')
+
+    def active_trip(self):
+        """Returns the id of the trip the planner was last using, None if no trip was saved"""
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM settings WHERE key = 'active_trip'").fetchone()
+        return row[0] if row else None
+
+    def set_active_trip(self, trip_id):
+        """Remember the trip the planner is using so it is loaded at the next start"""
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('active_trip', ?)",
+                                     (trip_id,))
+
+    def trip_ids(self):
+        """Returns the ids of every saved trip"""
+        with self._lock:
+            return [row[0] for row in self._connection.execute('SELECT id FROM trips')]
+
+    def find_trips(self, name=None, start_date=None, end_date=None, destination=None, limit=None):
+        """
+        Find saved trips (every given condition has to match), ordered by start date
+        :param name: start of the trip name (case is ignored)
+        :param start_date: earliest start date (dates are compared as text, e.g. YYYY-MM-DD)
+        :param end_date: latest end date
+        :param destination: location the trip goes to (case is ignored)
+        :param limit: most trips to return (None returns every match)
+        :return: list of (trip id, name, start date, end date, destination)
+        """
+        conditions, parameters = [], []
+        if name:
+            # escape the LIKE wildcards so only the start of the name is matched (uses the name index)
+            conditions.append("name LIKE ? ESCAPE '\\'")
+            parameters.append(name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        if start_date:
+            conditions.append('start_date >= ?')
+            parameters.append(start_date)
+        if end_date:
+            conditions.append('end_date <= ?')
+            parameters.append(end_date)
+        if destination:
+            conditions.append('to_location = ?')
+            parameters.append(destination)
+        query = 'SELECT id, name, start_date, end_date, to_location FROM trips'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY start_date'
+        if limit is not None:
+            query += ' LIMIT ?'
+            parameters.append(limit)
+        with self._lock:
+            return self._connection.execute(query, parameters).fetchall()
+
+    def save(self, planner, trip_id):
+        """
+        Save the trip details and items of the planner (replacing the saved trip) and make it the active trip
+        :param planner: TravelPlanner to save
+        :param trip_id: id of the trip
+        :return: none
+        """
+        columns = list(TRIP_COLUMNS) + list(TRIP_JSON_COLUMNS)
+        values = [getattr(planner, attribute) for attribute in TRIP_COLUMNS.values()]
+        values += [json.dumps(getattr(planner, attribute)) for attribute in TRIP_JSON_COLUMNS.values()]
+        items = [(trip_id, section, item_id, json.dumps(details))
+                 for section, attribute in ITEM_SECTIONS.items()
+                 for item_id, details in getattr(planner, attribute).items()]
+        with self._lock, self._connection:
+            self._connection.execute(
+                f'INSERT OR REPLACE INTO trips (id, {", ".join(columns)}) VALUES (?{", ?" * len(columns)})',
+                [trip_id] + values)
+            self._connection.execute('DELETE FROM items WHERE trip_id = ?', (trip_id,))
+            self._connection.executemany('INSERT INTO items VALUES (?, ?, ?, ?)', items)
+            self._connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('active_trip', ?)",
+                                     (trip_id,))
+
+    def load(self, planner, trip_id):
+        """
+        Load a saved trip into the planner
+        :param planner: TravelPlanner to load the trip into
+        :param trip_id: id of the saved trip
+        :return: none
+        :raises ValueError: if there is no saved trip with the id
+        """
+        columns = list(TRIP_COLUMNS) + list(TRIP_JSON_COLUMNS)
+        with self._lock:
+            row = self._connection.execute(f'SELECT {", ".join(columns)} FROM trips WHERE id = ?',
+                                           (trip_id,)).fetchone()
+            item_rows = self._connection.execute('SELECT section, item_id, details FROM items WHERE trip_id = ?',
+                                                 (trip_id,)).fetchall()
+        if row is None:
+            raise ValueError(f'There is no saved trip {trip_id!r}')
+        for attribute, value in zip(TRIP_COLUMNS.values(), row):
+            setattr(planner, attribute, value)
+        for attribute, value in zip(TRIP_JSON_COLUMNS.values(), row[len(TRIP_COLUMNS):]):
+            setattr(planner, attribute, json.loads(value))
+        sections = {attribute: [] for attribute in ITEM_SECTIONS.values()}
+        # rows come in primary key order, so the items of every section are in item number order
+        for section, item_id, details in item_rows:
+            # sections the planner no longer has (e.g. converted budget items saved by earlier versions) are skipped
+            if section in ITEM_SECTIONS:
+                sections[ITEM_SECTIONS[section]].append((item_id, json.loads(details)))
+        # the sections of the planner keep their type (e.g. the budget ledger keeps its totals)
+        for attribute, items in sections.items():
+            section_items = getattr(planner, attribute)
+            section_items.clear()
+            section_items.load_items(items)
+        planner._pending_sections = {}
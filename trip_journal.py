@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+from planner_store import HEADER_ATTRIBUTES, SECTION_ATTRIBUTES
+
+# edits journaled before the trip is saved as a snapshot and the journal is started again
+COMPACT_AFTER_EDITS = 500
+# suffix of the journal file being compacted (its edits are dropped once the snapshot is saved)
+COMPACTING_SUFFIX = '.compacting'
+# planner attributes an edit can change
+JOURNALED_ATTRIBUTES = HEADER_ATTRIBUTES + SECTION_ATTRIBUTES
+
+
+def read_journal(journal_file):
+    """
+    Yield the edits of a journal and of its compacting journal (older edits first); an edit cut short by a crash
+    while it was appended ends the journal
+    """
+    for file_path in (journal_file + COMPACTING_SUFFIX, journal_file):
+        try:
+            with open(file_path, 'r') as journal:
+                for line in journal:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            continue
+
+
+def apply_journal_record(planner, record):
+    """
+    Apply a journaled edit to the planner:
+    ['set', attribute, value] sets a trip detail, ['item', attribute, item id, details] sets an item of a section,
+    ['delete', attribute, item id] deletes an item and ['items', attribute, [[item id, details], ...]] replaces
+    every item of a section
+    :raises ValueError: if the edit is not one of these
+    """
+    op, attribute = record[0], record[1]
+    if attribute not in JOURNALED_ATTRIBUTES:
+        raise ValueError(f'Journal edit of an unknown attribute {attribute!r}')
+    if op == 'set':
+        setattr(planner, attribute, record[2])
+    elif op == 'item':
+        getattr(planner, attribute)[record[2]] = record[3]
+    elif op == 'delete':
+        getattr(planner, attribute).pop(record[2], None)
+    elif op == 'items':
+        items = getattr(planner, attribute)
+        items.clear()
+        items.load_items(record[2])
+    else:
+        raise ValueError(f'Unknown journal edit {op!r}')
+
+
+class TripJournal:
+    """
+    Append-only journal of the edits of a trip: every edit is appended to the journal file as one json line and
+    flushed to disk (O(1) disk work however big the trip is), so a crash loses at most the edit being written.
+    After compact_after edits the trip is saved as a snapshot in a background thread and the journaled edits are
+    dropped once the snapshot is on disk.
+    """
+
+    def __init__(self, journal_file, save_snapshot, compact_after=COMPACT_AFTER_EDITS) -> None:
+        """
+        :param journal_file: file to append the edits to (path to file)
+        :param save_snapshot: function that saves a snapshot (copy of the planner) of the trip
+        :param compact_after: number of edits journaled before the journal is compacted
+        """
+        self._journal_file = journal_file
+        self._save_snapshot = save_snapshot
+        self._compact_after = compact_after
+        self._edits = 0
+        self._compaction = None
+        self._journal = open(journal_file, 'a')
+
+    def append(self, *records):
+        """Append edits to the journal and flush them to disk"""
+        self._journal.write(''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._edits += len(records)
+
+    def compaction_due(self):
+        """Returns True if enough edits were journaled to save a snapshot (and no snapshot is being saved)"""
+        return self._edits >= self._compact_after and not self.compacting()
+
+    def compacting(self):
+        """Returns True while a snapshot is being saved in the background"""
+        return self._compaction is not None and self._compaction.is_alive()
+
+    def compact(self, snapshot):
+        """
+        Save a snapshot of the trip in a background thread: the journaled edits are moved to the compacting journal
+        (removed once the snapshot is saved) and the next edits are appended to a new journal
+        :param snapshot: copy of the planner with every journaled edit (the planner can be edited while it is saved)
+        :return: none
+        """
+        self.wait()
+        self._journal.close()
+        compacting_file = self._journal_file + COMPACTING_SUFFIX
+        if os.path.exists(compacting_file):
+            # the last snapshot could not be saved, keep its edits in front of the new ones
+            with open(compacting_file, 'a') as compacting, open(self._journal_file, 'r') as journal:
+                compacting.write(journal.read())
+            os.remove(self._journal_file)
+        else:
+            os.replace(self._journal_file, compacting_file)
+        self._journal = open(self._journal_file, 'a')
+        self._edits = 0
+        self._compaction = threading.Thread(target=self._save_compaction, args=(snapshot, compacting_file),
+                                            daemon=True)
+        self._compaction.start()
+
+    def _save_compaction(self, snapshot, compacting_file):
+        """Save the snapshot, then drop the compacted edits"""
+        try:
+            self._save_snapshot(snapshot)
+        except Exception:
+            # the compacting journal is kept, so its edits are replayed (or compacted again) later
+            return
+        os.remove(compacting_file)
+
+    def wait(self):
+        """Wait until the snapshot being saved in the background (if any) is saved"""
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def discard(self):
+        """Close the journal and remove its files, once the trip was saved with every journaled edit"""
+        self.wait()
+        self._journal.close()
+        for file_path in (self._journal_file, self._journal_file + COMPACTING_SUFFIX):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass